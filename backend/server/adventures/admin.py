@@ -10,12 +10,15 @@ from adventures.models import (
     Collection,
     CollectionInvite,
     CollectionItineraryDay,
+    BackupJob,
     CollectionItineraryItem,
     ContentAttachment,
     ContentImage,
+    GeocodeJob,
     Location,
     Lodging,
     Note,
+    ReverseGeocodeCacheEntry,
     Trail,
     Transportation,
     Visit,
@@ -680,6 +683,85 @@ class CollectionItineraryDayAdmin(TimestampedAdminMixin, admin.ModelAdmin):
     ordering = ('collection', 'date')
 
 
+@admin.action(description='Retry selected geocode jobs now')
+def retry_geocode_jobs(modeladmin, request, queryset):
+    from adventures.services.geocoding.queue import enqueue_location_geocode
+
+    location_ids = set(queryset.exclude(status=GeocodeJob.Status.PENDING).values_list('location_id', flat=True))
+    for location_id in location_ids:
+        enqueue_location_geocode(location_id)
+    modeladmin.message_user(
+        request,
+        f'Re-queued geocoding for {len(location_ids)} location(s).',
+        level=messages.SUCCESS,
+    )
+
+
+@admin.register(GeocodeJob)
+class GeocodeJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'location',
+        'status',
+        'attempts',
+        'coalesced_count',
+        'available_at',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('location__name', 'location__user__username', 'last_error')
+    list_select_related = ('location',)
+    autocomplete_fields = ('location',)
+    readonly_fields = UUID_READONLY + ('created_at', 'started_at', 'finished_at', 'last_error')
+    actions = [retry_geocode_jobs]
+    date_hierarchy = 'created_at'
+
+    def changelist_view(self, request, extra_context=None):
+        from adventures.services.geocoding.queue import get_queue_stats
+
+        stats = get_queue_stats()
+        self.message_user(
+            request,
+            (
+                f"Queue: {stats['pending']} pending, {stats['running']} running, {stats['failed']} failed. "
+                f"Avg latency (last {stats['window_minutes']} min): {stats['avg_latency_seconds']}s."
+            ),
+            level=messages.INFO,
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(BackupJob)
+class BackupJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'kind',
+        'status',
+        'stage',
+        'entities_processed',
+        'bytes_processed',
+        'attempts',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = ('kind', 'status')
+    search_fields = ('user__username', 'last_error')
+    list_select_related = ('user',)
+    readonly_fields = UUID_READONLY + (
+        'completed_stage', 'checkpoint', 'summary', 'created_at', 'updated_at', 'started_at', 'finished_at', 'last_error',
+    )
+    date_hierarchy = 'created_at'
+
+
+@admin.register(ReverseGeocodeCacheEntry)
+class ReverseGeocodeCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('cell', 'provider', 'hit_count', 'created_at', 'last_hit_at', 'expires_at')
+    list_filter = ('provider',)
+    search_fields = ('cell',)
+    readonly_fields = ('created_at', 'last_hit_at', 'hit_count')
+    date_hierarchy = 'created_at'
+
+
 admin.site.site_header = 'AdventureLog Admin'
 admin.site.site_title = 'AdventureLog Admin'
 admin.site.index_title = 'AdventureLog administration'
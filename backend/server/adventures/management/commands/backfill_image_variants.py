@@ -0,0 +1,115 @@
+"""
+Render downscaled variants (IMAGE_VARIANT_WIDTHS) for existing ContentImage files.
+
+New uploads and imports are rendered by the in-process variant pool; this
+command covers images that pool missed or was disabled for, images uploaded
+before variants existed, and images from before the configured widths changed.
+Decoding and resizing run in a process pool; the database is only written from
+this process.
+
+Usage:
+    python manage.py backfill_image_variants
+    python manage.py backfill_image_variants --workers 4
+    python manage.py backfill_image_variants --user-id 123
+    python manage.py backfill_image_variants --force
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from adventures.models import ContentImage
+from adventures.services.images.variants import configured_widths, delete_variants, render_variants
+
+
+def _render(name, widths):
+    try:
+        return name, render_variants(name, widths), None
+    except Exception as exc:
+        return name, None, str(exc)
+
+
+class Command(BaseCommand):
+    help = 'Render downscaled variants for existing ContentImage files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes (default: number of CPUs)',
+        )
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Process images for a specific user ID only',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Files handed to the pool per batch (default: 200)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render images that already have variants',
+        )
+
+    def handle(self, *args, **options):
+        widths = configured_widths()
+        if not widths:
+            raise CommandError('IMAGE_VARIANT_WIDTHS is empty; nothing to render')
+
+        queryset = ContentImage.objects.exclude(image__isnull=True).exclude(image='')
+        if options.get('user_id'):
+            queryset = queryset.filter(user_id=options['user_id'])
+
+        # Rows that share a file share its variants.
+        current = {}
+        rows = queryset.values_list('image', 'variants', 'width').iterator()
+        for name, variants, original_width in rows:
+            # Only widths narrower than the original are rendered, and rows
+            # rendered before the original's width was recorded need it too.
+            if (
+                not options['force']
+                and original_width is not None
+                and variants == [width for width in widths if width < original_width]
+            ):
+                continue
+            current.setdefault(name, variants)
+        if not current:
+            self.stdout.write(self.style.SUCCESS('All images already have their variants'))
+            return
+
+        names = sorted(current)
+        batch_size = max(1, options['batch_size'])
+        workers = max(1, options['workers'])
+        self.stdout.write(f'Rendering variants for {len(names)} file(s) with {workers} worker(s)...')
+
+        stats = {'rendered': 0, 'errors': 0}
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for start in range(0, len(names), batch_size):
+                batch = names[start:start + batch_size]
+                for name, result, error in pool.map(_render, batch, [widths] * len(batch)):
+                    if error is not None:
+                        stats['errors'] += 1
+                        self.stdout.write(self.style.WARNING(f'  error {name}: {error}'))
+                        continue
+                    original_width, rendered = result
+                    stale = set(current[name]) - set(rendered)
+                    if stale:
+                        delete_variants(name, stale)
+                    ContentImage.objects.filter(image=name).update(variants=rendered, width=original_width)
+                    stats['rendered'] += 1
+                self.stdout.write(f'  {min(start + batch_size, len(names))}/{len(names)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {stats['rendered']} rendered, {stats['errors']} error(s)"
+        ))
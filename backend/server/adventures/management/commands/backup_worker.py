@@ -0,0 +1,78 @@
+"""
+Run queued backup export and import jobs.
+
+Run this as a dedicated process when the in-process pool is disabled
+(BACKUP_JOB_WORKERS=0) or when large imports should not share web workers.
+
+Usage:
+    python manage.py backup_worker
+    python manage.py backup_worker --once
+    python manage.py backup_worker --sleep 10
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from adventures.services.backup.jobs import process_batch, run_maintenance
+
+
+class Command(BaseCommand):
+    help = 'Process queued backup export and import jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs that are currently pending, then exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1,
+            help='Number of jobs claimed per batch (default: 1)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Seconds to wait when no job is pending (default: 5)',
+        )
+        parser.add_argument(
+            '--maintenance-interval',
+            type=int,
+            default=300,
+            help='Seconds between stale-job recovery and pruning passes (default: 300)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        sleep_seconds = max(0.1, options['sleep'])
+        maintenance_interval = max(1, options['maintenance_interval'])
+
+        run_maintenance()
+        last_maintenance = time.monotonic()
+        processed_total = 0
+
+        self.stdout.write(self.style.SUCCESS('Backup worker started'))
+        try:
+            while True:
+                if time.monotonic() - last_maintenance >= maintenance_interval:
+                    run_maintenance()
+                    last_maintenance = time.monotonic()
+
+                processed = process_batch(batch_size)
+                processed_total += processed
+                close_old_connections()
+
+                if processed:
+                    self.stdout.write(f'  ... processed {processed_total} job(s)')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(sleep_seconds)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Backup worker stopped after {processed_total} job(s)'))
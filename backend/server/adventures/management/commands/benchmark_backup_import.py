@@ -0,0 +1,163 @@
+"""
+Measure backup import throughput on a synthetic account.
+
+Builds a backup with the requested number of locations (each with visits,
+activities, a trail and collection membership) plus transportation, notes,
+checklists, lodging and itinerary items, then imports it into a throwaway user
+inside a transaction that is rolled back afterwards. Media files are not
+included, so the numbers reflect database work only.
+
+Usage:
+    python manage.py benchmark_backup_import
+    python manage.py benchmark_backup_import --locations 5000 --visits 3
+"""
+
+import io
+import json
+import random
+import time
+import uuid
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from adventures.services.backup import BackupImporter
+from worldtravel.models import City
+
+
+def _iso_date(day):
+    return f'2024-{(day // 28) % 12 + 1:02d}-{day % 28 + 1:02d}'
+
+
+def build_synthetic_backup(locations, visits, collections, rng):
+    cities = list(City.objects.values_list('id', 'region_id', 'region__country_id')[:200])
+    data = {
+        'version': 'benchmark',
+        'categories': [
+            {'name': name, 'display_name': name.title(), 'icon': '🌍'}
+            for name in ('general', 'food', 'hike', 'museum')
+        ],
+        'collections': [
+            {'export_id': idx, 'name': f'Trip {idx}', 'is_public': False, 'shared_with_user_ids': []}
+            for idx in range(collections)
+        ],
+        'locations': [],
+        'transportation': [],
+        'notes': [],
+        'checklists': [],
+        'lodging': [],
+        'itinerary_items': [],
+        'visited_cities': [{'city': city_id} for city_id, _, _ in cities[:50]],
+        'visited_regions': [{'region': region_id} for region_id in {row[1] for row in cities[:50]}],
+    }
+
+    for idx in range(locations):
+        city = rng.choice(cities) if cities else (None, None, None)
+        collection_id = idx % collections if collections else None
+        trail_name = f'Trail {idx}'
+        data['locations'].append({
+            'export_id': idx,
+            'name': f'Place {idx}',
+            'category_name': rng.choice(['general', 'food', 'hike', 'museum']),
+            'tags': ['benchmark'],
+            'price': f'{rng.randint(1, 500)}.00',
+            'price_currency': 'EUR',
+            'latitude': f'{rng.uniform(-60, 60):.6f}',
+            'longitude': f'{rng.uniform(-180, 180):.6f}',
+            'city': city[0],
+            'region': city[1],
+            'country': city[2],
+            'collection_export_ids': [collection_id] if collection_id is not None else [],
+            'trails': [{'name': trail_name, 'link': f'https://example.com/trails/{idx}'}],
+            'visits': [
+                {
+                    'export_id': visit_idx,
+                    'start_date': f'{_iso_date(idx + visit_idx)}T08:00:00Z',
+                    'end_date': f'{_iso_date(idx + visit_idx)}T18:00:00Z',
+                    'timezone': 'UTC',
+                    'activities': [{
+                        'name': f'Walk {idx}-{visit_idx}',
+                        'sport_type': 'Hike',
+                        'trail_name': trail_name,
+                        'distance': rng.uniform(1000, 20000),
+                        'moving_time': rng.randint(600, 20000),
+                        'elevation_gain': rng.uniform(0, 1500),
+                    }],
+                }
+                for visit_idx in range(visits)
+            ],
+            'images': [],
+            'attachments': [],
+        })
+        if collection_id is not None:
+            data['itinerary_items'].append({
+                'collection_export_id': collection_id,
+                'content_type': 'location',
+                'item_reference': idx,
+                'date': _iso_date(idx),
+                'is_global': False,
+                'order': idx,
+            })
+
+    for idx in range(max(1, locations // 10)):
+        collection_id = idx % collections if collections else None
+        data['transportation'].append({
+            'export_id': idx, 'type': 'train', 'name': f'Train {idx}',
+            'date': f'{_iso_date(idx)}T07:00:00Z', 'collection_export_id': collection_id,
+        })
+        data['notes'].append({
+            'export_id': idx, 'name': f'Note {idx}', 'content': 'Lorem ipsum',
+            'date': _iso_date(idx), 'collection_export_id': collection_id,
+        })
+        data['checklists'].append({
+            'export_id': idx, 'name': f'Packing {idx}', 'collection_export_id': collection_id,
+            'items': [{'name': f'Item {item}', 'is_checked': item % 2 == 0} for item in range(5)],
+        })
+        data['lodging'].append({
+            'export_id': idx, 'name': f'Hotel {idx}', 'type': 'hotel',
+            'check_in': f'{_iso_date(idx)}T15:00:00Z', 'check_out': f'{_iso_date(idx + 1)}T10:00:00Z',
+            'collection_export_id': collection_id,
+        })
+    return data
+
+
+class Command(BaseCommand):
+    help = 'Benchmark backup import on a synthetic account (changes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--locations', type=int, default=2000, help='Locations in the backup (default: 2000)')
+        parser.add_argument('--visits', type=int, default=2, help='Visits per location (default: 2)')
+        parser.add_argument('--collections', type=int, default=20, help='Collections in the backup (default: 20)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        backup_data = build_synthetic_backup(
+            max(0, options['locations']), max(0, options['visits']), max(0, options['collections']), rng,
+        )
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('data.json', json.dumps(backup_data))
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username=f'benchmark-{uuid.uuid4().hex[:12]}',
+                email=f'benchmark-{uuid.uuid4().hex[:12]}@example.com',
+                password=uuid.uuid4().hex,
+            )
+            with zipfile.ZipFile(archive) as zip_file, CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                summary = BackupImporter(user, zip_file).run(backup_data)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+
+        rows = sum(value for key, value in summary.items() if key != 'trails_skipped')
+        self.stdout.write(json.dumps(summary, indent=2))
+        self.stdout.write(
+            f'Imported {rows} rows in {elapsed:.2f} s '
+            f'({rows / elapsed if elapsed else 0:.0f} rows/s, {len(queries)} queries)'
+        )
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -0,0 +1,147 @@
+"""
+Measure global search latency on a synthetic account.
+
+Creates a throwaway user owning the requested number of rows, spread over
+locations, collections, notes, lodging, transportation, checklists and
+activities, runs a set of queries through ``global_search`` and reports
+per-query latency. Everything is rolled back afterwards.
+
+Usage:
+    python manage.py benchmark_global_search
+    python manage.py benchmark_global_search --rows 100000 --repeat 20
+    python manage.py benchmark_global_search --query paris --query "old town"
+"""
+
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from adventures.models import Activity, Checklist, Collection, Location, Lodging, Note, Transportation, Visit
+from adventures.services.search import global_search
+
+WORDS = (
+    'old town harbour museum castle market bridge cathedral garden river lake summit trail '
+    'beach island valley canyon forest temple palace station airport hotel hostel cabin ferry '
+    'paris lisbon kyoto oslo lima cairo sydney denver porto vienna quebec hanoi'
+).split()
+DEFAULT_QUERIES = ('paris', 'old town', 'cathedr', 'harbour walk', 'xylophone')
+BATCH_SIZE = 2000
+
+# Share of ``--rows`` created for each model; activities also get one visit each.
+MIX = (
+    (Location, 0.40),
+    (Collection, 0.02),
+    (Note, 0.13),
+    (Lodging, 0.10),
+    (Transportation, 0.10),
+    (Checklist, 0.10),
+    (Activity, 0.15),
+)
+
+
+def _phrase(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_synthetic_account(user, rows, rng):
+    counts = {model: max(1, int(rows * share)) for model, share in MIX}
+    collections = Collection.objects.bulk_create(
+        [Collection(user=user, name=_phrase(rng, 3), description=_phrase(rng, 12)) for _ in range(counts[Collection])],
+        batch_size=BATCH_SIZE,
+    )
+
+    def collection():
+        return rng.choice(collections)
+
+    locations = Location.objects.bulk_create(
+        [
+            Location(user=user, name=_phrase(rng, 3), description=_phrase(rng, 20), location=_phrase(rng, 2))
+            for _ in range(counts[Location])
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    Note.objects.bulk_create(
+        [Note(user=user, name=_phrase(rng, 3), content=_phrase(rng, 60), collection=collection())
+         for _ in range(counts[Note])],
+        batch_size=BATCH_SIZE,
+    )
+    Lodging.objects.bulk_create(
+        [Lodging(user=user, name=_phrase(rng, 3), description=_phrase(rng, 15), location=_phrase(rng, 2),
+                 collection=collection())
+         for _ in range(counts[Lodging])],
+        batch_size=BATCH_SIZE,
+    )
+    Transportation.objects.bulk_create(
+        [Transportation(user=user, type='train', name=_phrase(rng, 3), description=_phrase(rng, 15),
+                        from_location=_phrase(rng, 1), to_location=_phrase(rng, 1), collection=collection())
+         for _ in range(counts[Transportation])],
+        batch_size=BATCH_SIZE,
+    )
+    Checklist.objects.bulk_create(
+        [Checklist(user=user, name=_phrase(rng, 3), collection=collection()) for _ in range(counts[Checklist])],
+        batch_size=BATCH_SIZE,
+    )
+    visits = Visit.objects.bulk_create(
+        [Visit(location=rng.choice(locations)) for _ in range(counts[Activity])],
+        batch_size=BATCH_SIZE,
+    )
+    Activity.objects.bulk_create(
+        [Activity(user=user, visit=visit, name=_phrase(rng, 3)) for visit in visits],
+        batch_size=BATCH_SIZE,
+    )
+    return {model._meta.verbose_name_plural: count for model, count in counts.items()}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark global search on a synthetic account (changes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Rows owned by the account (default: 100000)')
+        parser.add_argument('--repeat', type=int, default=10, help='Runs per query (default: 10)')
+        parser.add_argument('--query', action='append', dest='queries', help='Query to run (repeatable)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        queries = options['queries'] or DEFAULT_QUERIES
+        repeat = max(1, options['repeat'])
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username=f'benchmark-{uuid.uuid4().hex[:12]}',
+                email=f'benchmark-{uuid.uuid4().hex[:12]}@example.com',
+                password=uuid.uuid4().hex,
+            )
+            started = time.perf_counter()
+            counts = build_synthetic_account(user, max(1, options['rows']), rng)
+            self.stdout.write(
+                f'Created {sum(counts.values())} rows in {time.perf_counter() - started:.1f} s: '
+                + ', '.join(f'{count} {name}' for name, count in counts.items())
+            )
+            with connection.cursor() as cursor:
+                tables = ', '.join(connection.ops.quote_name(model._meta.db_table) for model, _ in MIX)
+                cursor.execute(f'ANALYZE {tables}, {connection.ops.quote_name(Visit._meta.db_table)}')
+
+            for query in queries:
+                timings = []
+                for _ in range(repeat):
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        payload = global_search(user, query)
+                        timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f'{query!r:>16}: {payload["total"]:>6} matches, '
+                    f'median {statistics.median(timings):7.1f} ms, p95 {p95:7.1f} ms, '
+                    f'{len(captured)} queries'
+                )
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
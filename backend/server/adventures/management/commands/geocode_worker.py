@@ -0,0 +1,90 @@
+"""
+Drain the reverse-geocode job queue.
+
+Run this as a dedicated process when the in-process pool is disabled
+(GEOCODE_QUEUE_WORKERS=0) or when web workers are recycled often enough that
+queued geocodes should not depend on them.
+
+Usage:
+    python manage.py geocode_worker
+    python manage.py geocode_worker --once
+    python manage.py geocode_worker --batch-size 25 --sleep 10
+    python manage.py geocode_worker --stats
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from adventures.services.geocoding.queue import get_queue_stats, process_batch, run_maintenance
+
+
+class Command(BaseCommand):
+    help = 'Process queued reverse-geocode jobs for locations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the jobs that are currently due, then exit',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Number of jobs claimed per batch (default: 10)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Seconds to wait when the queue is empty (default: 5)',
+        )
+        parser.add_argument(
+            '--maintenance-interval',
+            type=int,
+            default=300,
+            help='Seconds between stale-job recovery and pruning passes (default: 300)',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print queue depth and latency as JSON and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(get_queue_stats(), indent=2))
+            return
+
+        batch_size = max(1, options['batch_size'])
+        sleep_seconds = max(0.1, options['sleep'])
+        maintenance_interval = max(1, options['maintenance_interval'])
+
+        run_maintenance()
+        last_maintenance = time.monotonic()
+        processed_total = 0
+
+        self.stdout.write(self.style.SUCCESS('Geocode worker started'))
+        try:
+            while True:
+                if time.monotonic() - last_maintenance >= maintenance_interval:
+                    run_maintenance()
+                    last_maintenance = time.monotonic()
+
+                processed = process_batch(batch_size)
+                processed_total += processed
+                close_old_connections()
+
+                if processed:
+                    self.stdout.write(f'  ... processed {processed_total} job(s)')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(sleep_seconds)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Geocode worker stopped after {processed_total} job(s)'))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.core.files.storage import default_storage
 from adventures.models import ContentImage, ContentAttachment
+from adventures.services.images.variants import variant_names
 from users.models import CustomUser
 
 
@@ -43,6 +44,7 @@ class Command(BaseCommand):
 		for img in ContentImage.objects.all():
 			if img.image and img.image.name:
 				used_files.add(img.image.name)
+				used_files.update(variant_names(img.image.name, img.variants))
 		
 		# Get Attachment file paths
 		for attachment in ContentAttachment.objects.all():
@@ -0,0 +1,54 @@
+"""
+Inspect or purge the persistent reverse-geocode cache.
+
+Usage:
+    python manage.py reverse_geocode_cache --stats
+    python manage.py reverse_geocode_cache --purge --expired
+    python manage.py reverse_geocode_cache --purge --provider osm
+    python manage.py reverse_geocode_cache --purge --cell u4pru
+    python manage.py reverse_geocode_cache --purge --older-than-days 30
+    python manage.py reverse_geocode_cache --reset-stats
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adventures.services.geocoding.cache import PROVIDERS, get_stats, purge, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Report hit/miss statistics for, or purge, the reverse-geocode cell cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help='Print entry counts and hit/miss counters')
+        parser.add_argument('--purge', action='store_true', help='Delete cache entries matching the filters')
+        parser.add_argument('--reset-stats', action='store_true', help='Reset the hit/miss counters')
+        parser.add_argument('--provider', choices=PROVIDERS, help='Limit purge to one provider')
+        parser.add_argument('--expired', action='store_true', help='Limit purge to entries past their TTL')
+        parser.add_argument('--older-than-days', type=int, help='Limit purge to entries created before N days ago')
+        parser.add_argument(
+            '--cell',
+            action='append',
+            help='Limit purge to a geohash cell or prefix (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        if not (options['stats'] or options['purge'] or options['reset_stats']):
+            raise CommandError('Specify at least one of --stats, --purge or --reset-stats')
+
+        if options['purge']:
+            deleted = purge(
+                provider=options.get('provider'),
+                expired_only=options['expired'],
+                older_than_days=options.get('older_than_days'),
+                cells=options.get('cell'),
+            )
+            self.stdout.write(self.style.SUCCESS(f'Purged {deleted} cache entr{"y" if deleted == 1 else "ies"}'))
+
+        if options['reset_stats']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('Hit/miss counters reset'))
+
+        if options['stats']:
+            self.stdout.write(json.dumps(get_stats(), indent=2))
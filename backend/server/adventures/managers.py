@@ -1,7 +1,16 @@
 from django.db import models
 from django.db.models import Q
 
-class LocationManager(models.Manager):
+from adventures.utils.get_is_visited import visited_exists
+
+
+class LocationQuerySet(models.QuerySet):
+    def with_visited_status(self):
+        """Annotate ``is_visited`` in SQL, using the same rules as ``is_location_visited``."""
+        return self.annotate(is_visited=visited_exists())
+
+
+class LocationManager(models.Manager.from_queryset(LocationQuerySet)):
     def retrieve_locations(self, user, include_owned=False, include_shared=False, include_public=False):
         query = Q()
 
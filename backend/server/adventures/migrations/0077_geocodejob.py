@@ -0,0 +1,36 @@
+import uuid
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0076_normalize_all_day_visit_end_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('coalesced_count', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time a worker may pick up the job')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='geocode_jobs', to='adventures.location')),
+            ],
+            options={
+                'verbose_name': 'Geocode Job',
+                'verbose_name_plural': 'Geocode Jobs',
+                'indexes': [models.Index(fields=['status', 'available_at'], name='adventures__status_f1251a_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('location',), name='unique_pending_geocode_job_per_location')],
+            },
+        ),
+    ]
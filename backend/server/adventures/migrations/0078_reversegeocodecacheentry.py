@@ -0,0 +1,32 @@
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0077_geocodejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReverseGeocodeCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=20)),
+                ('cell', models.CharField(help_text='Geohash of the quantized cell', max_length=16)),
+                ('center', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('payload', models.JSONField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Reverse Geocode Cache Entry',
+                'verbose_name_plural': 'Reverse Geocode Cache Entries',
+                'indexes': [models.Index(fields=['expires_at'], name='adventures__expires_e53f8c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('provider', 'cell'), name='unique_reverse_geocode_cache_cell')],
+            },
+        ),
+    ]
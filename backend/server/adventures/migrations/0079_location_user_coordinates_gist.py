@@ -0,0 +1,20 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0078_reversegeocodecacheentry'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddIndex(
+            model_name='location',
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=['user', 'coordinates'], name='adventures__user_id_9d559c_gist'
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0079_location_user_coordinates_gist'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['start_date'], name='adventures__start_d_1ed8d2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['start_date'], name='adventures__start_d_2d565c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transportation',
+            index=models.Index(fields=['date'], name='adventures__date_163995_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['date'], name='adventures__date_933bcd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklist',
+            index=models.Index(fields=['date'], name='adventures__date_71385e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lodging',
+            index=models.Index(fields=['check_in'], name='adventures__check_i_77eadb_idx'),
+        ),
+    ]
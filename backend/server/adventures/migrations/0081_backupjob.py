@@ -0,0 +1,48 @@
+import uuid
+
+import adventures.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0080_calendar_date_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackupJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('kind', models.CharField(choices=[('export', 'Export'), ('import', 'Import')], max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('stage', models.CharField(blank=True, default='', max_length=30)),
+                ('completed_stage', models.CharField(blank=True, max_length=30, null=True)),
+                ('checkpoint', models.JSONField(blank=True, default=dict)),
+                ('summary', models.JSONField(blank=True, default=dict)),
+                ('entities_processed', models.PositiveBigIntegerField(default=0)),
+                ('bytes_processed', models.PositiveBigIntegerField(default=0)),
+                ('source', models.FileField(blank=True, null=True, upload_to=adventures.models.PathAndRename('backups/imports/'))),
+                ('artifact', models.FileField(blank=True, null=True, upload_to=adventures.models.PathAndRename('backups/exports/'))),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='backup_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Backup Job',
+                'verbose_name_plural': 'Backup Jobs',
+                'indexes': [
+                    models.Index(fields=['status', 'created_at'], name='adventures__status_5afe31_idx'),
+                    models.Index(fields=['user', '-created_at'], name='adventures__user_id_53ceaa_idx'),
+                ],
+            },
+        ),
+    ]
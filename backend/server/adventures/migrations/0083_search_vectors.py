@@ -0,0 +1,254 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0082_location_name_trgm'),
+    ]
+
+    operations = [
+        # Replaced by location_name_trgm on UPPER(name), which also serves icontains.
+        migrations.RemoveIndex(
+            model_name='location',
+            name='adventures_location_name_trgm',
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector('name', 'description', 'location', config='english'),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='collection',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector('name', 'description', config='english'),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='transportation',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector('name', 'description', 'from_location', 'to_location', config='english'),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector('name', 'content', config='english'),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='checklist',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector('name', config='english'),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='lodging',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector('name', 'description', 'location', config='english'),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector('name', config='english'),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='location_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='location_name_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'
+                ),
+                name='location_description_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('location'), name='gin_trgm_ops'
+                ),
+                name='location_location_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='collection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='collection_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='collection',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='collection_name_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='collection',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'
+                ),
+                name='collection_description_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='transportation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='transport_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='transportation',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='transport_name_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='transportation',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'
+                ),
+                name='transport_description_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='transportation',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('from_location'), name='gin_trgm_ops'
+                ),
+                name='transport_from_location_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='transportation',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('to_location'), name='gin_trgm_ops'
+                ),
+                name='transport_to_location_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='note_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='note_name_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('content'), name='gin_trgm_ops'
+                ),
+                name='note_content_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='checklist',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='checklist_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='checklist',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='checklist_name_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='lodging',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lodging_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='lodging',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='lodging_name_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='lodging',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'
+                ),
+                name='lodging_description_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='lodging',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('location'), name='gin_trgm_ops'
+                ),
+                name='lodging_location_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='activity_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='activity_name_trgm',
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0083_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentimage',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='contentattachment',
+            name='file_size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='gpx_file_size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
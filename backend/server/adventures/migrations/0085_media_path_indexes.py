@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0084_media_file_sizes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contentimage',
+            index=models.Index(fields=['image'], name='adventures_image_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contentattachment',
+            index=models.Index(fields=['file'], name='adventures_attachment_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['gpx_file'], name='adventures_activity_gpx_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0085_media_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentimage',
+            name='variants',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+    ]
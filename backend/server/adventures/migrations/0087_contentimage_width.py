@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0086_contentimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+
+def fail_overlapping_backup_jobs(apps, schema_editor):
+    """Keep each user's oldest active job; fail the rest so the constraint can be added."""
+    BackupJob = apps.get_model('adventures', 'BackupJob')
+    db_alias = schema_editor.connection.alias
+
+    seen = set()
+    overlapping = []
+    active = BackupJob.objects.using(db_alias).filter(status__in=ACTIVE_STATUSES).order_by('created_at')
+    for job_id, user_id in active.values_list('id', 'user_id'):
+        if user_id in seen:
+            overlapping.append(job_id)
+        seen.add(user_id)
+    if overlapping:
+        BackupJob.objects.using(db_alias).filter(id__in=overlapping).update(
+            status='failed',
+            last_error='Another backup job was already in progress',
+            finished_at=timezone.now(),
+        )
+
+
+def noop(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adventures', '0087_contentimage_width'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_overlapping_backup_jobs, noop),
+        migrations.AddConstraint(
+            model_name='backupjob',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('status__in', ['pending', 'running'])),
+                fields=('user',),
+                name='one_active_backup_job_per_user',
+            ),
+        ),
+    ]
@@ -5,9 +5,9 @@ from django.db import models
 from django.utils.deconstruct import deconstructible
 from adventures.utils.geo import has_coordinates, point_to_lat_lon
 from adventures.managers import LocationManager
-import threading
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
 from django_resized import ResizedImageField
 from djmoney.models.fields import MoneyField
 from worldtravel.models import City, Country, Region, VisitedCity, VisitedRegion
@@ -18,48 +18,50 @@ from adventures.utils.sports_types import SPORT_TYPE_CHOICES
 from adventures.utils.get_is_visited import is_location_visited
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.db.models import Q
+from django.db.models.functions import Upper
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericRelation
 
-def background_geocode_and_assign(location_id: str):
-    print(f"[Location Geocode Thread] Starting geocode for location {location_id}")
-    try:
-        location = Location.objects.get(id=location_id)
-        if not has_coordinates(location.coordinates):
-            return
+def geocode_and_assign(location_id: str):
+    """
+    Reverse geocode a location and attach the resolved city, region and country.
 
-        latitude, longitude = point_to_lat_lon(location.coordinates)
-        from adventures.services.geocoding.reverse import reverse_geocode as reverse_geocode_service
-        is_visited = location.is_visited_status()
-        selection = reverse_geocode_service(latitude, longitude, location.user)
-        result = selection.data
-
-        if 'region_id' in result:
-            region = Region.objects.filter(id=result['region_id']).first()
-            if region:
-                location.region = region
-                if is_visited:
-                    VisitedRegion.objects.get_or_create(user=location.user, region=region)
-
-        if 'city_id' in result:
-            city = City.objects.filter(id=result['city_id']).first()
-            if city:
-                location.city = city
-                if is_visited:
-                    VisitedCity.objects.get_or_create(user=location.user, city=city)
-
-        if 'country_id' in result:
-            country = Country.objects.filter(country_code=result['country_id']).first()
-            if country:
-                location.country = country
-
-        # Save updated location info
-        # Save updated location info, skip geocode threading
-        location.save(update_fields=["region", "city", "country"], _skip_geocode=True)
-
-    except Exception as e:
-        # Optional: log or print the error
-        print(f"[Location Geocode Thread] Error processing {location_id}: {e}")
+    Unexpected errors propagate so the geocode queue can retry the job. Returns
+    the provider selection, or None when the location has no coordinates.
+    """
+    location = Location.objects.with_visited_status().get(id=location_id)
+    if not has_coordinates(location.coordinates):
+        return None
+
+    latitude, longitude = point_to_lat_lon(location.coordinates)
+    from adventures.services.geocoding.reverse import reverse_geocode as reverse_geocode_service
+    is_visited = location.is_visited_status()
+    selection = reverse_geocode_service(latitude, longitude, location.user)
+    result = selection.data
+
+    if 'region_id' in result:
+        region = Region.objects.filter(id=result['region_id']).first()
+        if region:
+            location.region = region
+            if is_visited:
+                VisitedRegion.objects.get_or_create(user=location.user, region=region)
+
+    if 'city_id' in result:
+        city = City.objects.filter(id=result['city_id']).first()
+        if city:
+            location.city = city
+            if is_visited:
+                VisitedCity.objects.get_or_create(user=location.user, city=city)
+
+    if 'country_id' in result:
+        country = Country.objects.filter(country_code=result['country_id']).first()
+        if country:
+            location.country = country
+
+    # Save updated location info, skip re-enqueueing a geocode job
+    location.save(update_fields=["region", "city", "country"], _skip_geocode=True)
+    return selection
 
 def validate_file_extension(value):
     import os
@@ -125,6 +127,26 @@ default_user = 1  # Replace with an actual user ID
 
 User = get_user_model()
 
+
+def search_vector_field(*field_names):
+    """Stored ``to_tsvector('english', ...)`` over ``field_names``, used by global search."""
+    return models.GeneratedField(
+        expression=SearchVector(*field_names, config='english'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+
+def search_indexes(prefix, *field_names):
+    """
+    GIN index on ``search_vector`` plus pg_trgm indexes for the ``icontains``
+    fallback, which compiles to ``UPPER(field::text) LIKE UPPER(...)``.
+    """
+    return [GinIndex(fields=['search_vector'], name=f'{prefix}_search_gin')] + [
+        GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=f'{prefix}_{field}_trgm')
+        for field in field_names
+    ]
+
 class Visit(models.Model):
     id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, primary_key=True)
     location = models.ForeignKey('Location', on_delete=models.CASCADE, related_name='visits')
@@ -139,6 +161,11 @@ class Visit(models.Model):
     images = GenericRelation('ContentImage', related_query_name='visit')
     attachments = GenericRelation('ContentAttachment', related_query_name='visit')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date']),
+        ]
+
     def clean(self):
         if self.start_date > self.end_date:
             raise ValidationError('The start date must be before or equal to the end date.')
@@ -173,6 +200,7 @@ class Location(models.Model):
     collections = models.ManyToManyField('Collection', blank=True, related_name='locations')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = search_vector_field('name', 'description', 'location')
 
     # Generic relations for images and attachments
     images = GenericRelation('ContentImage', related_query_name='location')
@@ -180,7 +208,19 @@ class Location(models.Model):
 
     objects = LocationManager()
 
+    class Meta:
+        indexes = [
+            # Per-user viewport queries for the map (needs btree_gist).
+            GistIndex(fields=['user', 'coordinates']),
+            # location_name_trgm also serves duplicate candidates on collection import.
+            *search_indexes('location', 'name', 'description', 'location'),
+        ]
+
     def is_visited_status(self):
+        # Prefer the ``with_visited_status()`` annotation when the queryset provided it.
+        annotated = self.__dict__.get('is_visited')
+        if annotated is not None:
+            return annotated
         return is_location_visited(self)
 
     def clean(self, skip_shared_validation=False):
@@ -232,14 +272,17 @@ class Location(models.Model):
                 # For now, we'll re-raise the error
                 raise e
 
-        # ⛔ Skip threading if called from geocode background thread
+        # ⛔ Skip enqueueing if called from the geocode worker itself
         if _skip_geocode:
             return result
 
+        # Partial saves that don't touch the coordinates can't change the geocode result
+        if update_fields is not None and 'coordinates' not in update_fields:
+            return result
+
         if has_coordinates(self.coordinates):
-            thread = threading.Thread(target=background_geocode_and_assign, args=(str(self.id),))
-            thread.daemon = True  # Allows the thread to exit when the main program ends
-            thread.start()
+            from adventures.services.geocoding.queue import enqueue_location_geocode
+            enqueue_location_geocode(self.id)
 
         return result
 
@@ -297,6 +340,13 @@ class Collection(models.Model):
         null=True,
         blank=True,
     )
+    search_vector = search_vector_field('name', 'description')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date']),
+            *search_indexes('collection', 'name', 'description'),
+        ]
 
     # if connected locations are private and collection is public, raise an error
     def clean(self):
@@ -338,6 +388,14 @@ class Transportation(models.Model):
     images = GenericRelation('ContentImage', related_query_name='transportation')
     attachments = GenericRelation('ContentAttachment', related_query_name='transportation')
 
+    search_vector = search_vector_field('name', 'description', 'from_location', 'to_location')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date']),
+            *search_indexes('transport', 'name', 'description', 'from_location', 'to_location'),
+        ]
+
     def clean(self):
         if self.date and self.end_date and self.date > self.end_date:
             raise ValidationError('The start date must be before the end date. Start date: ' + str(self.date) + ' End date: ' + str(self.end_date))
@@ -375,6 +433,14 @@ class Note(models.Model):
     images = GenericRelation('ContentImage', related_query_name='note')
     attachments = GenericRelation('ContentAttachment', related_query_name='note')
 
+    search_vector = search_vector_field('name', 'content')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date']),
+            *search_indexes('note', 'name', 'content'),
+        ]
+
     def clean(self):
         if self.collection:
             if self.collection.is_public and not self.is_public:
@@ -404,6 +470,13 @@ class Checklist(models.Model):
     collection = models.ForeignKey('Collection', on_delete=models.CASCADE, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = search_vector_field('name')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date']),
+            *search_indexes('checklist', 'name'),
+        ]
 
     def clean(self):
         if self.collection:
@@ -475,6 +548,12 @@ class ContentImage(models.Model):
     )
     source_url = models.URLField(max_length=2048, null=True, blank=True)
     coordinates = gis_models.PointField(srid=4326, null=True, blank=True)
+    # Stored bytes of ``image``; kept in sync by users.media_usage.
+    file_size = models.BigIntegerField(null=True, blank=True, editable=False)
+    # Widths of the downscaled copies (adventures.services.images.variants).
+    variants = ArrayField(models.PositiveIntegerField(), default=list, blank=True, editable=False)
+    # Pixel width of the original, recorded alongside its variants.
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
     
     # Generic foreign key fields
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='content_images')
@@ -486,6 +565,7 @@ class ContentImage(models.Model):
         verbose_name_plural = "Content Images"
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            models.Index(fields=["image"], name="adventures_image_path_idx"),
         ]
 
     def clean(self):
@@ -511,6 +591,9 @@ class ContentImage(models.Model):
     def delete(self, *args, **kwargs):
         # Remove file from storage when deleting image
         if self.image:
+            from adventures.services.images.variants import delete_variants
+
+            delete_variants(self.image.name, self.variants)
             self.image.delete(save=False)
         super().delete(*args, **kwargs)
 
@@ -524,6 +607,8 @@ class ContentAttachment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, default=default_user)
     file = models.FileField(upload_to=PathAndRename('attachments/'), validators=[validate_file_extension])
     name = models.CharField(max_length=200, null=True, blank=True)
+    # Stored bytes of ``file``; kept in sync by users.media_usage.
+    file_size = models.BigIntegerField(null=True, blank=True, editable=False)
     
     # Generic foreign key fields
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='content_attachments')
@@ -535,6 +620,7 @@ class ContentAttachment(models.Model):
         verbose_name_plural = "Content Attachments"
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            models.Index(fields=["file"], name="adventures_attachment_path_idx"),
         ]
 
     def delete(self, *args, **kwargs):
@@ -591,6 +677,14 @@ class Lodging(models.Model):
     images = GenericRelation('ContentImage', related_query_name='lodging')
     attachments = GenericRelation('ContentAttachment', related_query_name='lodging')
 
+    search_vector = search_vector_field('name', 'description', 'location')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['check_in']),
+            *search_indexes('lodging', 'name', 'description', 'location'),
+        ]
+
     def clean(self):
         if self.check_in and self.check_out and self.check_in > self.check_out:
             raise ValidationError('The start date must be before the end date. Start date: ' + str(self.check_in) + ' End date: ' + str(self.check_out))
@@ -669,6 +763,7 @@ class Activity(models.Model):
 
     # GPX File
     gpx_file = models.FileField(upload_to=PathAndRename('activities/'), validators=[validate_file_extension], blank=True, null=True)
+    gpx_file_size = models.BigIntegerField(null=True, blank=True, editable=False)
 
     # Descriptive
     name = models.CharField(max_length=200)
@@ -706,12 +801,18 @@ class Activity(models.Model):
     # Optional links
     external_service_id = models.CharField(max_length=100, blank=True, null=True)  # E.g., Strava ID
 
+    search_vector = search_vector_field('name')
+
     def __str__(self):
         return f"{self.name} ({self.sport_type})"
 
     class Meta:
         verbose_name = "Activity"
         verbose_name_plural = "Activities"
+        indexes = [
+            *search_indexes('activity', 'name'),
+            models.Index(fields=['gpx_file'], name='adventures_activity_gpx_idx'),
+        ]
 
 class CollectionItineraryDay(models.Model):
     """Metadata for a specific day in a collection's itinerary"""
@@ -812,3 +913,135 @@ class CollectionItineraryItem(models.Model):
                     return value
 
         return None
+
+
+class GeocodeJob(models.Model):
+    """
+    Durable reverse-geocode work item for a location.
+
+    Saves of the same location are coalesced: while a job is pending, further
+    enqueues bump ``coalesced_count`` on it instead of creating another row.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, primary_key=True)
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='geocode_jobs')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    coalesced_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Earliest time a worker may pick up the job")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Geocode Job"
+        verbose_name_plural = "Geocode Jobs"
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+        constraints = [
+            # At most one pending job per location; repeated saves coalesce into it
+            models.UniqueConstraint(
+                fields=["location"],
+                name="unique_pending_geocode_job_per_location",
+                condition=Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Geocode {self.location_id} ({self.status})"
+
+
+class BackupJob(models.Model):
+    """
+    Background backup export or import for a user.
+
+    Exports store the finished ZIP in ``artifact``. Imports read the uploaded
+    ZIP from ``source`` and commit one stage at a time; ``completed_stage`` and
+    ``checkpoint`` let a failed or interrupted import resume where it stopped.
+    """
+
+    class Kind(models.TextChoices):
+        EXPORT = 'export', 'Export'
+        IMPORT = 'import', 'Import'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='backup_jobs')
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    stage = models.CharField(max_length=30, blank=True, default='')
+    completed_stage = models.CharField(max_length=30, blank=True, null=True)
+    checkpoint = models.JSONField(default=dict, blank=True)
+    summary = models.JSONField(default=dict, blank=True)
+    entities_processed = models.PositiveBigIntegerField(default=0)
+    bytes_processed = models.PositiveBigIntegerField(default=0)
+    source = models.FileField(upload_to=PathAndRename('backups/imports/'), blank=True, null=True)
+    artifact = models.FileField(upload_to=PathAndRename('backups/exports/'), blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Backup Job"
+        verbose_name_plural = "Backup Jobs"
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["user", "-created_at"]),
+        ]
+        constraints = [
+            # Exports and imports of one account must not overlap.
+            models.UniqueConstraint(
+                fields=["user"],
+                name="one_active_backup_job_per_user",
+                condition=Q(status__in=["pending", "running"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user} ({self.status})"
+
+
+class ReverseGeocodeCacheEntry(models.Model):
+    """
+    Raw provider reverse-geocode payload cached per geohash cell.
+
+    The payload is stored before user-specific enrichment (visited flags), so
+    one entry serves every user who logs a point inside the same cell.
+    """
+    provider = models.CharField(max_length=20)
+    cell = models.CharField(max_length=16, help_text="Geohash of the quantized cell")
+    center = gis_models.PointField(srid=4326)
+    payload = models.JSONField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Reverse Geocode Cache Entry"
+        verbose_name_plural = "Reverse Geocode Cache Entries"
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "cell"], name="unique_reverse_geocode_cache_cell"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}:{self.cell}"
@@ -1,10 +1,15 @@
-from .models import Location, ContentImage, ChecklistItem, Collection, Note, Transportation, Checklist, Visit, Category, ContentAttachment, Lodging, CollectionInvite, Trail, Activity, CollectionItineraryItem, CollectionItineraryDay
+from .models import Location, ContentImage, ChecklistItem, Collection, Note, Transportation, Checklist, Visit, Category, ContentAttachment, Lodging, CollectionInvite, Trail, Activity, CollectionItineraryItem, CollectionItineraryDay, BackupJob
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
-from main.utils import CustomModelSerializer, build_media_url, get_public_url
+from rest_framework.reverse import reverse
+from main.utils import CustomModelSerializer, build_media_url
 from users.serializers import CustomUserDetailsSerializer
 from worldtravel.serializers import CountrySerializer, RegionSerializer, CitySerializer
 from geopy.distance import geodesic
-from integrations.models import ImmichIntegration
+from adventures.services.backup.jobs import live_progress
+from adventures.services.images.resolver import get_image_resolver
 from adventures.utils.geojson import gpx_to_geojson
 from adventures.utils.geo import point_to_lat_lon
 from adventures.utils.datetime_utils import ensure_aware_utc, normalize_all_day_visit_dates
@@ -43,6 +48,23 @@ def _serialize_collaborator(user, owner_id=None, request_user=None):
     }
 
 
+class ImageListSerializer(serializers.ListSerializer):
+    """Primes the request's image resolver for the whole list before rendering."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        images = list(iterable)
+        resolver = get_image_resolver(self.context)
+        resolver.prime_integrations(image.user_id for image in images if image.immich_id)
+        if getattr(self.child, 'resolves_parents', False):
+            resolver.prime_parents(images)
+        if isinstance(self.child, CustomModelSerializer):
+            # CustomModelSerializer renders the owner's uuid; load owners in one query.
+            user_field = ContentImage._meta.get_field('user')
+            prefetch_related_objects([image for image in images if not user_field.is_cached(image)], 'user')
+        return super().to_representation(images)
+
+
 class ContentImageSerializer(CoordinateSerializerMixin, CustomModelSerializer):
     source = serializers.ChoiceField(
         choices=ContentImage.Source.choices,
@@ -55,31 +77,20 @@ class ContentImageSerializer(CoordinateSerializerMixin, CustomModelSerializer):
         model = ContentImage
         fields = [
             'id', 'image', 'is_primary', 'user', 'immich_id',
-            'source', 'source_url', 'latitude', 'longitude',
+            'source', 'source_url', 'latitude', 'longitude', 'width',
         ]
-        read_only_fields = ['id', 'user']
+        read_only_fields = ['id', 'user', 'width']
+        list_serializer_class = ImageListSerializer
 
     def to_representation(self, instance):
-        # If immich_id is set, check for user integration once
-        integration = None
-        if instance.immich_id:
-            integration = ImmichIntegration.objects.filter(user=instance.user).first()
-            if not integration:
-                return None  # Skip if Immich image but no integration
-
-        # Base representation
-        representation = super().to_representation(instance)
-
-        # Prepare public URL once
-        public_url = get_public_url()
-
-        if instance.immich_id:
-            # Use Immich integration URL
-            representation['image'] = f"{public_url}/api/integrations/immich/{integration.id}/get/{instance.immich_id}"
-        elif instance.image:
-            # Use local image URL
-            representation['image'] = build_media_url(instance.image.name)
+        image_url = get_image_resolver(self.context).image_url(instance)
+        if instance.immich_id and image_url is None:
+            return None  # Skip if Immich image but no integration
 
+        representation = super().to_representation(instance)
+        if image_url is not None:
+            representation['image'] = image_url
+        representation['variants'] = get_image_resolver(self.context).image_variants(instance)
         return representation
 
 
@@ -87,15 +98,21 @@ class ImageMapPinSerializer(serializers.ModelSerializer):
     latitude = serializers.SerializerMethodField()
     longitude = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
     parent_type = serializers.SerializerMethodField()
     parent_id = serializers.SerializerMethodField()
     parent_name = serializers.SerializerMethodField()
 
+    # Tells ImageListSerializer to bulk-load generic parents.
+    resolves_parents = True
+
     class Meta:
         model = ContentImage
         fields = [
             'id',
             'image',
+            'variants',
+            'width',
             'latitude',
             'longitude',
             'source',
@@ -104,6 +121,7 @@ class ImageMapPinSerializer(serializers.ModelSerializer):
             'parent_id',
             'parent_name',
         ]
+        list_serializer_class = ImageListSerializer
 
     def get_latitude(self, obj):
         lat, _ = point_to_lat_lon(obj.coordinates)
@@ -114,24 +132,19 @@ class ImageMapPinSerializer(serializers.ModelSerializer):
         return lon
 
     def get_image(self, obj):
-        if obj.immich_id:
-            integration = ImmichIntegration.objects.filter(user=obj.user).first()
-            if not integration:
-                return None
-            public_url = get_public_url()
-            return f"{public_url}/api/integrations/immich/{integration.id}/get/{obj.immich_id}"
-        if obj.image:
-            return build_media_url(obj.image.name)
-        return None
+        return get_image_resolver(self.context).image_url(obj)
+
+    def get_variants(self, obj):
+        return get_image_resolver(self.context).image_variants(obj)
 
     def get_parent_type(self, obj):
-        return obj.content_type.model if obj.content_type_id else None
+        return ContentType.objects.get_for_id(obj.content_type_id).model if obj.content_type_id else None
 
     def get_parent_id(self, obj):
         return str(obj.object_id)
 
     def get_parent_name(self, obj):
-        parent = obj.content_object
+        parent = get_image_resolver(self.context).parent_for(obj)
         return getattr(parent, 'name', None) if parent else None
 
     def to_representation(self, instance):
@@ -725,6 +738,8 @@ class LocationSerializer(CoordinateSerializerMixin, CustomModelSerializer):
             instance.visits.all().delete()
             for visit_data in visits_data:
                 Visit.objects.create(location=instance, **visit_data)
+            # The queryset annotation no longer reflects the new visits.
+            instance.__dict__.pop('is_visited', None)
 
         return instance
     
@@ -1056,15 +1071,21 @@ class CollectionSerializer(CustomModelSerializer):
         return collaborators
 
     def get_locations(self, obj):
+        # Annotate visited status unless the locations were already prefetched.
+        if 'locations' in getattr(obj, '_prefetched_objects_cache', {}):
+            locations = obj.locations.all()
+        else:
+            locations = obj.locations.with_visited_status()
+
         if self.context.get('nested', False):
             allowed_nested_fields = set(self.context.get('allowed_nested_fields', []))
             return LocationSerializer(
-            obj.locations.all(), 
+            locations, 
             many=True, 
             context={**self.context, 'nested': True, 'allowed_nested_fields': allowed_nested_fields}
         ).data
         
-        return LocationSerializer(obj.locations.all(), many=True, context=self.context).data
+        return LocationSerializer(locations, many=True, context=self.context).data
 
     def get_transportations(self, obj):
         # Only include transportations if not in nested context
@@ -1389,4 +1410,34 @@ class SearchHitSerializer(serializers.Serializer):
     url = serializers.CharField()
     score = serializers.FloatField()
     meta = serializers.DictField(required=False, default=dict)
-        
\ No newline at end of file
+
+
+class SearchSuggestionSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.CharField()
+    title = serializers.CharField()
+    url = serializers.CharField()
+        
+
+
+class BackupJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BackupJob
+        fields = [
+            'id', 'kind', 'status', 'stage', 'completed_stage', 'entities_processed', 'bytes_processed',
+            'summary', 'last_error', 'download_url', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # A running worker reports progress through the cache between commits.
+        data.update(live_progress(instance))
+        return data
+
+    def get_download_url(self, obj):
+        if obj.kind != BackupJob.Kind.EXPORT or obj.status != BackupJob.Status.DONE or not obj.artifact:
+            return None
+        return reverse('backup-jobs-download', kwargs={'pk': obj.pk})
@@ -0,0 +1,4 @@
+from adventures.services.backup.export import BackupExporter, backup_filename, stream_backup
+from adventures.services.backup.importer import BackupImporter, clear_user_data
+
+__all__ = ['BackupExporter', 'BackupImporter', 'backup_filename', 'clear_user_data', 'stream_backup']
@@ -0,0 +1,603 @@
+"""
+Streaming account backup export.
+
+The backup is a ZIP with ``data.json`` plus the referenced media under
+``images/``, ``attachments/`` and ``gpx/``. It is produced incrementally so
+memory stays bounded regardless of account size:
+
+* entities are read with prefetching querysets iterated in chunks,
+* ``data.json`` is written element by element straight into its ZIP entry,
+* media files are copied from storage in fixed-size chunks; on S3 the next
+  few files are downloaded concurrently while the current one is written.
+
+``BackupExporter.iter_write`` drives the export one step at a time, so the
+same code can feed an HTTP streaming response (``stream_backup``) or a file.
+"""
+import io
+import json
+import logging
+import shutil
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from adventures.models import (
+    Activity, Checklist, ChecklistItem, Collection, CollectionItineraryItem,
+    Location, Lodging, Note, Transportation, Visit,
+)
+from adventures.utils.geo import point_to_lat_lon
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+QUERY_CHUNK_SIZE = 200
+# Files at most this large stay in memory while being read ahead from S3.
+READ_AHEAD_SPOOL_BYTES = 4 * 1024 * 1024
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _coord_str(point, index):
+    value = point_to_lat_lon(point)[index]
+    return str(value) if value is not None else None
+
+
+def _coord_float(point, index):
+    value = point_to_lat_lon(point)[index]
+    return float(value) if value is not None else None
+
+
+def _float_or_none(value):
+    return float(value) if value else None
+
+
+def _seconds_or_none(value):
+    return value.total_seconds() if value else None
+
+
+def _basename(name):
+    return name.split('/')[-1]
+
+
+def serialize_trail(trail):
+    """Export trail data; author fields are optional for backward-compatible backups."""
+    data = {
+        'name': trail.name,
+        'link': trail.link,
+        'wanderer_id': trail.wanderer_id,
+        'created_at': _iso(trail.created_at),
+    }
+    if trail.wanderer_author_username:
+        data['wanderer_author_username'] = trail.wanderer_author_username
+    if trail.wanderer_author_domain:
+        data['wanderer_author_domain'] = trail.wanderer_author_domain
+    return data
+
+
+class _JsonObjectWriter:
+    """Writes one top-level JSON object whose arrays are appended to item by item."""
+
+    def __init__(self, handle):
+        self._handle = handle
+        self._fields = 0
+        self._items = 0
+        handle.write('{')
+
+    def _key(self, key):
+        self._handle.write(',\n  ' if self._fields else '\n  ')
+        self._handle.write(json.dumps(key) + ': ')
+        self._fields += 1
+
+    def value(self, key, value):
+        self._key(key)
+        self._handle.write(json.dumps(value, cls=DjangoJSONEncoder))
+
+    def begin_array(self, key):
+        self._key(key)
+        self._handle.write('[')
+        self._items = 0
+
+    def item(self, value):
+        self._handle.write(',\n    ' if self._items else '\n    ')
+        self._handle.write(json.dumps(value, cls=DjangoJSONEncoder))
+        self._items += 1
+
+    def end_array(self):
+        self._handle.write('\n  ]' if self._items else ']')
+
+    def close(self):
+        self._handle.write('\n}\n')
+
+
+class BackupExporter:
+    """Writes one user's backup into an open ``zipfile.ZipFile``."""
+
+    def __init__(self, user):
+        self.user = user
+        self.stage = None
+        self.entities = 0
+        self.bytes_written = 0
+        # storage name -> archive name, collected while writing data.json
+        self._files = {}
+        self._arcnames = set()
+        self._collection_export_ids = {}
+        # primary image id -> reference written on its collection
+        self._primary_image_refs = {}
+
+    # ------------------------------------------------------------------ files
+
+    def _register_file(self, field_file, folder):
+        if not field_file:
+            return None
+        filename = _basename(field_file.name)
+        arcname = f'{folder}/{filename}'
+        # Storage names are unique, but the archive only keeps the basename.
+        if field_file.name not in self._files and arcname not in self._arcnames:
+            self._files[field_file.name] = arcname
+            self._arcnames.add(arcname)
+        return filename
+
+    def _serialize_images(self, images):
+        serialized = []
+        for image in images:
+            lat, lon = point_to_lat_lon(image.coordinates)
+            serialized.append({
+                'immich_id': image.immich_id,
+                'is_primary': image.is_primary,
+                'source': image.source,
+                'source_url': image.source_url,
+                'latitude': lat,
+                'longitude': lon,
+                'filename': self._register_file(image.image, 'images'),
+            })
+        return serialized
+
+    def _serialize_attachments(self, attachments):
+        return [
+            {'name': attachment.name, 'filename': self._register_file(attachment.file, 'attachments')}
+            for attachment in attachments
+        ]
+
+    def _remember_primary_images(self, images, reference):
+        for image_index, image in enumerate(images):
+            if image.id in self._primary_image_refs:
+                self._primary_image_refs[image.id] = {
+                    **reference,
+                    'image_index': image_index,
+                    'immich_id': image.immich_id,
+                    'filename': _basename(image.image.name) if image.image else None,
+                }
+
+    # --------------------------------------------------------------- entities
+
+    def _location_queryset(self):
+        activities = Activity.objects.select_related('trail').order_by('pk')
+        visits = Visit.objects.order_by('pk').prefetch_related(
+            Prefetch('activities', queryset=activities), 'images', 'attachments',
+        )
+        return (
+            Location.objects.filter(user=self.user)
+            .select_related('category')
+            .prefetch_related(
+                Prefetch('visits', queryset=visits),
+                'trails',
+                'images',
+                'attachments',
+                Prefetch('collections', queryset=Collection.objects.only('id')),
+            )
+            .order_by('pk')
+        )
+
+    def _serialize_activity(self, activity):
+        return {
+            'name': activity.name,
+            'sport_type': activity.sport_type,
+            'distance': _float_or_none(activity.distance),
+            'moving_time': _seconds_or_none(activity.moving_time),
+            'elapsed_time': _seconds_or_none(activity.elapsed_time),
+            'rest_time': _seconds_or_none(activity.rest_time),
+            'elevation_gain': _float_or_none(activity.elevation_gain),
+            'elevation_loss': _float_or_none(activity.elevation_loss),
+            'elev_high': _float_or_none(activity.elev_high),
+            'elev_low': _float_or_none(activity.elev_low),
+            'start_date': _iso(activity.start_date),
+            'start_date_local': _iso(activity.start_date_local),
+            'timezone': activity.timezone,
+            'average_speed': _float_or_none(activity.average_speed),
+            'max_speed': _float_or_none(activity.max_speed),
+            'average_cadence': _float_or_none(activity.average_cadence),
+            'calories': _float_or_none(activity.calories),
+            'start_lat': _coord_float(activity.start_point, 0),
+            'start_lng': _coord_float(activity.start_point, 1),
+            'end_lat': _coord_float(activity.end_point, 0),
+            'end_lng': _coord_float(activity.end_point, 1),
+            'external_service_id': activity.external_service_id,
+            'trail_name': activity.trail.name if activity.trail else None,  # Link by trail name
+            'gpx_filename': self._register_file(activity.gpx_file, 'gpx'),
+        }
+
+    def _serialize_location(self, idx, location):
+        visits = []
+        for visit_idx, visit in enumerate(location.visits.all()):
+            images = list(visit.images.all())
+            visits.append({
+                'export_id': visit_idx,
+                'start_date': _iso(visit.start_date),
+                'end_date': _iso(visit.end_date),
+                'timezone': visit.timezone,
+                'notes': visit.notes,
+                'activities': [self._serialize_activity(activity) for activity in visit.activities.all()],
+                'images': self._serialize_images(images),
+                'attachments': self._serialize_attachments(visit.attachments.all()),
+            })
+            self._remember_primary_images(images, {
+                'content_type': 'visit',
+                'location_export_id': idx,
+                'visit_export_id': visit_idx,
+            })
+
+        images = list(location.images.all())
+        self._remember_primary_images(images, {'content_type': 'location', 'location_export_id': idx})
+        return {
+            'export_id': idx,
+            'name': location.name,
+            'location': location.location,
+            'tags': location.tags,
+            'description': location.description,
+            'rating': location.rating,
+            'price': str(location.price.amount) if location.price else None,
+            'price_currency': str(location.price.currency) if location.price else None,
+            'link': location.link,
+            'is_public': location.is_public,
+            'longitude': _coord_str(location.coordinates, 1),
+            'latitude': _coord_str(location.coordinates, 0),
+            'city': location.city_id,
+            'region': location.region_id,
+            'country': location.country_id,
+            'category_name': location.category.name if location.category else None,
+            'collection_export_ids': [
+                self._collection_export_ids[collection.id]
+                for collection in location.collections.all()
+                if collection.id in self._collection_export_ids
+            ],
+            'visits': visits,
+            'trails': [serialize_trail(trail) for trail in location.trails.all()],
+            'images': self._serialize_images(images),
+            'attachments': self._serialize_attachments(location.attachments.all()),
+        }
+
+    def _serialize_transportation(self, idx, transport):
+        images = list(transport.images.all())
+        self._remember_primary_images(images, {'content_type': 'transportation', 'object_export_id': idx})
+        return {
+            'export_id': idx,
+            'type': transport.type,
+            'name': transport.name,
+            'description': transport.description,
+            'rating': transport.rating,
+            'price': str(transport.price.amount) if transport.price else None,
+            'price_currency': str(transport.price.currency) if transport.price else None,
+            'link': transport.link,
+            'date': _iso(transport.date),
+            'end_date': _iso(transport.end_date),
+            'start_timezone': transport.start_timezone,
+            'end_timezone': transport.end_timezone,
+            'flight_number': transport.flight_number,
+            'from_location': transport.from_location,
+            'origin_latitude': _coord_str(transport.origin, 0),
+            'origin_longitude': _coord_str(transport.origin, 1),
+            'destination_latitude': _coord_str(transport.destination, 0),
+            'destination_longitude': _coord_str(transport.destination, 1),
+            'to_location': transport.to_location,
+            'is_public': transport.is_public,
+            'collection_export_id': self._collection_export_ids.get(transport.collection_id),
+            'images': self._serialize_images(images),
+            'attachments': self._serialize_attachments(transport.attachments.all()),
+        }
+
+    def _serialize_note(self, idx, note):
+        images = list(note.images.all())
+        self._remember_primary_images(images, {'content_type': 'note', 'object_export_id': idx})
+        return {
+            'export_id': idx,
+            'name': note.name,
+            'content': note.content,
+            'links': note.links,
+            'date': _iso(note.date),
+            'is_public': note.is_public,
+            'collection_export_id': self._collection_export_ids.get(note.collection_id),
+            'images': self._serialize_images(images),
+            'attachments': self._serialize_attachments(note.attachments.all()),
+        }
+
+    def _serialize_checklist(self, idx, checklist):
+        return {
+            'export_id': idx,
+            'name': checklist.name,
+            'date': _iso(checklist.date),
+            'is_public': checklist.is_public,
+            'collection_export_id': self._collection_export_ids.get(checklist.collection_id),
+            'items': [
+                {'name': item.name, 'is_checked': item.is_checked}
+                for item in checklist.checklistitem_set.all()
+            ],
+        }
+
+    def _serialize_lodging(self, idx, lodging):
+        images = list(lodging.images.all())
+        self._remember_primary_images(images, {'content_type': 'lodging', 'object_export_id': idx})
+        return {
+            'export_id': idx,
+            'name': lodging.name,
+            'type': lodging.type,
+            'description': lodging.description,
+            'rating': lodging.rating,
+            'link': lodging.link,
+            'check_in': _iso(lodging.check_in),
+            'check_out': _iso(lodging.check_out),
+            'timezone': lodging.timezone,
+            'reservation_number': lodging.reservation_number,
+            'price': str(lodging.price.amount) if lodging.price else None,
+            'price_currency': str(lodging.price.currency) if lodging.price else None,
+            'latitude': _coord_str(lodging.coordinates, 0),
+            'longitude': _coord_str(lodging.coordinates, 1),
+            'location': lodging.location,
+            'is_public': lodging.is_public,
+            'collection_export_id': self._collection_export_ids.get(lodging.collection_id),
+            'images': self._serialize_images(images),
+            'attachments': self._serialize_attachments(lodging.attachments.all()),
+        }
+
+    def _serialize_collection(self, collection):
+        data = {
+            'export_id': self._collection_export_ids[collection.id],
+            'name': collection.name,
+            'description': collection.description,
+            'is_public': collection.is_public,
+            'start_date': _iso(collection.start_date),
+            'end_date': _iso(collection.end_date),
+            'is_archived': collection.is_archived,
+            'link': collection.link,
+            'shared_with_user_ids': [str(user.uuid) for user in collection.shared_with.all()],
+        }
+        reference = self._primary_image_refs.get(collection.primary_image_id)
+        if reference:
+            data['primary_image'] = reference
+        return data
+
+    def _iter_sections(self):
+        """Yield (section key, iterator of JSON-ready items)."""
+        user = self.user
+        export_ids = {}
+
+        def numbered(model, queryset, serialize):
+            ids = export_ids[model] = {}
+            for idx, obj in enumerate(queryset.iterator(chunk_size=QUERY_CHUNK_SIZE)):
+                ids[obj.id] = idx
+                yield serialize(idx, obj)
+
+        yield 'visited_cities', (
+            {'city': city_id}
+            for city_id in user.visitedcity_set.order_by('pk').values_list('city_id', flat=True).iterator()
+        )
+        yield 'visited_regions', (
+            {'region': region_id}
+            for region_id in user.visitedregion_set.order_by('pk').values_list('region_id', flat=True).iterator()
+        )
+        yield 'categories', (
+            {'name': name, 'display_name': display_name, 'icon': icon}
+            for name, display_name, icon in user.category_set.order_by('pk').values_list('name', 'display_name', 'icon')
+        )
+        yield 'locations', numbered(Location, self._location_queryset(), self._serialize_location)
+
+        generic = ('images', 'attachments')
+        yield 'transportation', numbered(
+            Transportation,
+            Transportation.objects.filter(user=user).prefetch_related(*generic).order_by('pk'),
+            self._serialize_transportation,
+        )
+        yield 'notes', numbered(
+            Note,
+            Note.objects.filter(user=user).prefetch_related(*generic).order_by('pk'),
+            self._serialize_note,
+        )
+        yield 'checklists', numbered(
+            Checklist,
+            Checklist.objects.filter(user=user).prefetch_related(
+                Prefetch('checklistitem_set', queryset=ChecklistItem.objects.order_by('pk'))
+            ).order_by('pk'),
+            self._serialize_checklist,
+        )
+        yield 'lodging', numbered(
+            Lodging,
+            Lodging.objects.filter(user=user).prefetch_related(*generic).order_by('pk'),
+            self._serialize_lodging,
+        )
+        # Written after every image owner so primary image references are resolved.
+        yield 'collections', (
+            self._serialize_collection(collection)
+            for collection in self._collections().prefetch_related('shared_with').iterator(
+                chunk_size=QUERY_CHUNK_SIZE
+            )
+        )
+        yield 'itinerary_items', self._iter_itinerary_items(export_ids)
+
+    def _iter_itinerary_items(self, export_ids):
+        models = {
+            'location': Location,
+            'transportation': Transportation,
+            'note': Note,
+            'lodging': Lodging,
+            'checklist': Checklist,
+        }
+        items = (
+            CollectionItineraryItem.objects.filter(collection__user=self.user)
+            .select_related('content_type')
+            .order_by('collection_id', 'date', 'order')
+        )
+        for item in items.iterator(chunk_size=QUERY_CHUNK_SIZE):
+            content_type = item.content_type.model
+            model = models.get(content_type)
+            reference = export_ids.get(model, {}).get(item.object_id) if model else None
+            if reference is None:
+                continue
+            yield {
+                'collection_export_id': self._collection_export_ids[item.collection_id],
+                'content_type': content_type,
+                'item_reference': reference,
+                'date': _iso(item.date),
+                'is_global': item.is_global,
+                'order': item.order,
+            }
+
+    def _collections(self):
+        return Collection.objects.filter(user=self.user).order_by('pk')
+
+    # ----------------------------------------------------------------- output
+
+    def _write_data(self, zip_file) -> Iterator[None]:
+        self.stage = 'data'
+        collection_ids = list(self._collections().values_list('id', flat=True))
+        self._collection_export_ids = {collection_id: idx for idx, collection_id in enumerate(collection_ids)}
+        self._primary_image_refs = {
+            image_id: None
+            for image_id in self._collections().exclude(primary_image=None).values_list('primary_image_id', flat=True)
+        }
+
+        with zip_file.open('data.json', 'w', force_zip64=True) as raw:
+            handle = io.TextIOWrapper(raw, encoding='utf-8', write_through=True)
+            writer = _JsonObjectWriter(handle)
+            writer.value('version', settings.ADVENTURELOG_RELEASE_VERSION)
+            writer.value('export_date', datetime.now().isoformat())
+            writer.value('user_email', self.user.email)
+            writer.value('user_username', self.user.username)
+            for key, items in self._iter_sections():
+                writer.begin_array(key)
+                for item in items:
+                    writer.item(item)
+                    self.entities += 1
+                    yield
+                writer.end_array()
+            writer.close()
+            handle.detach()
+        yield
+
+    def _open_sources(self):
+        """Yield (storage name, archive name, readable file or None) in registration order."""
+        files = list(self._files.items())
+
+        def open_local(name):
+            try:
+                return default_storage.open(name, 'rb')
+            except Exception:
+                logger.warning("Backup export could not open %s", name, exc_info=True)
+                return None
+
+        if not getattr(settings, 'USE_S3_MEDIA', False):
+            for name, arcname in files:
+                yield name, arcname, open_local(name)
+            return
+
+        def download(name):
+            # Buffer the object locally (memory for small files) so the next
+            # downloads can proceed while this one is compressed.
+            buffer = tempfile.SpooledTemporaryFile(max_size=READ_AHEAD_SPOOL_BYTES)
+            try:
+                with default_storage.open(name, 'rb') as source:
+                    shutil.copyfileobj(source, buffer, CHUNK_SIZE)
+            except Exception:
+                buffer.close()
+                logger.warning("Backup export could not download %s", name, exc_info=True)
+                return None
+            buffer.seek(0)
+            return buffer
+
+        workers = max(1, int(getattr(settings, 'BACKUP_EXPORT_READ_WORKERS', 4)))
+        window = workers * 2
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for name, arcname in files:
+                pending.append((name, arcname, pool.submit(download, name)))
+                if len(pending) >= window:
+                    name, arcname, future = pending.popleft()
+                    yield name, arcname, future.result()
+            while pending:
+                name, arcname, future = pending.popleft()
+                yield name, arcname, future.result()
+
+    def _write_files(self, zip_file) -> Iterator[None]:
+        self.stage = 'files'
+        for name, arcname, source in self._open_sources():
+            if source is None:
+                continue
+            try:
+                with source, zip_file.open(arcname, 'w', force_zip64=True) as target:
+                    while True:
+                        chunk = source.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        self.bytes_written += len(chunk)
+                        yield
+            except Exception:
+                logger.warning("Backup export failed to add %s", name, exc_info=True)
+            self.entities += 1
+
+    def iter_write(self, zip_file) -> Iterator[None]:
+        """Write the backup into ``zip_file``, yielding after each entity or file chunk."""
+        yield from self._write_data(zip_file)
+        yield from self._write_files(zip_file)
+        self.stage = 'done'
+
+    def write(self, zip_file) -> None:
+        for _ in self.iter_write(zip_file):
+            pass
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target that hands bytes to the streaming response."""
+
+    def __init__(self):
+        self._chunks = []
+        self.pending = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self.pending = 0
+        return data
+
+
+def stream_backup(user, *, min_chunk: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the backup ZIP for ``user`` as it is produced."""
+    sink = _ChunkSink()
+    exporter = BackupExporter(user)
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
+        for _ in exporter.iter_write(zip_file):
+            if sink.pending >= min_chunk:
+                yield sink.drain()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def backup_filename(user, when: Optional[datetime] = None) -> str:
+    when = when or datetime.now()
+    return f"adventurelog_backup_{user.username}_{when.strftime('%Y%m%d_%H%M%S')}.zip"
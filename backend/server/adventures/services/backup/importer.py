@@ -0,0 +1,935 @@
+"""
+Bulk account backup import.
+
+Rows from ``data.json`` are built in memory and written with ``bulk_create``
+per model, in dependency order, instead of being saved one at a time:
+
+* reference data (cities, regions, countries and the users collections are
+  shared with) is looked up once per import and kept in dicts,
+* pending rows are flushed in batches, and also whenever the files attached
+  to them (images, attachments, GPX tracks) exceed a byte budget, so memory
+  stays bounded for large archives,
+* many-to-many and generic relations are written as plain rows, and the side
+  effects of ``Location.save`` and the collection publicity signal are applied
+  while the rows are built,
+* only locations whose region, city and country are all unknown are queued
+  for reverse geocoding.
+
+The import is split into stages that can each be committed on their own, so
+a background job can resume a failed import from the last completed stage
+(see ``adventures.services.backup.jobs``). Bulk inserts don't send
+``post_save``, so the dashboards of affected users are invalidated after each
+stage instead.
+"""
+import logging
+import re
+import uuid
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from adventures.models import (
+    Activity, Category, Checklist, ChecklistItem, Collection, CollectionItineraryItem,
+    ContentAttachment, ContentImage, Location, Lodging, Note, Trail, Transportation, Visit,
+)
+from adventures.services.dashboard_cache import collection_member_ids, mark_user_data_changed
+from adventures.services.geocoding.queue import enqueue_location_geocodes
+from adventures.services.images.metadata import build_content_image
+from adventures.services.images.variants import queue_variants
+from adventures.utils.geo import has_coordinates, make_point
+from users.media_usage import reconcile_media_usage
+from worldtravel.models import City, Country, Region, VisitedCity, VisitedRegion
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+MAX_PENDING_FILE_BYTES = 64 * 1024 * 1024
+
+SUMMARY_KEYS = (
+    'categories', 'collections', 'locations', 'transportation', 'notes', 'checklists',
+    'checklist_items', 'lodging', 'images', 'attachments', 'visited_cities', 'visited_regions',
+    'trails', 'trails_skipped', 'activities', 'gpx_files', 'itinerary_items',
+)
+
+
+def _normalize_money_amount(value):
+    """Return a Decimal amount from legacy or canonical backup values."""
+    if value is None:
+        return None
+
+    if isinstance(value, Decimal):
+        return value
+
+    if isinstance(value, (int, float)):
+        try:
+            return Decimal(str(value))
+        except (InvalidOperation, ValueError):
+            return None
+
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip()
+    if not text:
+        return None
+
+    # Accept values like "$1,553.59" and "USD 1,553.59".
+    cleaned = re.sub(r'[^0-9,\.\-]', '', text)
+    if not cleaned:
+        return None
+
+    if ',' in cleaned and '.' in cleaned:
+        if cleaned.rfind(',') > cleaned.rfind('.'):
+            cleaned = cleaned.replace('.', '').replace(',', '.')
+        else:
+            cleaned = cleaned.replace(',', '')
+    elif ',' in cleaned:
+        parts = cleaned.split(',')
+        if len(parts) == 2 and len(parts[-1]) in (1, 2):
+            cleaned = cleaned.replace(',', '.')
+        else:
+            cleaned = cleaned.replace(',', '')
+
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+def parse_money(value, currency=None, default_currency='USD'):
+    """Parse a backup money value and return schema-safe (amount, currency)."""
+    parsed_currency = currency
+    parsed_value = value
+
+    if isinstance(value, dict):
+        parsed_value = value.get('amount')
+        parsed_currency = parsed_currency or value.get('currency')
+
+    amount = _normalize_money_amount(parsed_value)
+    if amount is None:
+        # django-money stores currency in a separate non-null column even when
+        # the monetary amount itself is empty, so imports must preserve a
+        # default currency for blank legacy values.
+        return None, default_currency
+
+    normalized_currency = (parsed_currency or default_currency)
+    if isinstance(normalized_currency, str):
+        normalized_currency = normalized_currency.strip().upper() or default_currency
+    else:
+        normalized_currency = default_currency
+
+    return amount, normalized_currency
+
+
+def _optional_str(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def parse_trail_import(trail_data):
+    """
+    Parse trail JSON from backup. Old backups only have name/link/wanderer_id;
+    author username/domain are optional and backfilled on read when missing.
+    """
+    if not isinstance(trail_data, dict):
+        return None
+
+    name = _optional_str(trail_data.get('name'))
+    if not name:
+        return None
+
+    link = _optional_str(trail_data.get('link'))
+    wanderer_id = _optional_str(trail_data.get('wanderer_id'))
+    if not link and not wanderer_id:
+        return None
+
+    domain = _optional_str(trail_data.get('wanderer_author_domain'))
+    if domain:
+        domain = domain.lstrip('@')
+
+    return {
+        'name': name,
+        'link': link,
+        'wanderer_id': wanderer_id,
+        'wanderer_author_username': _optional_str(trail_data.get('wanderer_author_username')),
+        'wanderer_author_domain': domain,
+        'created_at': trail_data.get('created_at'),
+    }
+
+
+def _seconds_to_duration(value):
+    return timedelta(seconds=value) if value is not None else None
+
+
+def _existing_pks(model, values) -> dict:
+    """Map ``str(pk)`` to the stored pk for each of ``values`` that exists."""
+    pk_field = model._meta.pk
+    candidates = set()
+    for value in values:
+        if value in (None, ''):
+            continue
+        try:
+            candidates.add(pk_field.to_python(value))
+        except ValidationError:
+            continue
+    if not candidates:
+        return {}
+    pks = model._default_manager.filter(pk__in=candidates).values_list('pk', flat=True)
+    return {str(pk): pk for pk in pks}
+
+
+def _lookup(pks: dict, value):
+    return pks.get(str(value)) if value else None
+
+
+def _through_row(relation, source_id, target_id):
+    """An unsaved row of an auto-created many-to-many ``through`` table."""
+    field = relation.field
+    return relation.through(**{
+        f'{field.m2m_field_name()}_id': source_id,
+        f'{field.m2m_reverse_field_name()}_id': target_id,
+    })
+
+
+def _prepare_image(image):
+    """Apply ``ContentImage.save``'s normalisation and validation without its per-row queries."""
+    if not image.image:
+        image.image = None
+    if not image.immich_id or not str(image.immich_id).strip():
+        image.immich_id = None
+    image.full_clean(exclude=['user', 'content_type'], validate_unique=False, validate_constraints=False)
+
+
+def clear_user_data(user):
+    """Clear all existing user data before import"""
+    # Delete itinerary items first (they reference collections and content)
+    CollectionItineraryItem.objects.filter(collection__user=user).delete()
+
+    # Delete in reverse order of dependencies
+    user.activity_set.all().delete()  # Delete activities first
+    user.trail_set.all().delete()     # Delete trails
+    user.checklistitem_set.all().delete()
+    user.checklist_set.all().delete()
+    user.note_set.all().delete()
+    user.transportation_set.all().delete()
+    user.lodging_set.all().delete()
+
+    # Delete location-related data
+    user.contentimage_set.all().delete()
+    user.contentattachment_set.all().delete()
+    # Visits are deleted via cascade when locations are deleted
+    user.location_set.all().delete()
+
+    # Delete collections and categories last
+    user.collection_set.all().delete()
+    user.category_set.all().delete()
+
+    # Clear visited cities and regions
+    user.visitedcity_set.all().delete()
+    user.visitedregion_set.all().delete()
+
+
+class _BulkWriter:
+    """
+    Buffers unsaved rows and inserts them with one ``bulk_create`` per model.
+
+    Models are flushed in the order given to the constructor, which lists
+    parents before children. A flush also happens once ``BATCH_SIZE`` rows or
+    ``MAX_PENDING_FILE_BYTES`` of file content are pending; file fields are
+    written to storage as part of the insert.
+    """
+
+    def __init__(self, models, on_flush=None):
+        self._pending = {model: [] for model in models}
+        self._rows = 0
+        self._file_bytes = 0
+        self._on_flush = on_flush
+        self.written = 0
+
+    def add(self, obj, file_bytes=0):
+        self._pending[type(obj)].append(obj)
+        self._rows += 1
+        self._file_bytes += file_bytes
+        if self._rows >= BATCH_SIZE or self._file_bytes >= MAX_PENDING_FILE_BYTES:
+            self.flush()
+
+    def flush(self):
+        for model, objs in self._pending.items():
+            if objs:
+                model._default_manager.bulk_create(objs)
+                objs.clear()
+        self.written += self._rows
+        self._rows = 0
+        self._file_bytes = 0
+        if self._on_flush is not None:
+            self._on_flush()
+
+
+def _encode_pairs(mapping):
+    return [[key, str(pk)] for key, pk in mapping.items()]
+
+
+def _decode_pairs(pairs):
+    return {key: uuid.UUID(pk) for key, pk in pairs}
+
+
+class BackupImporter:
+    """
+    Imports a parsed backup into ``user``'s account; see the module docstring.
+
+    The import runs in ``STAGES``, each of which depends only on the rows
+    written by earlier ones. ``run`` executes them all inside the caller's
+    transaction. A background job can instead run and commit one stage at a
+    time, storing ``checkpoint()`` after each; passing that checkpoint back in
+    resumes the import at the next stage.
+
+    ``on_progress`` is called with the importer after every batch of rows.
+    """
+
+    STAGES = ('clear', 'references', 'locations', 'collection_items', 'relations')
+    FILE_STAGES = ('locations', 'collection_items')
+    OBJECT_MODELS = {
+        'location': Location,
+        'transportation': Transportation,
+        'note': Note,
+        'checklist': Checklist,
+        'lodging': Lodging,
+    }
+
+    def __init__(self, user, zip_file, checkpoint=None, on_progress=None):
+        self.user = user
+        self.zip_file = zip_file
+        self.stage = None
+        self.summary = dict.fromkeys(SUMMARY_KEYS, 0)
+        self.bytes_read = 0
+        self._on_progress = on_progress
+        self._writer = _BulkWriter([
+            VisitedCity,
+            VisitedRegion,
+            Category,
+            Collection,
+            Collection.shared_with.through,
+            Location,
+            Location.collections.through,
+            Trail,
+            Visit,
+            Activity,
+            Transportation,
+            Note,
+            Checklist,
+            ChecklistItem,
+            Lodging,
+            ContentImage,
+            ContentAttachment,
+            CollectionItineraryItem,
+        ], on_flush=self._report_progress)
+        self._content_types = ContentType.objects.get_for_models(Visit, *self.OBJECT_MODELS.values())
+        self._references = None
+        self._cities = {}
+        self._regions = {}
+        self._countries = {}
+        self._shareable_users = {}
+        self._trail_name_map = {}  # (location id, trail name) -> Trail
+        self._uploaded_image_ids = []  # images written this stage that need variants
+
+        # Everything below maps backup references to primary keys and is
+        # carried between stages by checkpoint().
+        self._general_category_id = None
+        self._category_ids = {}  # category name -> pk
+        self._collection_ids = {}  # collection export_id -> pk
+        self._public_collection_ids = set()
+        self._object_ids = {key: {} for key in self.OBJECT_MODELS}
+        self._image_ids = {}  # (content type, export reference) -> image pks in backup order
+        if checkpoint:
+            self._restore(checkpoint)
+
+    @property
+    def entities(self) -> int:
+        return self._writer.written
+
+    def run(self, backup_data) -> dict:
+        for stage in self.STAGES:
+            self.run_stage(stage, backup_data)
+        return self.summary
+
+    def run_stage(self, stage, backup_data) -> None:
+        if stage not in self.STAGES:
+            raise ValueError(f'Unknown import stage: {stage}')
+        self.stage = stage
+        getattr(self, f'_stage_{stage}')(backup_data)
+        self._writer.flush()
+        # Bulk inserts skip post_save, so invalidate affected dashboards here.
+        mark_user_data_changed({self.user.id} | collection_member_ids(self._collection_ids.values()))
+        if stage in self.FILE_STAGES:
+            # Nor do they reach the media usage ledger; sizes not set below
+            # (images are re-encoded on save) are read back from storage.
+            reconcile_media_usage(self.user)
+            # And their variants aren't queued by post_save either.
+            image_ids, self._uploaded_image_ids = self._uploaded_image_ids, []
+            if image_ids:
+                transaction.on_commit(lambda: queue_variants(image_ids))
+
+    def next_stage(self, completed_stage):
+        """The stage to run after ``completed_stage`` (None: start), or None when done."""
+        if completed_stage is None:
+            return self.STAGES[0]
+        index = self.STAGES.index(completed_stage) + 1
+        return self.STAGES[index] if index < len(self.STAGES) else None
+
+    def checkpoint(self) -> dict:
+        """JSON-serialisable state needed to continue after the current stage."""
+        return {
+            'summary': self.summary,
+            'entities': self.entities,
+            'bytes_read': self.bytes_read,
+            'general_category_id': str(self._general_category_id) if self._general_category_id else None,
+            'category_ids': _encode_pairs(self._category_ids),
+            'collection_ids': _encode_pairs(self._collection_ids),
+            'public_collection_ids': [str(pk) for pk in self._public_collection_ids],
+            'object_ids': {key: _encode_pairs(ids) for key, ids in self._object_ids.items()},
+            'image_ids': [
+                [content_type, reference, [str(pk) for pk in pks]]
+                for (content_type, reference), pks in self._image_ids.items()
+            ],
+        }
+
+    def _restore(self, checkpoint):
+        self.summary.update(checkpoint.get('summary', {}))
+        self._writer.written = checkpoint.get('entities', 0)
+        self.bytes_read = checkpoint.get('bytes_read', 0)
+        general = checkpoint.get('general_category_id')
+        self._general_category_id = uuid.UUID(general) if general else None
+        self._category_ids = _decode_pairs(checkpoint.get('category_ids', []))
+        self._collection_ids = _decode_pairs(checkpoint.get('collection_ids', []))
+        self._public_collection_ids = {uuid.UUID(pk) for pk in checkpoint.get('public_collection_ids', [])}
+        for key, pairs in checkpoint.get('object_ids', {}).items():
+            self._object_ids[key] = _decode_pairs(pairs)
+        for content_type, reference, pks in checkpoint.get('image_ids', []):
+            # JSON turns the (location, visit) reference tuple into a list.
+            if isinstance(reference, list):
+                reference = tuple(reference)
+            self._image_ids[(content_type, reference)] = [uuid.UUID(pk) for pk in pks]
+
+    def _report_progress(self):
+        if self._on_progress is not None:
+            self._on_progress(self)
+
+    # -- stages -----------------------------------------------------------
+
+    def _stage_clear(self, backup_data):
+        clear_user_data(self.user)
+
+    def _stage_references(self, backup_data):
+        self._load_references(backup_data)
+        self._import_visited(backup_data)
+        for cat_data in backup_data.get('categories', []):
+            self._add_category(cat_data)
+        for col_data in backup_data.get('collections', []):
+            self._add_collection(col_data)
+
+    def _stage_locations(self, backup_data):
+        self._load_references(backup_data)
+        geocode_location_ids = []
+        for adv_data in backup_data.get('locations', []):
+            location = self._add_location(adv_data)
+            # Rows that already carry their place don't need reverse geocoding.
+            if has_coordinates(location.coordinates) and not (
+                location.city_id or location.region_id or location.country_id
+            ):
+                geocode_location_ids.append(location.id)
+        self._writer.flush()
+        enqueue_location_geocodes(geocode_location_ids)
+
+    def _stage_collection_items(self, backup_data):
+        for trans_data in backup_data.get('transportation', []):
+            self._add_transportation(trans_data)
+        for note_data in backup_data.get('notes', []):
+            self._add_note(note_data)
+        for check_data in backup_data.get('checklists', []):
+            self._add_checklist(check_data)
+        for lodg_data in backup_data.get('lodging', []):
+            self._add_lodging(lodg_data)
+
+    def _stage_relations(self, backup_data):
+        self._apply_primary_images(backup_data)
+        for itinerary_data in backup_data.get('itinerary_items', []):
+            self._add_itinerary_item(itinerary_data)
+
+    # -- reference data ---------------------------------------------------
+
+    def _load_references(self, backup_data):
+        if self._references is backup_data:
+            return
+        self._references = backup_data
+        locations = backup_data.get('locations', [])
+        self._cities = _existing_pks(City, [
+            *(item.get('city') for item in backup_data.get('visited_cities', [])),
+            *(item.get('city') for item in locations),
+        ])
+        self._regions = _existing_pks(Region, [
+            *(item.get('region') for item in backup_data.get('visited_regions', [])),
+            *(item.get('region') for item in locations),
+        ])
+        self._countries = _existing_pks(Country, [item.get('country') for item in locations])
+
+        shared_uuids = set()
+        for col_data in backup_data.get('collections', []):
+            for value in col_data.get('shared_with_user_ids', []):
+                try:
+                    shared_uuids.add(uuid.UUID(str(value)))
+                except ValueError:
+                    continue
+        if shared_uuids:
+            users = User.objects.filter(uuid__in=shared_uuids, public_profile=True)
+            self._shareable_users = {
+                str(user_uuid): user_id for user_uuid, user_id in users.values_list('uuid', 'id')
+            }
+
+    def _import_visited(self, backup_data):
+        for model, field, key, pks in (
+            (VisitedCity, 'city', 'visited_cities', self._cities),
+            (VisitedRegion, 'region', 'visited_regions', self._regions),
+        ):
+            seen = set(model.objects.filter(user=self.user).values_list(f'{field}_id', flat=True))
+            for item in backup_data.get(key, []):
+                pk = _lookup(pks, item.get(field))
+                if pk is None or pk in seen:
+                    continue
+                seen.add(pk)
+                self._writer.add(model(user=self.user, **{f'{field}_id': pk}))
+                self.summary[key] += 1
+
+    def _default_category_id(self):
+        # Location.save() falls back to the user's "general" category.
+        if self._general_category_id is None:
+            self._general_category_id = self._category_ids.get('general')
+        if self._general_category_id is None:
+            category, _ = Category.objects.get_or_create(
+                user=self.user,
+                name='general',
+                defaults={'display_name': 'General', 'icon': '🌍'},
+            )
+            self._general_category_id = category.id
+        return self._general_category_id
+
+    # -- files ------------------------------------------------------------
+
+    def _read_file(self, folder, filename):
+        if not filename:
+            return None
+        try:
+            content = self.zip_file.read(f'{folder}/{filename}')
+        except KeyError:
+            return None
+        self.bytes_read += len(content)
+        return content
+
+    def _add_images(self, images_data, model, object_id, reference=None):
+        created = []
+        for img_data in images_data or []:
+            img_data = img_data or {}
+            immich_id = img_data.get('immich_id')
+            coordinates = make_point(img_data.get('longitude'), img_data.get('latitude'))
+            common = {
+                'user': self.user,
+                'content_type': self._content_types[model],
+                'object_id': object_id,
+                'is_primary': img_data.get('is_primary', False),
+                'source_url': img_data.get('source_url'),
+                'coordinates': coordinates,
+            }
+
+            file_bytes = 0
+            if immich_id:
+                image = build_content_image(
+                    immich_id=immich_id,
+                    explicit_source=img_data.get('source') or ContentImage.Source.IMMICH,
+                    **common,
+                )
+            else:
+                filename = img_data.get('filename')
+                content = self._read_file('images', filename)
+                if content is None:
+                    continue
+                image = build_content_image(
+                    image_file=ContentFile(content, name=filename),
+                    # EXIF coordinates would be overridden by the backup's own.
+                    file_bytes=content if coordinates is None else None,
+                    explicit_source=img_data.get('source'),
+                    **common,
+                )
+                file_bytes = len(content)
+
+            _prepare_image(image)
+            self._writer.add(image, file_bytes=file_bytes)
+            created.append(image.id)
+            if file_bytes:
+                self._uploaded_image_ids.append(image.id)
+            self.summary['images'] += 1
+
+        if reference is not None:
+            self._image_ids.setdefault(reference, []).extend(created)
+
+    def _add_attachments(self, attachments_data, model, object_id):
+        for att_data in attachments_data or []:
+            att_data = att_data or {}
+            filename = att_data.get('filename')
+            content = self._read_file('attachments', filename)
+            if content is None:
+                continue
+            attachment = ContentAttachment(
+                user=self.user,
+                file=ContentFile(content, name=filename),
+                file_size=len(content),
+                name=att_data.get('name'),
+                content_type=self._content_types[model],
+                object_id=object_id,
+            )
+            self._writer.add(attachment, file_bytes=len(content))
+            self.summary['attachments'] += 1
+
+    # -- entities ---------------------------------------------------------
+
+    def _add_category(self, cat_data):
+        category = Category(
+            user=self.user,
+            name=cat_data['name'],
+            display_name=cat_data['display_name'],
+            icon=cat_data.get('icon', '🌍'),
+        )
+        self._writer.add(category)
+        self._category_ids[cat_data['name']] = category.id
+        self.summary['categories'] += 1
+
+    def _add_collection(self, col_data):
+        collection = Collection(
+            user=self.user,
+            name=col_data['name'],
+            description=col_data.get('description', ''),
+            is_public=col_data.get('is_public', False),
+            start_date=col_data.get('start_date'),
+            end_date=col_data.get('end_date'),
+            is_archived=col_data.get('is_archived', False),
+            link=col_data.get('link'),
+        )
+        self._writer.add(collection)
+        self._collection_ids[col_data['export_id']] = collection.id
+        if collection.is_public:
+            self._public_collection_ids.add(collection.id)
+        self.summary['collections'] += 1
+
+        shared_ids = set()
+        for user_uuid in col_data.get('shared_with_user_ids', []):
+            user_id = self._shareable_users.get(str(user_uuid))
+            if user_id is not None and user_id not in shared_ids:
+                shared_ids.add(user_id)
+                self._writer.add(_through_row(Collection.shared_with, collection.id, user_id))
+
+    def _add_location(self, adv_data):
+        export_id = adv_data['export_id']
+        price, price_currency = parse_money(adv_data.get('price'), adv_data.get('price_currency'))
+
+        collection_ids = []
+        for collection_export_id in adv_data.get('collection_export_ids', []):
+            collection_id = self._collection_ids.get(collection_export_id)
+            if collection_id is not None and collection_id not in collection_ids:
+                collection_ids.append(collection_id)
+
+        is_public = adv_data.get('is_public', False)
+        if collection_ids:
+            # What update_adventure_publicity does when the location is added to them.
+            is_public = any(pk in self._public_collection_ids for pk in collection_ids)
+
+        location = Location(
+            user=self.user,
+            name=adv_data['name'],
+            location=adv_data.get('location'),
+            tags=adv_data.get('tags', []),
+            description=adv_data.get('description'),
+            rating=adv_data.get('rating'),
+            price=price,
+            price_currency=price_currency,
+            link=adv_data.get('link'),
+            is_public=is_public,
+            coordinates=make_point(adv_data.get('longitude'), adv_data.get('latitude')),
+            city_id=_lookup(self._cities, adv_data.get('city')),
+            region_id=_lookup(self._regions, adv_data.get('region')),
+            country_id=_lookup(self._countries, adv_data.get('country')),
+            category_id=self._category_ids.get(adv_data.get('category_name')) or self._default_category_id(),
+        )
+        self._writer.add(location)
+        self._object_ids['location'][export_id] = location.id
+        for collection_id in collection_ids:
+            self._writer.add(_through_row(Location.collections, location.id, collection_id))
+
+        # Trails first so activities can reference them by name
+        for trail_data in adv_data.get('trails', []):
+            self._add_trail(location, trail_data)
+
+        for visit_data in adv_data.get('visits', []):
+            visit = Visit(
+                location=location,
+                start_date=visit_data.get('start_date'),
+                end_date=visit_data.get('end_date'),
+                timezone=visit_data.get('timezone'),
+                notes=visit_data.get('notes'),
+            )
+            self._writer.add(visit)
+            for activity_data in visit_data.get('activities', []):
+                self._add_activity(location, visit, activity_data)
+
+            visit_export_id = visit_data.get('export_id')
+            self._add_images(
+                visit_data.get('images', []), Visit, visit.id,
+                reference=('visit', (export_id, visit_export_id)) if visit_export_id is not None else None,
+            )
+            self._add_attachments(visit_data.get('attachments', []), Visit, visit.id)
+
+        self._add_images(adv_data.get('images', []), Location, location.id, reference=('location', export_id))
+        self._add_attachments(adv_data.get('attachments', []), Location, location.id)
+        self.summary['locations'] += 1
+        return location
+
+    def _add_trail(self, location, trail_data):
+        parsed = parse_trail_import(trail_data)
+        if not parsed:
+            self.summary['trails_skipped'] += 1
+            return
+
+        trail = Trail(
+            user=self.user,
+            location=location,
+            name=parsed['name'],
+            link=parsed['link'],
+            wanderer_id=parsed['wanderer_id'],
+            wanderer_author_username=parsed['wanderer_author_username'],
+            wanderer_author_domain=parsed['wanderer_author_domain'],
+        )
+        if parsed['created_at']:
+            trail.created_at = parsed['created_at']
+
+        # Trail.save() runs full_clean(); skip only the checks that query per row.
+        try:
+            trail.full_clean(exclude=['user', 'location'], validate_unique=False, validate_constraints=False)
+        except ValidationError as exc:
+            logger.warning(
+                "Skipped trail import for location %s (%r): %s",
+                location.id,
+                parsed['name'],
+                exc,
+            )
+            self.summary['trails_skipped'] += 1
+            return
+
+        self._writer.add(trail)
+        self._trail_name_map[(location.id, parsed['name'])] = trail
+        self.summary['trails'] += 1
+
+    def _add_activity(self, location, visit, activity_data):
+        trail = None
+        if activity_data.get('trail_name'):
+            trail = self._trail_name_map.get((location.id, activity_data['trail_name']))
+
+        activity = Activity(
+            user=self.user,
+            visit=visit,
+            trail=trail,
+            name=activity_data['name'],
+            sport_type=activity_data.get('sport_type'),
+            distance=activity_data.get('distance'),
+            moving_time=_seconds_to_duration(activity_data.get('moving_time')),
+            elapsed_time=_seconds_to_duration(activity_data.get('elapsed_time')),
+            rest_time=_seconds_to_duration(activity_data.get('rest_time')),
+            elevation_gain=activity_data.get('elevation_gain'),
+            elevation_loss=activity_data.get('elevation_loss'),
+            elev_high=activity_data.get('elev_high'),
+            elev_low=activity_data.get('elev_low'),
+            start_date=activity_data.get('start_date'),
+            start_date_local=activity_data.get('start_date_local'),
+            timezone=activity_data.get('timezone'),
+            average_speed=activity_data.get('average_speed'),
+            max_speed=activity_data.get('max_speed'),
+            average_cadence=activity_data.get('average_cadence'),
+            calories=activity_data.get('calories'),
+            start_point=make_point(activity_data.get('start_lng'), activity_data.get('start_lat')),
+            end_point=make_point(activity_data.get('end_lng'), activity_data.get('end_lat')),
+            external_service_id=activity_data.get('external_service_id'),
+        )
+
+        file_bytes = 0
+        gpx_filename = activity_data.get('gpx_filename')
+        gpx_content = self._read_file('gpx', gpx_filename)
+        if gpx_content is not None:
+            activity.gpx_file = ContentFile(gpx_content, name=gpx_filename)
+            file_bytes = activity.gpx_file_size = len(gpx_content)
+            self.summary['gpx_files'] += 1
+
+        self._writer.add(activity, file_bytes=file_bytes)
+        self.summary['activities'] += 1
+
+    def _collection_id_for(self, data):
+        if data.get('collection_export_id') is None:
+            return None
+        return self._collection_ids.get(data['collection_export_id'])
+
+    def _add_collection_item(self, obj, data, key, summary_key, *, media=True):
+        """Queue a collection-level item (plus its images and attachments) and map its export_id."""
+        self._writer.add(obj)
+        export_id = data.get('export_id')
+        if media and export_id is not None:
+            model = type(obj)
+            self._add_images(data.get('images', []), model, obj.id, reference=(key, export_id))
+            self._add_attachments(data.get('attachments', []), model, obj.id)
+        # Only add to map if export_id exists (for backward compatibility with old backups)
+        if 'export_id' in data:
+            self._object_ids[key][data['export_id']] = obj.id
+        self.summary[summary_key] += 1
+
+    def _add_transportation(self, trans_data):
+        price, price_currency = parse_money(trans_data.get('price'), trans_data.get('price_currency'))
+        transportation = Transportation(
+            user=self.user,
+            type=trans_data['type'],
+            name=trans_data['name'],
+            description=trans_data.get('description'),
+            rating=trans_data.get('rating'),
+            price=price,
+            price_currency=price_currency,
+            link=trans_data.get('link'),
+            date=trans_data.get('date'),
+            end_date=trans_data.get('end_date'),
+            start_timezone=trans_data.get('start_timezone'),
+            end_timezone=trans_data.get('end_timezone'),
+            flight_number=trans_data.get('flight_number'),
+            from_location=trans_data.get('from_location'),
+            origin=make_point(trans_data.get('origin_longitude'), trans_data.get('origin_latitude')),
+            destination=make_point(
+                trans_data.get('destination_longitude'),
+                trans_data.get('destination_latitude'),
+            ),
+            to_location=trans_data.get('to_location'),
+            is_public=trans_data.get('is_public', False),
+            collection_id=self._collection_id_for(trans_data),
+        )
+        self._add_collection_item(transportation, trans_data, 'transportation', 'transportation')
+
+    def _add_note(self, note_data):
+        note = Note(
+            user=self.user,
+            name=note_data['name'],
+            content=note_data.get('content'),
+            links=note_data.get('links', []),
+            date=note_data.get('date'),
+            is_public=note_data.get('is_public', False),
+            collection_id=self._collection_id_for(note_data),
+        )
+        self._add_collection_item(note, note_data, 'note', 'notes')
+
+    def _add_checklist(self, check_data):
+        checklist = Checklist(
+            user=self.user,
+            name=check_data['name'],
+            date=check_data.get('date'),
+            is_public=check_data.get('is_public', False),
+            collection_id=self._collection_id_for(check_data),
+        )
+        self._add_collection_item(checklist, check_data, 'checklist', 'checklists', media=False)
+        for item_data in check_data.get('items', []):
+            self._writer.add(ChecklistItem(
+                user=self.user,
+                checklist=checklist,
+                name=item_data['name'],
+                is_checked=item_data.get('is_checked', False),
+            ))
+            self.summary['checklist_items'] += 1
+
+    def _add_lodging(self, lodg_data):
+        price, price_currency = parse_money(lodg_data.get('price'), lodg_data.get('price_currency'))
+        lodging = Lodging(
+            user=self.user,
+            name=lodg_data['name'],
+            type=lodg_data.get('type', 'other'),
+            description=lodg_data.get('description'),
+            rating=lodg_data.get('rating'),
+            link=lodg_data.get('link'),
+            check_in=lodg_data.get('check_in'),
+            check_out=lodg_data.get('check_out'),
+            timezone=lodg_data.get('timezone'),
+            reservation_number=lodg_data.get('reservation_number'),
+            price=price,
+            price_currency=price_currency,
+            coordinates=make_point(lodg_data.get('longitude'), lodg_data.get('latitude')),
+            location=lodg_data.get('location'),
+            is_public=lodg_data.get('is_public', False),
+            collection_id=self._collection_id_for(lodg_data),
+        )
+        self._add_collection_item(lodging, lodg_data, 'lodging', 'lodging')
+
+    # -- relations resolved after all rows exist ----------------------------
+
+    def _primary_image_candidates(self, data):
+        content_type = data.get('content_type') or 'location'
+        if content_type == 'location':
+            reference = data.get('location_export_id')
+        elif content_type == 'visit':
+            loc_export_id = data.get('location_export_id')
+            visit_export_id = data.get('visit_export_id')
+            if loc_export_id is None or visit_export_id is None:
+                return []
+            reference = (loc_export_id, visit_export_id)
+        elif content_type in ('transportation', 'note', 'lodging'):
+            reference = data.get('object_export_id')
+        else:
+            return []
+        if reference is None:
+            return []
+        return self._image_ids.get((content_type, reference), [])
+
+    def _apply_primary_images(self, backup_data):
+        updated = {}
+        for col_data in backup_data.get('collections', []):
+            data = col_data.get('primary_image')
+            collection_id = self._collection_ids.get(col_data.get('export_id'))
+            if not data or collection_id is None:
+                continue
+            img_index = data.get('image_index')
+            if img_index is None:
+                continue
+            image_ids = self._primary_image_candidates(data)
+            if 0 <= img_index < len(image_ids):
+                updated[collection_id] = Collection(id=collection_id, primary_image_id=image_ids[img_index])
+        Collection.objects.bulk_update(updated.values(), ['primary_image'], batch_size=BATCH_SIZE)
+
+    def _add_itinerary_item(self, itinerary_data):
+        collection_id = self._collection_ids.get(itinerary_data['collection_export_id'])
+        if not collection_id:
+            return
+
+        content_type_str = itinerary_data['content_type']
+        object_ids = self._object_ids.get(content_type_str)
+        if object_ids is None:
+            return
+        # item_reference is the export_id of the referenced object
+        object_id = object_ids.get(itinerary_data['item_reference'])
+        if object_id is None:
+            return
+
+        is_global = bool(itinerary_data.get('is_global', False))
+        self._writer.add(CollectionItineraryItem(
+            collection_id=collection_id,
+            content_type=self._content_types[self.OBJECT_MODELS[content_type_str]],
+            object_id=object_id,
+            date=itinerary_data.get('date') if not itinerary_data.get('is_global') else None,
+            is_global=is_global,
+            order=itinerary_data['order'],
+        ))
+        self.summary['itinerary_items'] += 1
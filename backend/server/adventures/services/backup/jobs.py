@@ -0,0 +1,415 @@
+"""
+Background backup export and import jobs.
+
+Requests only create a ``BackupJob`` row (plus, for imports, the uploaded
+archive in storage). The work is done by the ``backup_worker`` management
+command or a small in-process thread pool (``BACKUP_JOB_WORKERS``), the same
+arrangement as the geocode queue.
+
+* Exports write the ZIP to a temporary file with ``BackupExporter.iter_write``
+  and store it as the job's ``artifact`` for download.
+* Imports run ``BackupImporter`` one stage per transaction and save the
+  importer's checkpoint in the same transaction, so a failed or interrupted
+  job resumes at the stage after the last one that committed.
+
+Progress is saved on the row when a stage or job finishes. While a stage runs
+its transaction is still open, so live counters (and a worker heartbeat) are
+published to the cache instead and merged in by ``live_progress``.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from adventures.models import BackupJob
+from adventures.services.backup.export import CHUNK_SIZE, BackupExporter, backup_filename
+from adventures.services.backup.importer import BackupImporter
+from adventures.services.external_cache import build_cache_key
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_PREFIX = 'backup_job_progress_v1'
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+ACTIVE_STATUSES = (BackupJob.Status.PENDING, BackupJob.Status.RUNNING)
+
+
+class BackupJobError(Exception):
+    """A job failed for a reason that can be shown to its owner."""
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+# ---------------------------------------------------------------- progress
+
+def _progress_key(job_id) -> str:
+    return build_cache_key(PROGRESS_PREFIX, str(job_id))
+
+
+def live_progress(job) -> Dict[str, Any]:
+    """Stage and counters for ``job``, preferring the running worker's live values."""
+    progress = {
+        'stage': job.stage,
+        'entities_processed': job.entities_processed,
+        'bytes_processed': job.bytes_processed,
+    }
+    if job.status == BackupJob.Status.RUNNING:
+        live = cache.get(_progress_key(job.id))
+        if live:
+            progress.update({key: live[key] for key in progress if key in live})
+    return progress
+
+
+class _ProgressReporter:
+    """Publishes a running job's counters to the cache at most once a second."""
+
+    def __init__(self, job):
+        self.job = job
+        self._last = 0.0
+
+    def report(self, stage, entities, bytes_processed, force=False):
+        now = time.monotonic()
+        if not force and now - self._last < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last = now
+        cache.set(
+            _progress_key(self.job.id),
+            {
+                'stage': stage or '',
+                'entities_processed': entities,
+                'bytes_processed': bytes_processed,
+                'heartbeat': time.time(),
+            },
+            _setting('BACKUP_JOB_STALE_SECONDS', 1800) * 2,
+        )
+
+
+def _has_heartbeat(job_id) -> bool:
+    live = cache.get(_progress_key(job_id))
+    if not live:
+        return False
+    return time.time() - live.get('heartbeat', 0) < _setting('BACKUP_JOB_STALE_SECONDS', 1800)
+
+
+# ---------------------------------------------------------------- creating
+
+def has_active_job(user, kind=None) -> bool:
+    jobs = BackupJob.objects.filter(user=user, status__in=ACTIVE_STATUSES)
+    if kind is not None:
+        jobs = jobs.filter(kind=kind)
+    return jobs.exists()
+
+
+def _queue(job) -> bool:
+    """
+    Save a new job; False if the user already has one pending or running.
+
+    An import replaces the account an export would be reading, so the
+    ``one_active_backup_job_per_user`` constraint allows one job of either
+    kind at a time.
+    """
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return False
+    transaction.on_commit(notify_workers)
+    return True
+
+
+def create_export_job(user) -> Optional[BackupJob]:
+    job = BackupJob(user=user, kind=BackupJob.Kind.EXPORT)
+    return job if _queue(job) else None
+
+
+def create_import_job(user, upload) -> Optional[BackupJob]:
+    """Store the uploaded archive and queue its import."""
+    job = BackupJob(user=user, kind=BackupJob.Kind.IMPORT)
+    job.source.save(upload.name or 'backup.zip', upload, save=False)
+    if not _queue(job):
+        job.source.delete(save=False)
+        return None
+    return job
+
+
+def resume_job(job) -> bool:
+    """Queue a failed import again; it continues after its last completed stage."""
+    try:
+        with transaction.atomic():
+            resumed = BackupJob.objects.filter(
+                id=job.id, kind=BackupJob.Kind.IMPORT, status=BackupJob.Status.FAILED,
+            ).update(status=BackupJob.Status.PENDING, attempts=0, last_error=None, finished_at=None)
+    except IntegrityError:
+        # Another job of the user's became active meanwhile.
+        return False
+    if resumed:
+        transaction.on_commit(notify_workers)
+    return bool(resumed)
+
+
+# ---------------------------------------------------------------- running
+
+def claim_jobs(limit: int) -> List[Any]:
+    """Atomically move up to ``limit`` pending jobs to running."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            BackupJob.objects.select_for_update(skip_locked=True)
+            .filter(status=BackupJob.Status.PENDING)
+            .order_by('created_at')[:limit]
+        )
+        if not jobs:
+            return []
+        BackupJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=BackupJob.Status.RUNNING,
+            started_at=now,
+            updated_at=now,
+            attempts=F('attempts') + 1,
+        )
+
+    for job in jobs:
+        job.status = BackupJob.Status.RUNNING
+        job.started_at = now
+        job.attempts += 1
+    return jobs
+
+
+def _save_progress(job, **fields) -> None:
+    BackupJob.objects.filter(id=job.id).update(updated_at=timezone.now(), **fields)
+
+
+def _finish(job, status: str, error: Optional[str] = None, **fields) -> None:
+    _save_progress(job, status=status, finished_at=timezone.now(), last_error=error, **fields)
+    cache.delete(_progress_key(job.id))
+
+
+def _run_export(job) -> None:
+    exporter = BackupExporter(job.user)
+    reporter = _ProgressReporter(job)
+    with tempfile.TemporaryFile() as handle:
+        with zipfile.ZipFile(handle, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
+            for _ in exporter.iter_write(zip_file):
+                reporter.report(exporter.stage, exporter.entities, exporter.bytes_written)
+        handle.seek(0)
+        job.artifact.save(backup_filename(job.user), File(handle), save=False)
+
+    _finish(
+        job,
+        BackupJob.Status.DONE,
+        artifact=job.artifact.name,
+        stage=exporter.stage,
+        entities_processed=exporter.entities,
+        bytes_processed=exporter.bytes_written,
+    )
+
+
+@contextmanager
+def _local_archive(field_file):
+    """Copy a stored archive to a local temp file; ``zipfile`` needs cheap seeks."""
+    handle = tempfile.NamedTemporaryFile(suffix='.zip', delete=False)
+    try:
+        with handle, field_file.open('rb') as source:
+            shutil.copyfileobj(source, handle, CHUNK_SIZE)
+        yield handle.name
+    finally:
+        os.unlink(handle.name)
+
+
+def _run_import(job) -> None:
+    if not job.source:
+        raise BackupJobError('The uploaded backup is no longer available')
+
+    reporter = _ProgressReporter(job)
+    with _local_archive(job.source) as path, zipfile.ZipFile(path) as zip_file:
+        if 'data.json' not in zip_file.namelist():
+            raise BackupJobError('Invalid backup file - missing data.json')
+        try:
+            backup_data = json.loads(zip_file.read('data.json').decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise BackupJobError('Invalid JSON in backup file')
+
+        importer = BackupImporter(
+            job.user,
+            zip_file,
+            checkpoint=job.checkpoint or None,
+            on_progress=lambda current: reporter.report(current.stage, current.entities, current.bytes_read),
+        )
+        stage = importer.next_stage(job.completed_stage)
+        while stage is not None:
+            reporter.report(stage, importer.entities, importer.bytes_read, force=True)
+            with transaction.atomic():
+                importer.run_stage(stage, backup_data)
+                _save_progress(
+                    job,
+                    stage=stage,
+                    completed_stage=stage,
+                    checkpoint=importer.checkpoint(),
+                    summary=importer.summary,
+                    entities_processed=importer.entities,
+                    bytes_processed=importer.bytes_read,
+                )
+            stage = importer.next_stage(stage)
+
+    _finish(job, BackupJob.Status.DONE, summary=importer.summary, source=None)
+    job.source.delete(save=False)
+
+
+def run_job(job) -> None:
+    try:
+        if job.kind == BackupJob.Kind.EXPORT:
+            _run_export(job)
+        else:
+            _run_import(job)
+    except BackupJobError as exc:
+        _finish(job, BackupJob.Status.FAILED, str(exc))
+    except Exception:
+        logger.exception("Backup %s job %s failed", job.kind, job.id)
+        _finish(job, BackupJob.Status.FAILED, 'An internal error occurred while processing the backup')
+
+
+def process_batch(limit: Optional[int] = None) -> int:
+    """Claim and run one batch of pending jobs. Returns the number processed."""
+    jobs = claim_jobs(limit or 1)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+# ---------------------------------------------------------------- maintenance
+
+def requeue_stale_jobs() -> int:
+    """
+    Return jobs orphaned by a crashed or recycled worker to the queue.
+
+    Imports pick up at their last completed stage. Jobs that keep getting
+    orphaned are failed after ``BACKUP_JOB_MAX_ATTEMPTS`` claims.
+    """
+    cutoff = timezone.now() - timedelta(seconds=_setting('BACKUP_JOB_STALE_SECONDS', 1800))
+    requeued = 0
+    stale = BackupJob.objects.filter(status=BackupJob.Status.RUNNING, updated_at__lt=cutoff)
+    for job in stale.iterator():
+        if _has_heartbeat(job.id):
+            continue
+        if job.attempts >= _setting('BACKUP_JOB_MAX_ATTEMPTS', 3):
+            _finish(job, BackupJob.Status.FAILED, 'The backup worker stopped while processing this job')
+            continue
+        requeued += BackupJob.objects.filter(id=job.id, status=BackupJob.Status.RUNNING).update(
+            status=BackupJob.Status.PENDING,
+            updated_at=timezone.now(),
+        )
+    return requeued
+
+
+def prune_finished_jobs() -> int:
+    """Delete finished jobs past ``BACKUP_JOB_RETENTION_DAYS`` together with their files."""
+    cutoff = timezone.now() - timedelta(days=_setting('BACKUP_JOB_RETENTION_DAYS', 7))
+    expired = BackupJob.objects.filter(
+        status__in=[BackupJob.Status.DONE, BackupJob.Status.FAILED],
+        finished_at__lt=cutoff,
+    )
+    deleted = 0
+    for job in expired.iterator():
+        for field_file in (job.artifact, job.source):
+            if field_file:
+                field_file.delete(save=False)
+        job.delete()
+        deleted += 1
+    return deleted
+
+
+def run_maintenance() -> None:
+    requeued = requeue_stale_jobs()
+    pruned = prune_finished_jobs()
+    if requeued or pruned:
+        logger.info("Backup job maintenance: requeued %s stale job(s), pruned %s", requeued, pruned)
+
+
+# ---------------------------------------------------------------- workers
+
+class InProcessBackupPool:
+    """Fixed-size pool of daemon threads running backup jobs inside a web worker."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._last_maintenance = 0.0
+
+    def ensure_started(self) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            # Threads don't survive a fork (e.g. gunicorn preload); restart them.
+            if self._pid != os.getpid():
+                self._threads = []
+                self._pid = os.getpid()
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.size:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"backup-worker-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self) -> None:
+        self.ensure_started()
+        self._wake.set()
+
+    def _maybe_run_maintenance(self) -> None:
+        interval = _setting('BACKUP_JOB_MAINTENANCE_SECONDS', 300)
+        with self._lock:
+            if time.monotonic() - self._last_maintenance < interval:
+                return
+            self._last_maintenance = time.monotonic()
+        run_maintenance()
+
+    def _run(self) -> None:
+        poll_seconds = _setting('BACKUP_JOB_POLL_SECONDS', 30)
+        while True:
+            self._wake.wait(timeout=poll_seconds)
+            self._wake.clear()
+            try:
+                self._maybe_run_maintenance()
+                while process_batch():
+                    pass
+            except Exception:
+                logger.exception("In-process backup worker failed")
+            finally:
+                close_old_connections()
+
+
+_pool: Optional[InProcessBackupPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_in_process_pool() -> InProcessBackupPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InProcessBackupPool(_setting('BACKUP_JOB_WORKERS', 1))
+        return _pool
+
+
+def notify_workers() -> None:
+    """Wake the in-process pool after a job has been committed."""
+    get_in_process_pool().notify()
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta, timezone as dt_timezone
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
 from typing import Iterable
 
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Max, Prefetch, Q
 from django.utils import timezone
 
 from adventures.models import (
+    Category,
     Checklist,
     Collection,
     Location,
@@ -85,6 +86,63 @@ def _event_overlaps_range(
     return True
 
 
+def _range_datetimes(
+    range_start: date | None,
+    range_end: date | None,
+) -> tuple[datetime | None, datetime | None]:
+    """UTC instants matching ``_event_overlaps_range``: [start of range_start, start of day after range_end)."""
+    start_at = datetime.combine(range_start, time.min, tzinfo=dt_timezone.utc) if range_start else None
+    end_before = (
+        datetime.combine(range_end + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+        if range_end
+        else None
+    )
+    return start_at, end_before
+
+
+def _overlap_q(
+    start_field: str,
+    end_field: str | None,
+    range_start: date | None,
+    range_end: date | None,
+    *,
+    datetimes: bool,
+) -> Q:
+    """
+    SQL form of ``_event_overlaps_range`` for a (start, optional end) column pair.
+
+    Events without a start never match; a missing end falls back to the start.
+    """
+    query = Q(**{f'{start_field}__isnull': False})
+    if datetimes:
+        lower, upper = _range_datetimes(range_start, range_end)
+        upper_lookup = 'lt'
+    else:
+        lower, upper = range_start, range_end
+        upper_lookup = 'lte'
+
+    if upper is not None:
+        query &= Q(**{f'{start_field}__{upper_lookup}': upper})
+    if lower is not None:
+        if end_field:
+            query &= Q(**{f'{end_field}__gte': lower}) | Q(
+                **{f'{end_field}__isnull': True, f'{start_field}__gte': lower}
+            )
+        else:
+            query &= Q(**{f'{start_field}__gte': lower})
+    return query
+
+
+def _member_collections(user):
+    """Collections the user owns or is shared on, as an id subquery."""
+    return Collection.objects.filter(Q(user=user.id) | Q(shared_with=user.id)).values('id')
+
+
+def _owned_or_shared_q(user) -> Q:
+    """Items the user owns or that sit in a collection shared with them."""
+    return Q(user=user.id) | Q(collection__in=Collection.objects.filter(shared_with=user.id).values('id'))
+
+
 def _build_event(
     *,
     event_id: str,
@@ -102,6 +160,7 @@ def _build_event(
     resource_id: str = '',
     collection_id: str | None = None,
     collection_name: str | None = None,
+    updated_at: datetime | None = None,
 ) -> dict:
     return {
         'id': event_id,
@@ -120,81 +179,85 @@ def _build_event(
         'resource_id': resource_id or '',
         'collection_id': collection_id,
         'collection_name': collection_name,
+        'updated_at': _to_iso(updated_at),
     }
 
 
+def _accessible_locations(user):
+    """Locations the user owns or that sit in one of their collections, as an id subquery."""
+    return Location.objects.filter(Q(user=user.id) | Q(collections__in=_member_collections(user))).values('id')
+
+
 def _visit_events(
     user,
     range_start: date | None,
     range_end: date | None,
 ) -> list[dict]:
     events: list[dict] = []
-    locations = (
-        Location.objects.filter(
-            Q(user=user.id)
-            | Q(collections__shared_with=user.id)
-            | Q(is_public=True)
-        )
-        .filter(visits__isnull=False)
-        .select_related('category')
+    accessible_locations = _accessible_locations(user)
+    visits = (
+        Visit.objects.filter(location_id__in=accessible_locations)
+        .filter(_overlap_q('start_date', 'end_date', range_start, range_end, datetimes=True))
+        .select_related('location__category')
         .prefetch_related(
             Prefetch(
-                'visits',
-                queryset=Visit.objects.only(
-                    'id', 'location_id', 'start_date', 'end_date', 'timezone', 'notes'
-                ),
+                'location__collections',
+                queryset=Collection.objects.only('id', 'name').order_by('pk'),
             ),
-            'collections',
         )
-        .distinct()
+        .only(
+            'id', 'location_id', 'start_date', 'end_date', 'timezone', 'notes', 'updated_at',
+            'location__id', 'location__name', 'location__location', 'location__description',
+            'location__updated_at',
+            'location__category__name', 'location__category__icon',
+        )
     )
 
-    for location in locations:
-        collection = location.collections.first()
+    for visit in visits:
+        if not _event_overlaps_range(
+            visit.start_date, visit.end_date or visit.start_date, range_start, range_end
+        ):
+            continue
+
+        location = visit.location
+        # Prefetched and ordered, so index instead of .first() to avoid a query per visit.
+        collections = location.collections.all()
+        collection = collections[0] if collections else None
         collection_id = str(collection.id) if collection else None
         collection_name = collection.name if collection else None
         category_name = location.category.name if location.category else 'Adventure'
         category_icon = location.category.icon if location.category else '📍'
 
-        for visit in location.visits.all():
-            if not visit.start_date:
-                continue
-            if not _event_overlaps_range(
-                visit.start_date, visit.end_date or visit.start_date, range_start, range_end
-            ):
-                continue
-
-            all_day = is_midnight_utc(visit.start_date)
-            events.append(
-                _build_event(
-                    event_id=f'visit-{visit.id}',
-                    event_type='visit',
-                    title=location.name,
-                    start=visit.start_date,
-                    end=visit.end_date or visit.start_date,
-                    all_day=all_day,
-                    timezone_name=visit.timezone,
-                    icon=category_icon,
-                    category=category_name,
-                    location_label=location.location or '',
-                    description=visit.notes or location.description or '',
-                    url=f'/locations/{location.id}',
-                    resource_id=str(location.id),
-                    collection_id=collection_id,
-                    collection_name=collection_name,
-                )
+        all_day = is_midnight_utc(visit.start_date)
+        events.append(
+            _build_event(
+                event_id=f'visit-{visit.id}',
+                event_type='visit',
+                title=location.name,
+                start=visit.start_date,
+                end=visit.end_date or visit.start_date,
+                all_day=all_day,
+                timezone_name=visit.timezone,
+                icon=category_icon,
+                category=category_name,
+                location_label=location.location or '',
+                description=visit.notes or location.description or '',
+                url=f'/locations/{location.id}',
+                resource_id=str(location.id),
+                collection_id=collection_id,
+                collection_name=collection_name,
+                updated_at=max(visit.updated_at, location.updated_at),
             )
+        )
     return events
 
 
 def _transportation_events(user, range_start: date | None, range_end: date | None) -> list[dict]:
     events: list[dict] = []
     transportations = (
-        Transportation.objects.filter(
-            Q(user=user.id) | Q(collection__shared_with=user.id)
-        )
+        Transportation.objects.filter(_owned_or_shared_q(user))
+        .filter(_overlap_q('date', 'end_date', range_start, range_end, datetimes=True))
         .select_related('collection')
-        .distinct()
     )
 
     transport_icons = {
@@ -206,8 +269,6 @@ def _transportation_events(user, range_start: date | None, range_end: date | Non
     }
 
     for item in transportations:
-        if not item.date:
-            continue
         if not _event_overlaps_range(item.date, item.end_date or item.date, range_start, range_end):
             continue
 
@@ -232,6 +293,7 @@ def _transportation_events(user, range_start: date | None, range_end: date | Non
                 resource_id=str(item.id),
                 collection_id=collection_id,
                 collection_name=item.collection.name if item.collection else None,
+                updated_at=item.updated_at,
             )
         )
     return events
@@ -250,12 +312,26 @@ def _lodging_calendar_end(check_in: datetime | None, check_out: datetime | None)
     return check_out_date - timedelta(days=1)
 
 
+def _lodging_range_q(range_start: date | None, range_end: date | None) -> Q:
+    """
+    Loose SQL prefilter for stays; the calendar end is derived from check-out in
+    Python, so ``_event_overlaps_range`` still makes the final call.
+    """
+    start_at, end_before = _range_datetimes(range_start, range_end)
+    query = Q(check_in__isnull=False) | Q(check_out__isnull=False)
+    if end_before is not None:
+        query &= Q(check_in__lt=end_before) | Q(check_in__isnull=True, check_out__lt=end_before)
+    if start_at is not None:
+        query &= Q(check_out__gte=start_at) | Q(check_out__isnull=True, check_in__gte=start_at)
+    return query
+
+
 def _lodging_events(user, range_start: date | None, range_end: date | None) -> list[dict]:
     events: list[dict] = []
     stays = (
-        Lodging.objects.filter(Q(user=user.id) | Q(collection__shared_with=user.id))
+        Lodging.objects.filter(_owned_or_shared_q(user))
+        .filter(_lodging_range_q(range_start, range_end))
         .select_related('collection')
-        .distinct()
     )
 
     for stay in stays:
@@ -284,6 +360,7 @@ def _lodging_events(user, range_start: date | None, range_end: date | None) -> l
                 resource_id=str(stay.id),
                 collection_id=collection_id,
                 collection_name=stay.collection.name if stay.collection else None,
+                updated_at=stay.updated_at,
             )
         )
     return events
@@ -291,13 +368,11 @@ def _lodging_events(user, range_start: date | None, range_end: date | None) -> l
 
 def _collection_events(user, range_start: date | None, range_end: date | None) -> list[dict]:
     events: list[dict] = []
-    collections = Collection.objects.filter(
-        Q(user=user.id) | Q(shared_with=user.id)
-    ).distinct()
+    collections = Collection.objects.filter(id__in=_member_collections(user)).filter(
+        _overlap_q('start_date', 'end_date', range_start, range_end, datetimes=False)
+    )
 
     for collection in collections:
-        if not collection.start_date:
-            continue
         end = collection.end_date or collection.start_date
         if not _event_overlaps_range(collection.start_date, end, range_start, range_end):
             continue
@@ -319,6 +394,7 @@ def _collection_events(user, range_start: date | None, range_end: date | None) -
                 resource_id=str(collection.id),
                 collection_id=str(collection.id),
                 collection_name=collection.name,
+                updated_at=collection.updated_at,
             )
         )
     return events
@@ -327,10 +403,9 @@ def _collection_events(user, range_start: date | None, range_end: date | None) -
 def _note_events(user, range_start: date | None, range_end: date | None) -> list[dict]:
     events: list[dict] = []
     notes = (
-        Note.objects.filter(Q(user=user.id) | Q(collection__shared_with=user.id))
-        .filter(date__isnull=False)
+        Note.objects.filter(_owned_or_shared_q(user))
+        .filter(_overlap_q('date', None, range_start, range_end, datetimes=False))
         .select_related('collection')
-        .distinct()
     )
 
     for note in notes:
@@ -355,6 +430,7 @@ def _note_events(user, range_start: date | None, range_end: date | None) -> list
                 resource_id=str(note.id),
                 collection_id=collection_id,
                 collection_name=note.collection.name if note.collection else None,
+                updated_at=note.updated_at,
             )
         )
     return events
@@ -363,10 +439,9 @@ def _note_events(user, range_start: date | None, range_end: date | None) -> list
 def _checklist_events(user, range_start: date | None, range_end: date | None) -> list[dict]:
     events: list[dict] = []
     checklists = (
-        Checklist.objects.filter(Q(user=user.id) | Q(collection__shared_with=user.id))
-        .filter(date__isnull=False)
+        Checklist.objects.filter(_owned_or_shared_q(user))
+        .filter(_overlap_q('date', None, range_start, range_end, datetimes=False))
         .select_related('collection')
-        .distinct()
     )
 
     for checklist in checklists:
@@ -390,6 +465,7 @@ def _checklist_events(user, range_start: date | None, range_end: date | None) ->
                 resource_id=str(checklist.id),
                 collection_id=collection_id,
                 collection_name=checklist.collection.name if checklist.collection else None,
+                updated_at=checklist.updated_at,
             )
         )
     return events
@@ -429,3 +505,38 @@ def get_calendar_events_for_user(
 
 def iter_calendar_events_for_ics(user) -> Iterable[dict]:
     return get_calendar_events_for_user(user)
+
+
+def calendar_change_marker(user) -> list:
+    """
+    Cheap summary of everything the user's full calendar is built from.
+
+    Row counts catch deletions and ``updated_at`` maxima catch edits, so the
+    marker changes whenever the events could have, without loading them.
+    Collection links and sharing have no timestamp of their own, so their
+    through rows are counted and their (increasing) ids compared; categories
+    have none either and are included as the names and icons in use.
+    """
+    accessible_locations = _accessible_locations(user)
+    stamps = {'count': Count('pk'), 'updated_at': Max('updated_at')}
+    marker = [
+        Visit.objects.filter(location_id__in=accessible_locations).aggregate(
+            location_updated_at=Max('location__updated_at'), **stamps,
+        ),
+        Collection.objects.filter(id__in=_member_collections(user)).aggregate(**stamps),
+    ]
+    for model in (Transportation, Lodging, Note, Checklist):
+        marker.append(model.objects.filter(_owned_or_shared_q(user)).aggregate(**stamps))
+
+    links = {'count': Count('pk'), 'latest': Max('pk')}
+    sharing_user_field = Collection.shared_with.field.m2m_reverse_field_name()
+    marker.append(
+        Location.collections.through.objects.filter(location_id__in=accessible_locations).aggregate(**links)
+    )
+    marker.append(
+        Collection.shared_with.through.objects.filter(**{sharing_user_field: user.id}).aggregate(**links)
+    )
+    marker.append(sorted(
+        Category.objects.filter(location__in=accessible_locations).values_list('name', 'icon').distinct()
+    ))
+    return marker
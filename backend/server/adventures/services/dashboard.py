@@ -1,16 +1,24 @@
 from datetime import date, timedelta
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Prefetch, Q
 
 from adventures.models import Collection, CollectionInvite, ContentImage, Location
 from adventures.serializers import LocationSerializer, UltraSlimCollectionSerializer
 from adventures.services.calendar_events import get_calendar_events_for_user
+from adventures.services.dashboard_cache import get_user_data_version
+from adventures.services.external_cache import build_cache_key
 from adventures.services.user_stats import UserStatsService
 
 MAX_RECENT_LOCATIONS = 3
 MAX_UPCOMING_TRIPS = 3
 MAX_UPCOMING_EVENTS = 10
 
+DASHBOARD_CACHE_PREFIX = 'dashboard_v1'
+DASHBOARD_SUMMARY_CACHE_PREFIX = 'dashboard_summary_v1'
+DASHBOARD_EVENTS_CACHE_PREFIX = 'dashboard_events_v1'
+
 
 def _collection_list_queryset(user):
     return (
@@ -37,13 +45,10 @@ def _serialize_collections(collections, request):
     return serializer.data
 
 
-def build_dashboard_data(user, request_user, *, events_days=30, request=None):
+def _build_summary_sections(user, request_user, today, request):
     stats_service = UserStatsService()
     stats = stats_service.build_user_stats(user, request_user, include_categories=False)
 
-    today = date.today()
-    end_date = today + timedelta(days=events_days)
-
     recent_locations_qs = (
         Location.objects.filter(user=user)
         .filter(visits__start_date__lte=today)
@@ -72,20 +77,68 @@ def build_dashboard_data(user, request_user, *, events_days=30, request=None):
         _serialize_collections([active_trip_obj], request)[0] if active_trip_obj else None
     )
 
+    invite_count = CollectionInvite.objects.filter(invited_user=user).count()
+
+    return {
+        'stats': stats,
+        'recent_locations': recent_locations,
+        'upcoming_trips': upcoming_trips,
+        'active_trip': active_trip,
+        'invite_count': invite_count,
+    }
+
+
+def _build_upcoming_events(user, today, events_days):
+    end_date = today + timedelta(days=events_days)
     upcoming_events = get_calendar_events_for_user(
         user,
         start=today.isoformat(),
         end=end_date.isoformat(),
     )
-    upcoming_events = upcoming_events[:MAX_UPCOMING_EVENTS]
+    return upcoming_events[:MAX_UPCOMING_EVENTS]
 
-    invite_count = CollectionInvite.objects.filter(invited_user=user).count()
 
+def _assemble(summary, upcoming_events):
     return {
-        'stats': stats,
-        'recent_locations': recent_locations,
-        'upcoming_trips': upcoming_trips,
-        'active_trip': active_trip,
+        'stats': summary['stats'],
+        'recent_locations': summary['recent_locations'],
+        'upcoming_trips': summary['upcoming_trips'],
+        'active_trip': summary['active_trip'],
         'upcoming_events': upcoming_events,
-        'invite_count': invite_count,
+        'invite_count': summary['invite_count'],
     }
+
+
+def build_dashboard_data(user, request_user, *, events_days=30, request=None):
+    today = date.today()
+    timeout = int(getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 3600))
+
+    # Stats visibility depends on the viewer, so only cache a user's own dashboard.
+    if timeout <= 0 or user.pk != request_user.pk:
+        summary = _build_summary_sections(user, request_user, today, request)
+        return _assemble(summary, _build_upcoming_events(user, today, events_days))
+
+    # Keys include the date because visited status and upcoming items roll over
+    # daily, and the user's uuid so a recreated database can't hit old entries.
+    parts = (str(user.uuid), str(get_user_data_version(user.pk)), today.isoformat())
+    dashboard_key = build_cache_key(DASHBOARD_CACHE_PREFIX, *parts, str(events_days))
+    data = cache.get(dashboard_key)
+    if data is not None:
+        return data
+
+    # The summary doesn't depend on events_days, so it is shared across ranges.
+    summary_key = build_cache_key(DASHBOARD_SUMMARY_CACHE_PREFIX, *parts)
+    events_key = build_cache_key(DASHBOARD_EVENTS_CACHE_PREFIX, *parts, str(events_days))
+    sections = cache.get_many([summary_key, events_key])
+    fresh = {}
+
+    summary = sections.get(summary_key)
+    if summary is None:
+        summary = fresh[summary_key] = _build_summary_sections(user, request_user, today, request)
+    upcoming_events = sections.get(events_key)
+    if upcoming_events is None:
+        upcoming_events = fresh[events_key] = _build_upcoming_events(user, today, events_days)
+
+    data = fresh[dashboard_key] = _assemble(summary, upcoming_events)
+    cache.set_many(fresh, timeout)
+    return data
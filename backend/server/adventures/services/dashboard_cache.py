@@ -0,0 +1,80 @@
+"""
+Per-user data versions for caching dashboard payloads.
+
+Any change to data shown on a user's dashboard bumps their version (see the
+receivers in ``adventures.signals``). Cached sections are keyed by the
+version, so a bump makes every earlier entry unreachable without having to
+find and delete it. Bumps run on transaction commit so a concurrent read can't
+cache pre-commit data under the new version.
+"""
+import time
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+from adventures.models import Collection, Location
+from adventures.services.external_cache import build_cache_key
+
+VERSION_PREFIX = 'user_data_version_v1'
+
+
+def _version_key(user_id) -> str:
+    return build_cache_key(VERSION_PREFIX, str(user_id))
+
+
+def get_user_data_version(user_id) -> int:
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a version that was evicted is never reused
+        # while entries written under it may still be cached.
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_user_data_version(user_ids: Iterable) -> None:
+    for user_id in {user_id for user_id in user_ids if user_id is not None}:
+        key = _version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def mark_user_data_changed(user_ids: Iterable) -> None:
+    """
+    Bump the given users' versions now and, inside a transaction, again on
+    commit: the first bump covers reads within the transaction, the second
+    discards anything cached from data that wasn't committed yet.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    bump_user_data_version(user_ids)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_user_data_version(user_ids))
+
+
+def _member_ids(collections) -> set:
+    rows = collections.values_list('user_id', 'shared_with')
+    return {user_id for row in rows for user_id in row if user_id is not None}
+
+
+def collection_member_ids(collection_ids: Iterable) -> set:
+    """Owners and collaborators of the given collections."""
+    collection_ids = [collection_id for collection_id in collection_ids if collection_id is not None]
+    if not collection_ids:
+        return set()
+    return _member_ids(Collection.objects.filter(pk__in=collection_ids))
+
+
+def location_member_ids(location_ids: Iterable) -> set:
+    """Owners of the given locations plus members of collections they belong to."""
+    location_ids = [location_id for location_id in location_ids if location_id is not None]
+    if not location_ids:
+        return set()
+    owners = set(Location.objects.filter(pk__in=location_ids).values_list('user_id', flat=True))
+    return owners | _member_ids(Collection.objects.filter(locations__in=location_ids))
@@ -0,0 +1,139 @@
+"""Persistent reverse-geocode cache keyed by provider and geohash cell.
+
+Provider payloads are stored in the ``ReverseGeocodeCacheEntry`` table so that
+re-saving a location, importing a backup, or logging another point a few metres
+away resolves without any outbound HTTP request.
+"""
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db.models import F, Q
+from django.utils import timezone
+
+from adventures.services.external_cache import build_cache_key
+from adventures.utils.geo import geohash_center, geohash_encode
+
+PROVIDERS = ("google", "osm")
+STATS_PREFIX = "reverse_geocode_cache_stats_v1"
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "REVERSE_GEOCODE_CACHE_ENABLED", True)
+
+
+def cell_for(lat: float, lon: float) -> str:
+    precision = int(getattr(settings, "REVERSE_GEOCODE_CACHE_PRECISION", 8))
+    return geohash_encode(float(lat), float(lon), precision)
+
+
+def _bump_counter(kind: str, provider: str) -> None:
+    key = build_cache_key(STATS_PREFIX, kind, provider)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+    except Exception:
+        # Counters are best effort; a cache outage must not break geocoding.
+        pass
+
+
+def get_cached_payload(provider: str, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    """Return the cached payload for the cell containing (lat, lon), if fresh."""
+    if not is_enabled():
+        return None
+
+    from adventures.models import ReverseGeocodeCacheEntry
+
+    now = timezone.now()
+    entry = (
+        ReverseGeocodeCacheEntry.objects.filter(provider=provider, cell=cell_for(lat, lon))
+        .only("id", "payload", "expires_at")
+        .first()
+    )
+    if entry is None or (entry.expires_at and entry.expires_at <= now):
+        _bump_counter("miss", provider)
+        return None
+
+    ReverseGeocodeCacheEntry.objects.filter(id=entry.id).update(
+        hit_count=F("hit_count") + 1,
+        last_hit_at=now,
+    )
+    _bump_counter("hit", provider)
+    return entry.payload
+
+
+def store_payload(provider: str, lat: float, lon: float, payload: Dict[str, Any]) -> None:
+    if not is_enabled() or not payload:
+        return
+
+    from adventures.models import ReverseGeocodeCacheEntry
+
+    cell = cell_for(lat, lon)
+    ttl = int(getattr(settings, "REVERSE_GEOCODE_CACHE_TTL", 60 * 60 * 24 * 90))
+    try:
+        ReverseGeocodeCacheEntry.objects.update_or_create(
+            provider=provider,
+            cell=cell,
+            defaults={
+                "center": geohash_center(cell),
+                "payload": payload,
+                "expires_at": timezone.now() + timedelta(seconds=ttl) if ttl > 0 else None,
+            },
+        )
+    except IntegrityError:
+        # Another worker cached the same cell concurrently; either payload is fine.
+        pass
+
+
+def purge(
+    provider: Optional[str] = None,
+    expired_only: bool = False,
+    older_than_days: Optional[int] = None,
+    cells: Optional[Iterable[str]] = None,
+) -> int:
+    """Delete cache entries matching the filters. Returns the number removed."""
+    from adventures.models import ReverseGeocodeCacheEntry
+
+    queryset = ReverseGeocodeCacheEntry.objects.all()
+    if provider:
+        queryset = queryset.filter(provider=provider)
+    if expired_only:
+        queryset = queryset.filter(expires_at__lte=timezone.now())
+    if older_than_days is not None:
+        queryset = queryset.filter(created_at__lt=timezone.now() - timedelta(days=older_than_days))
+    if cells:
+        # A short prefix purges every finer cell inside it.
+        prefix_filter = Q()
+        for cell in cells:
+            prefix_filter |= Q(cell__startswith=cell)
+        queryset = queryset.filter(prefix_filter)
+
+    deleted, _ = queryset.delete()
+    return deleted
+
+
+def get_stats() -> Dict[str, Any]:
+    from adventures.models import ReverseGeocodeCacheEntry
+
+    stats: Dict[str, Any] = {}
+    for provider in PROVIDERS:
+        hits = cache.get(build_cache_key(STATS_PREFIX, "hit", provider)) or 0
+        misses = cache.get(build_cache_key(STATS_PREFIX, "miss", provider)) or 0
+        total = hits + misses
+        stats[provider] = {
+            "entries": ReverseGeocodeCacheEntry.objects.filter(provider=provider).count(),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 3) if total else None,
+        }
+    return stats
+
+
+def reset_stats() -> None:
+    cache.delete_many(
+        [build_cache_key(STATS_PREFIX, kind, provider) for kind in ("hit", "miss") for provider in PROVIDERS]
+    )
@@ -0,0 +1,307 @@
+"""Durable, bounded reverse-geocode job queue.
+
+Location saves enqueue a ``GeocodeJob`` row in the same transaction as the
+save. Jobs are drained either by the ``geocode_worker`` management command or
+by a small in-process thread pool (``GEOCODE_QUEUE_WORKERS``), so the number
+of concurrent provider calls and DB connections stays fixed no matter how many
+locations are written at once.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Avg, Count, F, Min
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class TransientGeocodeError(Exception):
+    """Raised when no geocoding provider could be reached; the job is retried."""
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def enqueue_location_geocode(location_id, delay_seconds: int = 0) -> None:
+    """
+    Queue a reverse geocode for a location, coalescing with any pending job.
+
+    Must be called inside the caller's transaction so the job is committed (or
+    rolled back) together with the location write.
+    """
+    from adventures.models import GeocodeJob
+
+    pending = GeocodeJob.objects.filter(location_id=location_id, status=GeocodeJob.Status.PENDING)
+    if not pending.update(coalesced_count=F('coalesced_count') + 1):
+        try:
+            with transaction.atomic():
+                GeocodeJob.objects.create(
+                    location_id=location_id,
+                    available_at=timezone.now() + timedelta(seconds=delay_seconds),
+                )
+        except IntegrityError:
+            # A concurrent save enqueued the job first; piggyback on it.
+            pending.update(coalesced_count=F('coalesced_count') + 1)
+
+    transaction.on_commit(notify_workers)
+
+
+def enqueue_location_geocodes(location_ids) -> None:
+    """
+    Queue reverse geocodes for many locations with one insert.
+
+    Locations that already have a pending job keep it; no coalesce count is
+    recorded for them. Intended for freshly created rows such as a backup import.
+    """
+    from adventures.models import GeocodeJob
+
+    location_ids = list(location_ids)
+    if not location_ids:
+        return
+    GeocodeJob.objects.bulk_create(
+        [GeocodeJob(location_id=location_id) for location_id in location_ids],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(notify_workers)
+
+
+def claim_jobs(limit: int) -> List[Any]:
+    """Atomically move up to ``limit`` due jobs from pending to running."""
+    from adventures.models import GeocodeJob
+
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            GeocodeJob.objects.select_for_update(skip_locked=True)
+            .filter(status=GeocodeJob.Status.PENDING, available_at__lte=now)
+            .order_by('available_at')[:limit]
+        )
+        if not jobs:
+            return []
+        GeocodeJob.objects.filter(id__in=[job.id for job in jobs]).update(
+            status=GeocodeJob.Status.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+
+    for job in jobs:
+        job.status = GeocodeJob.Status.RUNNING
+        job.started_at = now
+        job.attempts += 1
+    return jobs
+
+
+def _retry_delay(attempts: int) -> int:
+    base = _setting('GEOCODE_QUEUE_RETRY_BASE_SECONDS', 30)
+    ceiling = _setting('GEOCODE_QUEUE_RETRY_MAX_SECONDS', 60 * 60)
+    return min(ceiling, base * (2 ** max(attempts - 1, 0)))
+
+
+def _finish(job, status: str, error: Optional[str] = None) -> None:
+    from adventures.models import GeocodeJob
+
+    GeocodeJob.objects.filter(id=job.id).update(
+        status=status,
+        finished_at=timezone.now(),
+        last_error=error,
+    )
+
+
+def _reschedule(job, error: str) -> None:
+    """Put a failed job back in the queue with exponential backoff."""
+    from adventures.models import GeocodeJob
+
+    if job.attempts >= _setting('GEOCODE_QUEUE_MAX_ATTEMPTS', 5):
+        _finish(job, GeocodeJob.Status.FAILED, error)
+        return
+
+    retry_at = timezone.now() + timedelta(seconds=_retry_delay(job.attempts))
+    try:
+        with transaction.atomic():
+            GeocodeJob.objects.filter(id=job.id).update(
+                status=GeocodeJob.Status.PENDING,
+                available_at=retry_at,
+                last_error=error,
+            )
+    except IntegrityError:
+        # The location was saved again meanwhile and already has a fresh job.
+        _finish(job, GeocodeJob.Status.DONE, error)
+
+
+def run_job(job) -> None:
+    from adventures.models import GeocodeJob, Location, geocode_and_assign
+
+    try:
+        selection = geocode_and_assign(str(job.location_id))
+        if selection is not None and selection.transient:
+            raise TransientGeocodeError(selection.data.get('error') or 'Geocoding providers unavailable')
+    except Location.DoesNotExist:
+        _finish(job, GeocodeJob.Status.DONE, 'Location no longer exists')
+    except Exception as exc:
+        logger.warning("Geocode job %s for location %s failed: %s", job.id, job.location_id, exc)
+        _reschedule(job, str(exc))
+    else:
+        _finish(job, GeocodeJob.Status.DONE)
+
+
+def process_batch(limit: Optional[int] = None) -> int:
+    """Claim and run one batch of due jobs. Returns the number processed."""
+    jobs = claim_jobs(limit or _setting('GEOCODE_QUEUE_BATCH_SIZE', 10))
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+def requeue_stale_jobs() -> int:
+    """Return jobs orphaned by a crashed or recycled worker to the queue."""
+    from adventures.models import GeocodeJob
+
+    cutoff = timezone.now() - timedelta(seconds=_setting('GEOCODE_QUEUE_STALE_SECONDS', 600))
+    requeued = 0
+    stale = GeocodeJob.objects.filter(status=GeocodeJob.Status.RUNNING, started_at__lt=cutoff)
+    for job in stale.iterator():
+        try:
+            with transaction.atomic():
+                GeocodeJob.objects.filter(id=job.id).update(
+                    status=GeocodeJob.Status.PENDING,
+                    available_at=timezone.now(),
+                )
+            requeued += 1
+        except IntegrityError:
+            _finish(job, GeocodeJob.Status.DONE, 'Superseded by a newer job')
+    return requeued
+
+
+def prune_finished_jobs() -> int:
+    from adventures.models import GeocodeJob
+
+    cutoff = timezone.now() - timedelta(days=_setting('GEOCODE_QUEUE_RETENTION_DAYS', 7))
+    deleted, _ = GeocodeJob.objects.filter(
+        status__in=[GeocodeJob.Status.DONE, GeocodeJob.Status.FAILED],
+        finished_at__lt=cutoff,
+    ).delete()
+    return deleted
+
+
+def run_maintenance() -> None:
+    requeued = requeue_stale_jobs()
+    pruned = prune_finished_jobs()
+    if requeued or pruned:
+        logger.info("Geocode queue maintenance: requeued %s stale job(s), pruned %s", requeued, pruned)
+
+
+def get_queue_stats(window_minutes: int = 60) -> Dict[str, Any]:
+    """Queue depth by status plus wait/run latency over the recent window."""
+    from adventures.models import GeocodeJob
+
+    now = timezone.now()
+    counts = dict(
+        GeocodeJob.objects.values_list('status').annotate(total=Count('id')).order_by()
+    )
+    oldest_pending = GeocodeJob.objects.filter(status=GeocodeJob.Status.PENDING).aggregate(
+        oldest=Min('created_at')
+    )['oldest']
+    recent = GeocodeJob.objects.filter(
+        status=GeocodeJob.Status.DONE,
+        finished_at__gte=now - timedelta(minutes=window_minutes),
+    ).aggregate(
+        completed=Count('id'),
+        avg_latency=Avg(F('finished_at') - F('created_at')),
+        avg_run=Avg(F('finished_at') - F('started_at')),
+    )
+
+    def _seconds(value):
+        return round(value.total_seconds(), 3) if value is not None else None
+
+    return {
+        'pending': counts.get(GeocodeJob.Status.PENDING, 0),
+        'running': counts.get(GeocodeJob.Status.RUNNING, 0),
+        'failed': counts.get(GeocodeJob.Status.FAILED, 0),
+        'done': counts.get(GeocodeJob.Status.DONE, 0),
+        'oldest_pending_age_seconds': _seconds(now - oldest_pending) if oldest_pending else None,
+        'window_minutes': window_minutes,
+        'completed_in_window': recent['completed'],
+        'avg_latency_seconds': _seconds(recent['avg_latency']),
+        'avg_run_seconds': _seconds(recent['avg_run']),
+    }
+
+
+class InProcessGeocodePool:
+    """Fixed-size pool of daemon threads draining the queue inside a web worker."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._last_maintenance = 0.0
+
+    def ensure_started(self) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            # Threads don't survive a fork (e.g. gunicorn preload); restart them.
+            if self._pid != os.getpid():
+                self._threads = []
+                self._pid = os.getpid()
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.size:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"geocode-worker-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self) -> None:
+        self.ensure_started()
+        self._wake.set()
+
+    def _maybe_run_maintenance(self) -> None:
+        interval = _setting('GEOCODE_QUEUE_MAINTENANCE_SECONDS', 300)
+        with self._lock:
+            if time.monotonic() - self._last_maintenance < interval:
+                return
+            self._last_maintenance = time.monotonic()
+        run_maintenance()
+
+    def _run(self) -> None:
+        poll_seconds = _setting('GEOCODE_QUEUE_POLL_SECONDS', 30)
+        while True:
+            self._wake.wait(timeout=poll_seconds)
+            self._wake.clear()
+            try:
+                self._maybe_run_maintenance()
+                while process_batch():
+                    pass
+            except Exception:
+                logger.exception("In-process geocode worker failed")
+            finally:
+                close_old_connections()
+
+
+_pool: Optional[InProcessGeocodePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_in_process_pool() -> InProcessGeocodePool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InProcessGeocodePool(_setting('GEOCODE_QUEUE_WORKERS', 2))
+        return _pool
+
+
+def notify_workers() -> None:
+    """Wake the in-process pool after a job has been committed."""
+    get_in_process_pool().notify()
@@ -0,0 +1,67 @@
+"""Offline point-in-polygon region/country lookup.
+
+Uses the optional ``RegionBoundary``/``CountryBoundary`` polygons imported by
+``download-countries`` so that region and country resolution needs no network
+round trip. Every lookup is a single GiST-indexed query; when no boundaries are
+loaded the functions return ``None`` and callers fall back to the providers.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from adventures.utils.geo import make_point
+from worldtravel.models import Country, Region, VisitedRegion
+
+
+@dataclass
+class LocalRegionMatch:
+    region: Optional[Region]
+    country: Optional[Country]
+
+
+def resolve_region_for_point(point) -> Optional[Region]:
+    if point is None:
+        return None
+    return Region.objects.filter(boundary__geometry__intersects=point).select_related('country').first()
+
+
+def resolve_point_locally(lat: float, lon: float) -> Optional[LocalRegionMatch]:
+    """Resolve the region (and its country) containing a point from stored boundaries."""
+    point = make_point(lon, lat)
+    if point is None:
+        return None
+
+    region = resolve_region_for_point(point)
+    if region:
+        return LocalRegionMatch(region=region, country=region.country)
+
+    # Countries whose regions have no boundaries may still have an outline.
+    country = Country.objects.filter(boundary__geometry__intersects=point).first()
+    if country:
+        return LocalRegionMatch(region=None, country=country)
+    return None
+
+
+def local_match_to_result(match: LocalRegionMatch, user) -> Dict[str, Any]:
+    """Shape a local match like an ``extractIsoCode`` result (without city detail)."""
+    country = match.country
+    region = match.region
+    data: Dict[str, Any] = {
+        "country": country.name,
+        "country_id": country.country_code,
+        "city": None,
+        "city_id": None,
+        "city_visited": False,
+        "location_name": None,
+        "provider_used": "local",
+        "provider": "local",
+    }
+    if region:
+        data.update(
+            region_id=region.id,
+            region=region.name,
+            region_visited=VisitedRegion.objects.filter(region=region, user=user).exists(),
+            display_name=f"{region.name}, {country.country_code}",
+        )
+    else:
+        data["display_name"] = country.name
+    return data
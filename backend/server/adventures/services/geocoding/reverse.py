@@ -5,6 +5,8 @@ from django.conf import settings
 
 from adventures.providers.geocoding.google import reverse_geocode as google_reverse
 from adventures.providers.geocoding.osm import reverse_geocode as osm_reverse
+from adventures.services.geocoding.cache import get_cached_payload, store_payload
+from adventures.services.geocoding.regions import local_match_to_result, resolve_point_locally
 from adventures.utils.geocoding_utils import (
     _extract_google_location_name,
     _extract_osm_location_name,
@@ -18,6 +20,8 @@ from adventures.utils.geocoding_utils import (
 class ReverseGeocodeResult:
     data: Dict[str, Any]
     provider_used: Optional[str]
+    # True when no provider could be reached, so retrying later may succeed
+    transient: bool = False
 
 
 def _normalize_google_geocode_payload(payload: Dict[str, Any], lat: float, lon: float, api_key: str) -> Dict[str, Any]:
@@ -59,20 +63,56 @@ def _reverse_geocode_quality(result: Dict[str, Any]) -> int:
     return score
 
 
+def _google_payload(lat: float, lon: float, api_key: str) -> Optional[Dict[str, Any]]:
+    """Normalized Google payload from the cell cache, or from the API on a miss."""
+    cached = get_cached_payload("google", lat, lon)
+    if cached is not None:
+        return cached
+
+    google_payload = google_reverse(lat, lon, api_key)
+    if google_payload.error:
+        return None
+
+    normalized_google = _normalize_google_geocode_payload(
+        google_payload.data, lat=lat, lon=lon, api_key=api_key
+    )
+    if not normalized_google.get("error"):
+        store_payload("google", lat, lon, normalized_google)
+    return normalized_google
+
+
+def _osm_payload(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    """OSM payload (with extracted location name) from the cell cache or Nominatim."""
+    cached = get_cached_payload("osm", lat, lon)
+    if cached is not None:
+        return cached
+
+    osm_payload = osm_reverse(lat, lon)
+    if osm_payload.error:
+        return None
+
+    osm_data = osm_payload.data
+    osm_data["location_name"] = _extract_osm_location_name(osm_data)
+    if not osm_data.get("error"):
+        store_payload("osm", lat, lon, osm_data)
+    return osm_data
+
+
 def reverse_geocode(lat: float, lon: float, user) -> ReverseGeocodeResult:
+    # Region and country come from local boundary polygons when available;
+    # providers are then only needed for city and place-name detail.
+    local_match = resolve_point_locally(lat, lon)
+    region_hint = local_match.region if local_match else None
     google_result = None
 
     api_key = getattr(settings, "GOOGLE_MAPS_API_KEY", None)
     if api_key:
-        google_payload = google_reverse(lat, lon, api_key)
-        if not google_payload.error:
-            normalized_google = _normalize_google_geocode_payload(
-                google_payload.data, lat=lat, lon=lon, api_key=api_key
-            )
+        normalized_google = _google_payload(lat, lon, api_key)
+        if normalized_google is not None:
             if normalized_google.get("error"):
                 google_result = normalized_google
             else:
-                google_result = extractIsoCode(user, normalized_google)
+                google_result = extractIsoCode(user, normalized_google, region_hint=region_hint)
                 if isinstance(google_result, dict) and "error" not in google_result:
                     google_result["provider_used"] = "google"
                     google_result["provider"] = "google"
@@ -81,12 +121,10 @@ def reverse_geocode(lat: float, lon: float, user) -> ReverseGeocodeResult:
         if _reverse_geocode_quality(google_result) >= 5:
             return ReverseGeocodeResult(data=google_result, provider_used="google")
 
-    osm_payload = osm_reverse(lat, lon)
+    osm_data = _osm_payload(lat, lon)
     osm_result = None
-    if not osm_payload.error:
-        osm_data = osm_payload.data
-        osm_data["location_name"] = _extract_osm_location_name(osm_data)
-        osm_result = extractIsoCode(user, osm_data)
+    if osm_data is not None:
+        osm_result = extractIsoCode(user, osm_data, region_hint=region_hint)
         if isinstance(osm_result, dict) and "error" not in osm_result:
             osm_result["provider_used"] = "osm"
             osm_result["provider"] = "osm"
@@ -101,7 +139,21 @@ def reverse_geocode(lat: float, lon: float, user) -> ReverseGeocodeResult:
 
         return ReverseGeocodeResult(data=osm_result, provider_used="osm")
 
+    if google_result and not google_result.get("error"):
+        return ReverseGeocodeResult(data=google_result, provider_used="google")
+
+    if local_match:
+        return ReverseGeocodeResult(
+            data=local_match_to_result(local_match, user),
+            provider_used="local",
+            transient=osm_result is None,
+        )
+
     if google_result:
         return ReverseGeocodeResult(data=google_result, provider_used="google")
 
-    return ReverseGeocodeResult(data=osm_result or {"error": "Unable to reverse geocode location."}, provider_used=None)
+    return ReverseGeocodeResult(
+        data=osm_result or {"error": "Unable to reverse geocode location."},
+        provider_used=None,
+        transient=osm_result is None,
+    )
@@ -0,0 +1,158 @@
+"""
+ICS feed generation for calendar clients that poll ``/api/ics-calendar/generate/``.
+
+Each VEVENT is rendered once and cached under its event id plus a digest of
+the event data, so a feed where one item changed only re-renders that item.
+DTSTAMP and LAST-MODIFIED come from the item's ``updated_at`` rather than the
+request time, which keeps the output byte-stable between polls. The ETag is
+derived from ``calendar_change_marker``, a few aggregates, so the view answers
+unchanged feeds with 304 without loading any events.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterator
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import quote_etag
+from icalendar import Calendar, Event, vCalAddress, vText
+
+from adventures.services.calendar_events import calendar_change_marker, iter_calendar_events_for_ics
+from adventures.services.external_cache import build_cache_key
+
+VEVENT_CACHE_PREFIX = 'ics_vevent_v1'
+# Part of the ETag; bump when the rendered output changes for the same data.
+FEED_FORMAT_VERSION = 1
+# Keys are content-addressed, so entries never go stale; the timeout only bounds memory.
+VEVENT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+CALENDAR_FOOTER = b'END:VCALENDAR\r\n'
+
+
+def _parse_event_datetime(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _digest(data) -> str:
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _organizer(user) -> tuple[str, str]:
+    name = f'{user.first_name} {user.last_name}'.strip() or user.username
+    return user.email, name
+
+
+def _render_event(item: dict, organizer: tuple[str, str]) -> bytes | None:
+    start_dt = _parse_event_datetime(item.get('start'))
+    if not start_dt:
+        return None
+
+    end_dt = _parse_event_datetime(item.get('end')) or start_dt
+    all_day = bool(item.get('all_day'))
+    stamp = _parse_event_datetime(item.get('updated_at')) or start_dt
+
+    event = Event()
+    event.add('uid', f"{item['id']}@adventurelog")
+    event.add('summary', f"{item.get('icon', '')} {item.get('title', 'Event')}".strip())
+    event.add('dtstamp', stamp)
+    event.add('transp', 'TRANSPARENT')
+    event.add('class', 'PUBLIC')
+    event.add('last-modified', stamp)
+
+    if item.get('description'):
+        event.add('description', item['description'])
+    if item.get('location_label'):
+        event.add('location', item['location_label'])
+    if item.get('url'):
+        event.add('url', item['url'])
+
+    categories = [item.get('category', 'Adventure')]
+    if item.get('collection_name'):
+        categories.append(item['collection_name'])
+    event.add('categories', categories)
+
+    if all_day:
+        event.add('dtstart', start_dt.date())
+        event.add('dtend', end_dt.date() + timedelta(days=1))
+    else:
+        event.add('dtstart', start_dt)
+        event.add('dtend', end_dt if end_dt >= start_dt else start_dt)
+
+    email, name = organizer
+    address = vCalAddress(f'MAILTO:{email}')
+    address.params['cn'] = vText(name)
+    event.add('organizer', address)
+
+    return event.to_ical()
+
+
+def _calendar_header() -> bytes:
+    cal = Calendar()
+    cal.add('prodid', '-//AdventureLog Calendar//adventurelog.app//')
+    cal.add('version', '2.0')
+    cal.add('calscale', 'GREGORIAN')
+    cal.add('method', 'PUBLISH')
+    cal.add('x-wr-calname', 'AdventureLog')
+    body = cal.to_ical()
+    return body[:-len(CALENDAR_FOOTER)] if body.endswith(CALENDAR_FOOTER) else body
+
+
+@dataclass
+class IcsValidators:
+    etag: str
+    last_modified: datetime | None
+
+
+def feed_validators(user) -> IcsValidators:
+    """ETag and Last-Modified of the user's feed, from aggregates only."""
+    marker = calendar_change_marker(user)
+    stamps = [
+        value
+        for summary in marker if isinstance(summary, dict)
+        for name, value in summary.items() if name.endswith('updated_at') and value is not None
+    ]
+    last_modified = max(stamps).astimezone(dt_timezone.utc).replace(microsecond=0) if stamps else None
+    digest = _digest([FEED_FORMAT_VERSION, marker, _organizer(user)])[:32]
+    return IcsValidators(etag=quote_etag(digest), last_modified=last_modified)
+
+
+@dataclass
+class IcsFeed:
+    items: list[tuple[str, dict]]
+    organizer: tuple[str, str]
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Yield the serialized calendar, rendering only VEVENTs missing from the cache."""
+        keys = [key for key, _ in self.items]
+        cached = cache.get_many(keys) if keys else {}
+
+        yield _calendar_header()
+        rendered = {}
+        for key, item in self.items:
+            blob = cached.get(key)
+            if blob is None:
+                # Empty bytes mark items that render to nothing (no start date).
+                blob = rendered[key] = _render_event(item, self.organizer) or b''
+            if blob:
+                yield blob
+        yield CALENDAR_FOOTER
+
+        if rendered:
+            cache.set_many(rendered, VEVENT_CACHE_TIMEOUT)
+
+
+def build_ics_feed(user) -> IcsFeed:
+    """Collect the user's events and their VEVENT cache keys without rendering any ICS."""
+    organizer = _organizer(user)
+    items = [
+        (build_cache_key(VEVENT_CACHE_PREFIX, item['id'], _digest([item, organizer])), item)
+        for item in iter_calendar_events_for_ics(user)
+    ]
+    return IcsFeed(items=items, organizer=organizer)
@@ -174,7 +174,7 @@ def resolve_image_metadata(
     }
 
 
-def create_content_image(
+def build_content_image(
     *,
     user,
     content_type: ContentType,
@@ -188,6 +188,7 @@ def create_content_image(
     immich_integration=None,
     coordinates: Point | None = None,
 ) -> ContentImage:
+    """Resolve provenance and GPS metadata for a new, unsaved ContentImage."""
     metadata = resolve_image_metadata(
         file_bytes=file_bytes,
         source_url=source_url,
@@ -214,7 +215,14 @@ def create_content_image(
     if image_file is not None:
         create_kwargs['image'] = image_file
 
-    return ContentImage.objects.create(**create_kwargs)
+    return ContentImage(**create_kwargs)
+
+
+def create_content_image(**kwargs) -> ContentImage:
+    """Build a ContentImage with ``build_content_image`` and save it."""
+    image = build_content_image(**kwargs)
+    image.save(force_insert=True)
+    return image
 
 
 def resolve_coordinates_for_image(image: ContentImage, immich_integration=None):
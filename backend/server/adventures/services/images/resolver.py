@@ -0,0 +1,107 @@
+"""
+Request-scoped lookups used while rendering images.
+
+An Immich-backed image needs its owner's integration to build a proxy URL, and
+an image map pin needs the name of its generic parent. Both are loaded in bulk
+(integrations for all owners at once, parents grouped by content type) and
+memoised for the rest of the request, so nested image serializers share them.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+
+from adventures.services.images.variants import variant_name
+from integrations.models import ImmichIntegration
+from main.utils import build_media_url, get_public_url
+
+REQUEST_ATTR = '_image_resolver'
+CONTEXT_KEY = 'image_resolver'
+
+
+class ImageResolver:
+    def __init__(self):
+        self._integrations: Dict[Any, Optional[ImmichIntegration]] = {}
+        self._parents: Dict[Tuple[int, str], Any] = {}
+
+    def prime_integrations(self, user_ids: Iterable[Any]) -> None:
+        missing = {user_id for user_id in user_ids if user_id is not None and user_id not in self._integrations}
+        if not missing:
+            return
+        for user_id in missing:
+            self._integrations[user_id] = None
+        # Same pick as ImmichIntegration.objects.filter(user=...).first(): lowest pk per user.
+        for integration in ImmichIntegration.objects.filter(user_id__in=missing).order_by('user_id', 'pk'):
+            if self._integrations[integration.user_id] is None:
+                self._integrations[integration.user_id] = integration
+
+    def integration_for(self, user_id) -> Optional[ImmichIntegration]:
+        if user_id not in self._integrations:
+            self.prime_integrations([user_id])
+        return self._integrations[user_id]
+
+    def prime_parents(self, images: Iterable[Any]) -> None:
+        wanted = defaultdict(set)
+        for image in images:
+            if image.content_type_id and (image.content_type_id, str(image.object_id)) not in self._parents:
+                wanted[image.content_type_id].add(image.object_id)
+
+        for content_type_id, object_ids in wanted.items():
+            for object_id in object_ids:
+                self._parents[(content_type_id, str(object_id))] = None
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            for parent in model._base_manager.filter(pk__in=object_ids):
+                self._parents[(content_type_id, str(parent.pk))] = parent
+
+    def parent_for(self, image) -> Any:
+        key = (image.content_type_id, str(image.object_id))
+        if key not in self._parents:
+            self.prime_parents([image])
+        return self._parents.get(key)
+
+    def image_url(self, image) -> Optional[str]:
+        """
+        Public URL for an image, or ``None`` when it is Immich-backed and its
+        owner no longer has an integration.
+        """
+        if image.immich_id:
+            integration = self.integration_for(image.user_id)
+            if not integration:
+                return None
+            return f"{get_public_url()}/api/integrations/immich/{integration.id}/get/{image.immich_id}"
+        if image.image:
+            return build_media_url(image.image.name)
+        return None
+
+    def image_variants(self, image) -> Dict[str, str]:
+        """``{width: url}`` for the image's downscaled copies, for ``srcset``."""
+        if image.immich_id or not image.image:
+            return {}
+        return {
+            str(width): build_media_url(variant_name(image.image.name, width))
+            for width in image.variants or ()
+        }
+
+
+def get_image_resolver(context: Optional[dict]) -> ImageResolver:
+    """Return the resolver shared by every serializer rendering the current request."""
+    if context is None:
+        return ImageResolver()
+
+    request = context.get('request')
+    if request is not None:
+        # Store on the underlying HttpRequest so fresh serializer contexts built
+        # from the same request still share one resolver.
+        holder = getattr(request, '_request', request)
+        resolver = getattr(holder, REQUEST_ATTR, None)
+        if resolver is None:
+            resolver = ImageResolver()
+            setattr(holder, REQUEST_ATTR, resolver)
+        return resolver
+
+    resolver = context.get(CONTEXT_KEY)
+    if resolver is None:
+        resolver = context[CONTEXT_KEY] = ImageResolver()
+    return resolver
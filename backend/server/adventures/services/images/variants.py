@@ -0,0 +1,187 @@
+"""
+Downscaled derivatives of uploaded images for responsive ``srcset`` use.
+
+For each width in ``IMAGE_VARIANT_WIDTHS`` narrower than the original, a copy
+is stored at ``<dir>/variants/<width>/<original basename>`` in the original's
+format. Keeping the basename lets protected media serving map a variant back
+to its ``ContentImage`` with the indexed path lookup. The widths that exist
+are recorded on ``ContentImage.variants`` and the original's own width on
+``ContentImage.width``, so clients can offer the original as the widest
+``srcset`` candidate.
+
+Decoding and resizing are too slow for a request, so uploads and backup
+imports only queue their image ids once they commit. A small in-process thread
+pool (``IMAGE_VARIANT_WORKERS``, the same arrangement as the geocode queue)
+renders them; the queue is not durable, and ``backfill_image_variants`` renders
+whatever it missed, or everything when the pool is disabled.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+import posixpath
+import queue
+import threading
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from PIL import Image as PILImage, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'variants'
+WEBP_QUALITY = 75
+
+
+def configured_widths() -> list[int]:
+    return sorted({int(width) for width in getattr(settings, 'IMAGE_VARIANT_WIDTHS', []) if int(width) > 0})
+
+
+def variant_name(name: str, width: int) -> str:
+    directory, basename = posixpath.split(name)
+    return posixpath.join(directory, VARIANTS_DIR, str(width), basename)
+
+
+def original_name(path: str) -> Optional[str]:
+    """The original an ``images/variants/<width>/<file>`` path was rendered from."""
+    parts = path.split('/')
+    if len(parts) != 4 or parts[1] != VARIANTS_DIR or not parts[2].isdigit():
+        return None
+    return f'{parts[0]}/{parts[3]}'
+
+
+def variant_names(name: str, widths: Iterable[int]) -> list[str]:
+    return [variant_name(name, width) for width in widths or ()]
+
+
+def render_variants(name: str, widths: Optional[Iterable[int]] = None) -> tuple[int, list[int]]:
+    """
+    Write the variants of the stored image ``name``; return the original's
+    width and the widths rendered.
+
+    Only touches storage, so it is safe to run in a worker process.
+    """
+    widths = configured_widths() if widths is None else sorted(widths)
+    with default_storage.open(name, 'rb') as stored:
+        with PILImage.open(stored) as opened:
+            image_format = opened.format or 'WEBP'
+            # Variants drop EXIF, so apply its orientation to the pixels.
+            source = ImageOps.exif_transpose(opened)
+            source.load()
+
+    rendered = []
+    for width in widths:
+        if width >= source.width:
+            break
+        height = max(1, round(source.height * width / source.width))
+        resized = source.resize((width, height), PILImage.Resampling.LANCZOS)
+        if image_format == 'JPEG' and resized.mode not in ('RGB', 'L'):
+            resized = resized.convert('RGB')
+        buffer = io.BytesIO()
+        options = {'quality': WEBP_QUALITY} if image_format in ('WEBP', 'JPEG') else {}
+        resized.save(buffer, format=image_format, **options)
+
+        target = variant_name(name, width)
+        # Storage would otherwise pick a new name for an existing file.
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+        rendered.append(width)
+    return source.width, rendered
+
+
+def delete_variants(name: str, widths: Iterable[int]) -> None:
+    for target in variant_names(name, widths):
+        try:
+            default_storage.delete(target)
+        except OSError:
+            logger.warning('Could not delete image variant %s', target, exc_info=True)
+
+
+def generate_variants(image_id) -> list[int]:
+    """Render variants for a ``ContentImage`` and record them on the row."""
+    from adventures.models import ContentImage
+
+    image = ContentImage.objects.filter(pk=image_id).only('pk', 'image', 'variants').first()
+    if image is None or not image.image:
+        return []
+    name = image.image.name
+    try:
+        original_width, widths = render_variants(name)
+    except Exception:
+        logger.warning('Could not render variants for image %s', name, exc_info=True)
+        return []
+    stale = set(image.variants) - set(widths)
+    if stale:
+        delete_variants(name, stale)
+    # Skip the write if the image was replaced meanwhile.
+    ContentImage.objects.filter(pk=image.pk, image=name).update(variants=widths, width=original_width)
+    return widths
+
+
+class InProcessVariantPool:
+    """Fixed-size pool of daemon threads rendering queued variants inside a web worker."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+
+    def ensure_started(self) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            # Threads don't survive a fork (e.g. gunicorn preload); restart them.
+            if self._pid != os.getpid():
+                self._threads = []
+                self._pid = os.getpid()
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.size:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"variant-worker-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, image_ids: Iterable) -> None:
+        if self.size <= 0:
+            return
+        self.ensure_started()
+        for image_id in image_ids:
+            self._queue.put(image_id)
+
+    def _run(self) -> None:
+        while True:
+            image_id = self._queue.get()
+            try:
+                generate_variants(image_id)
+            except Exception:
+                logger.exception("In-process variant worker failed")
+            finally:
+                close_old_connections()
+
+
+_pool: Optional[InProcessVariantPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_in_process_pool() -> InProcessVariantPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InProcessVariantPool(int(getattr(settings, 'IMAGE_VARIANT_WORKERS', 1)))
+        return _pool
+
+
+def queue_variants(image_ids: Iterable) -> None:
+    """Hand committed images to the pool; call from ``transaction.on_commit``."""
+    if configured_widths():
+        get_in_process_pool().submit(image_ids)
@@ -0,0 +1,90 @@
+"""
+Find an existing location that an imported one duplicates.
+
+Scoring only runs on a short candidate list from two indexed queries instead of
+on every location the user owns:
+
+* locations whose point lies in the same ``COORDINATE_TOLERANCE`` box
+  (``(user, coordinates)`` GiST index), and
+* locations whose upper-cased name is trigram-similar to the incoming name
+  (``location_name_trgm`` GIN index, pg_trgm's default 0.3 threshold).
+
+Every accepted match needs a name ratio of at least 0.85, which is well above
+what the trigram threshold lets through, so the candidate query does not change
+which location is picked.
+"""
+from difflib import SequenceMatcher
+from typing import Optional
+
+from django.contrib.gis.geos import Polygon
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from adventures.models import Location
+from adventures.utils.geo import WGS84_SRID, make_point, point_to_lat_lon
+
+COORDINATE_TOLERANCE = 0.02
+MAX_CANDIDATES = 50
+
+
+def _ratio(a, b) -> float:
+    a = (a or '').strip().lower()
+    b = (b or '').strip().lower()
+    if not a and not b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _coords_close(lat1, lon1, lat2, lon2, threshold=COORDINATE_TOLERANCE) -> bool:
+    try:
+        if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+            return False
+        return abs(float(lat1) - float(lat2)) <= threshold and abs(float(lon1) - float(lon2)) <= threshold
+    except (TypeError, ValueError):
+        return False
+
+
+def candidate_locations(user, name, lat=None, lon=None):
+    """Locations of ``user`` near the point or with a similar name, most similar first."""
+    name = (name or '').strip().upper()
+    match = Q(name_upper__trigram_similar=name)
+    point = make_point(lon, lat)
+    if point is not None:
+        box = Polygon.from_bbox((
+            point.x - COORDINATE_TOLERANCE, point.y - COORDINATE_TOLERANCE,
+            point.x + COORDINATE_TOLERANCE, point.y + COORDINATE_TOLERANCE,
+        ))
+        box.srid = WGS84_SRID
+        match |= Q(coordinates__bboverlaps=box)
+    return (
+        Location.objects.filter(user=user)
+        .annotate(name_upper=Upper('name'))
+        .filter(match)
+        .annotate(similarity=TrigramSimilarity('name_upper', name))
+        .order_by('-similarity')
+        .only('id', 'name', 'location', 'coordinates')[:MAX_CANDIDATES]
+    )
+
+
+def find_similar_location(user, name, location_text=None, lat=None, lon=None) -> Optional[Location]:
+    """
+    Return the user's location that best matches the incoming one, or None.
+
+    "Very similar" means a strong name match, or a decent name match together
+    with a matching location text or nearby coordinates.
+    """
+    best, best_score = None, 0.0
+    for candidate in candidate_locations(user, name, lat, lon):
+        name_score = _ratio(name, candidate.name)
+        loc_text_score = _ratio(location_text, candidate.location)
+        cand_lat, cand_lon = point_to_lat_lon(candidate.coordinates)
+        close_coords = _coords_close(lat, lon, cand_lat, cand_lon)
+        combined_score = max(name_score, (name_score + loc_text_score) / 2.0)
+        if close_coords:
+            combined_score = max(combined_score, name_score + 0.1)  # small boost for coord proximity
+        if combined_score > best_score and (
+            name_score >= 0.92 or (name_score >= 0.85 and (loc_text_score >= 0.85 or close_coords))
+        ):
+            best, best_score = candidate, combined_score
+    return best
@@ -0,0 +1,255 @@
+"""
+Map pin payloads for the global map.
+
+Pins are built from a single query that annotates visited status and joins the
+category, plus one aggregate for per-category location counts, so the cost no
+longer grows with one query per location.
+
+Callers may pass a viewport (``bbox`` and ``zoom``). The bbox is applied as an
+index-backed ``&&`` filter, and below ``MAP_CLUSTER_MAX_ZOOM`` points are
+grouped with ``ST_SnapToGrid`` into cluster centroids with counts, so payload
+size follows the viewport instead of the account size.
+"""
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import Polygon
+from django.db.models import Avg, Count, FloatField, Func, Q
+
+from adventures.models import Location
+from adventures.utils.geo import point_to_lat_lon
+from adventures.utils.get_is_visited import visited_exists
+
+COORDINATE_PRECISION = 6
+MAX_ZOOM = 22
+TILE_SIZE_PX = 256
+
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class Viewport:
+    bbox: Optional[BBox] = None
+    zoom: Optional[int] = None
+
+    @property
+    def clustered(self) -> bool:
+        max_zoom = int(getattr(settings, 'MAP_CLUSTER_MAX_ZOOM', 10))
+        return self.zoom is not None and self.zoom < max_zoom
+
+
+def parse_viewport(params) -> Viewport:
+    """
+    Read ``bbox=west,south,east,north`` and ``zoom`` from query params.
+
+    Raises ``ValueError`` with a user-facing message on malformed input.
+    """
+    bbox = None
+    raw_bbox = params.get('bbox')
+    if raw_bbox:
+        try:
+            west, south, east, north = (float(part) for part in raw_bbox.split(','))
+        except ValueError:
+            raise ValueError('bbox must be "west,south,east,north" in degrees.')
+        if not all(math.isfinite(value) for value in (west, south, east, north)):
+            raise ValueError('bbox must be "west,south,east,north" in degrees.')
+        if not (-90 <= south <= north <= 90) or not (-180 <= west <= 180 and -180 <= east <= 180):
+            raise ValueError('bbox is outside valid latitude/longitude ranges.')
+        bbox = (west, south, east, north)
+
+    zoom = None
+    raw_zoom = params.get('zoom')
+    if raw_zoom not in (None, ''):
+        try:
+            raw_zoom = float(raw_zoom)
+            if not math.isfinite(raw_zoom):
+                raise ValueError
+            zoom = int(raw_zoom)
+        except (ValueError, OverflowError):
+            raise ValueError('zoom must be a number.')
+        zoom = max(0, min(MAX_ZOOM, zoom))
+
+    return Viewport(bbox=bbox, zoom=zoom)
+
+
+def filter_to_bbox(queryset, bbox: Optional[BBox], field: str = 'coordinates'):
+    if bbox is None:
+        return queryset
+    west, south, east, north = bbox
+    if west <= east:
+        boxes = [(west, south, east, north)]
+    else:
+        # The viewport crosses the antimeridian.
+        boxes = [(west, south, 180.0, north), (-180.0, south, east, north)]
+
+    condition = Q()
+    for box in boxes:
+        condition |= Q(**{f'{field}__bboverlaps': Polygon.from_bbox(box)})
+    return queryset.filter(condition)
+
+
+def grid_size_for_zoom(zoom: int) -> float:
+    """Cell size in degrees that spans roughly MAP_CLUSTER_RADIUS_PX at ``zoom``."""
+    radius_px = int(getattr(settings, 'MAP_CLUSTER_RADIUS_PX', 60))
+    return 360.0 / (TILE_SIZE_PX * 2 ** zoom) * radius_px
+
+
+class SnapToGrid(Func):
+    function = 'ST_SnapToGrid'
+    output_field = PointField(srid=4326)
+
+
+class PointX(Func):
+    function = 'ST_X'
+    output_field = FloatField()
+
+
+class PointY(Func):
+    function = 'ST_Y'
+    output_field = FloatField()
+
+
+def cluster_points(queryset, zoom: int, field: str = 'coordinates', with_visited: bool = False):
+    """
+    Group points into grid cells and return one centroid per non-empty cell.
+
+    ``with_visited`` adds a ``visited_count`` per cell and only applies to
+    Location querysets.
+    """
+    grid = grid_size_for_zoom(zoom)
+    snapped = SnapToGrid(field, grid)
+    base = queryset.filter(**{f'{field}__isnull': False})
+    if base.query.distinct:
+        # Joins behind DISTINCT would inflate the counts; count each row once.
+        base = queryset.model.objects.filter(pk__in=base.values('pk'))
+
+    aggregates = {
+        'count': Count('pk'),
+        'latitude': Avg(PointY(field)),
+        'longitude': Avg(PointX(field)),
+    }
+    if with_visited:
+        aggregates['visited'] = Count('pk', filter=visited_exists())
+
+    rows = (
+        base.annotate(cell_x=PointX(snapped), cell_y=PointY(snapped))
+        .values('cell_x', 'cell_y')
+        .annotate(**aggregates)
+        .order_by('cell_y', 'cell_x')
+    )
+
+    clusters = []
+    for row in rows:
+        cluster = {
+            'latitude': round(row['latitude'], COORDINATE_PRECISION),
+            'longitude': round(row['longitude'], COORDINATE_PRECISION),
+            'count': row['count'],
+        }
+        if with_visited:
+            cluster['visited_count'] = row['visited']
+        clusters.append(cluster)
+    return clusters
+
+
+def build_location_clusters(user, viewport: Viewport) -> Dict[str, Any]:
+    queryset = filter_to_bbox(Location.objects.filter(user=user), viewport.bbox)
+    return {
+        'type': 'clusters',
+        'zoom': viewport.zoom,
+        'grid_size': grid_size_for_zoom(viewport.zoom),
+        'clusters': cluster_points(queryset, viewport.zoom, with_visited=True),
+    }
+
+
+def _category_counts(user) -> Dict[Any, int]:
+    return dict(
+        Location.objects.filter(user=user, category__isnull=False)
+        .values_list('category_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+
+def build_location_pins(user, bbox: Optional[BBox] = None) -> List[Dict[str, Any]]:
+    """Pins in the ``MapPinSerializer`` shape for the user's locations (optionally in ``bbox``)."""
+    rows = (
+        filter_to_bbox(Location.objects.filter(user=user), bbox)
+        .annotate(visited=visited_exists())
+        # Stable order keeps the ETag stable between identical requests.
+        .order_by('id')
+        .values_list(
+            'id',
+            'name',
+            'coordinates',
+            'visited',
+            'category_id',
+            'category__name',
+            'category__display_name',
+            'category__icon',
+        )
+    )
+    counts = _category_counts(user)
+
+    pins = []
+    categories: Dict[Any, Dict[str, Any]] = {}
+    for location_id, name, coordinates, visited, category_id, cat_name, cat_display, cat_icon in rows:
+        latitude, longitude = point_to_lat_lon(coordinates)
+        category = None
+        if category_id is not None:
+            category = categories.get(category_id)
+            if category is None:
+                category = categories[category_id] = {
+                    'id': str(category_id),
+                    'name': cat_name,
+                    'display_name': cat_display,
+                    'icon': cat_icon,
+                    'num_locations': counts.get(category_id, 0),
+                }
+        pins.append({
+            'id': str(location_id),
+            'name': name,
+            'latitude': latitude,
+            'longitude': longitude,
+            'is_visited': bool(visited),
+            'category': category,
+        })
+    return pins
+
+
+def to_columnar(pins: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compact layout: parallel arrays plus a packed ``[lat0, lon0, lat1, lon1, ...]``
+    coordinate list. Categories are listed once and referenced by index.
+    """
+    categories: List[Dict[str, Any]] = []
+    category_index: Dict[str, int] = {}
+    ids, names, coordinates, visited, pin_categories = [], [], [], [], []
+
+    for pin in pins:
+        ids.append(pin['id'])
+        names.append(pin['name'])
+        for value in (pin['latitude'], pin['longitude']):
+            coordinates.append(round(value, COORDINATE_PRECISION) if value is not None else None)
+        visited.append(pin['is_visited'])
+
+        category = pin['category']
+        if category is None:
+            pin_categories.append(None)
+            continue
+        if category['id'] not in category_index:
+            category_index[category['id']] = len(categories)
+            categories.append(category)
+        pin_categories.append(category_index[category['id']])
+
+    return {
+        'count': len(ids),
+        'ids': ids,
+        'names': names,
+        'coordinates': coordinates,
+        'is_visited': visited,
+        'category': pin_categories,
+        'categories': categories,
+    }
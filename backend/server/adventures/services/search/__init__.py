@@ -1,3 +1,4 @@
 from adventures.services.search.global_search import global_search, SearchValidationError
+from adventures.services.search.suggest import suggest
 
-__all__ = ['global_search', 'SearchValidationError']
+__all__ = ['global_search', 'suggest', 'SearchValidationError']
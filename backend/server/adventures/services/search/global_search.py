@@ -5,7 +5,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
-from django.db.models import Q, QuerySet
+from django.db.models import Count, F, Q, QuerySet, Window
 
 from adventures.models import (
     Activity,
@@ -102,20 +102,34 @@ def _fts_queries(term: str) -> tuple[SearchQuery, SearchQuery | None]:
 
 def _apply_text_search(
     base_qs: QuerySet,
-    vector: SearchVector,
     term: str,
     icontains_fields: tuple[str, ...],
+    vector: SearchVector | None = None,
 ) -> QuerySet:
+    """
+    Match ``term`` by full text or substring and annotate ``rank``.
+
+    User content matches against its stored ``search_vector`` column (GIN
+    indexed) and the substring fallback is served by pg_trgm indexes; pass
+    ``vector`` for models without a stored column.
+    """
     plain_query, prefix_query = _fts_queries(term)
-    text_filter = Q(search=plain_query) | _icontains_filter(term, icontains_fields)
+    if vector is None:
+        lookup, vector = 'search_vector', F('search_vector')
+    else:
+        lookup, base_qs = 'search', base_qs.annotate(search=vector)
+
+    text_filter = Q(**{lookup: plain_query}) | _icontains_filter(term, icontains_fields)
     if prefix_query is not None:
-        text_filter |= Q(search=prefix_query)
+        text_filter |= Q(**{lookup: prefix_query})
 
-    return (
-        base_qs.annotate(search=vector, rank=SearchRank(vector, plain_query))
-        .filter(text_filter)
-        .distinct()
-    )
+    return base_qs.annotate(rank=SearchRank(vector, plain_query)).filter(text_filter)
+
+
+def _fetch_page(qs: QuerySet, limit: int) -> tuple[list[Any], int]:
+    """Fetch the first ``limit`` rows together with the total match count in one query."""
+    rows = list(qs.annotate(match_total=Window(Count('*')))[:limit])
+    return rows, rows[0].match_total if rows else 0
 
 
 def _location_subtitle_and_meta(location: Location) -> tuple[str, dict[str, Any]]:
@@ -196,14 +210,12 @@ def _collection_url(collection_id) -> str:
 
 
 def _search_locations(user: User, term: str, fetch_limit: int) -> tuple[list[SearchHit], int]:
-    vector = _search_vector('name', 'description', 'location')
     icontains_fields = ('name', 'description', 'location')
     base_qs = Location.objects.filter(user=user).select_related('country', 'category')
-    matched = _apply_text_search(base_qs, vector, term, icontains_fields)
-    qs = matched.order_by('-rank', '-updated_at')[:fetch_limit]
-    total = matched.count()
+    matched = _apply_text_search(base_qs, term, icontains_fields)
+    rows, total = _fetch_page(matched.order_by('-rank', '-updated_at'), fetch_limit)
     hits = []
-    for location in qs:
+    for location in rows:
         subtitle, meta = _location_subtitle_and_meta(location)
         score = float(location.rank or 0) or PARTIAL_MATCH_SCORE
         hits.append(
@@ -227,14 +239,14 @@ def _search_locations(user: User, term: str, fetch_limit: int) -> tuple[list[Sea
 
 
 def _search_collections(user: User, term: str, fetch_limit: int) -> tuple[list[SearchHit], int]:
-    vector = _search_vector('name', 'description')
     icontains_fields = ('name', 'description')
-    base_qs = Collection.objects.filter(Q(user=user) | Q(shared_with=user)).distinct()
-    matched = _apply_text_search(base_qs, vector, term, icontains_fields)
-    qs = matched.order_by('-rank', '-updated_at')[:fetch_limit]
-    total = matched.count()
+    # A subquery instead of joining shared_with keeps rows unique without DISTINCT.
+    shared_ids = Collection.objects.filter(shared_with=user).values('id')
+    base_qs = Collection.objects.filter(Q(user=user) | Q(id__in=shared_ids))
+    matched = _apply_text_search(base_qs, term, icontains_fields)
+    rows, total = _fetch_page(matched.order_by('-rank', '-updated_at'), fetch_limit)
     hits = []
-    for collection in qs:
+    for collection in rows:
         is_shared = collection.user_id != user.id
         score = float(collection.rank or 0) or PARTIAL_MATCH_SCORE
         hits.append(
@@ -266,13 +278,11 @@ def _search_collection_entity(
     vector_fields: tuple[str, ...],
     fetch_limit: int,
 ) -> tuple[list[SearchHit], int]:
-    vector = _search_vector(*vector_fields)
     base_qs = model.objects.filter(user=user).select_related('collection')
-    matched = _apply_text_search(base_qs, vector, term, vector_fields)
-    qs = matched.order_by('-rank', '-updated_at')[:fetch_limit]
-    total = matched.count()
+    matched = _apply_text_search(base_qs, term, vector_fields)
+    rows, total = _fetch_page(matched.order_by('-rank', '-updated_at'), fetch_limit)
     hits = []
-    for obj in qs:
+    for obj in rows:
         collection = getattr(obj, 'collection', None)
         url = _collection_url(collection.id) if collection else '/collections'
         score = float(obj.rank or 0) or PARTIAL_MATCH_SCORE
@@ -297,14 +307,12 @@ def _search_collection_entity(
 
 
 def _search_activities(user: User, term: str, fetch_limit: int) -> tuple[list[SearchHit], int]:
-    vector = _search_vector('name')
     icontains_fields = ('name',)
     base_qs = Activity.objects.filter(user=user).select_related('visit__location')
-    matched = _apply_text_search(base_qs, vector, term, icontains_fields)
-    qs = matched.order_by('-rank', '-start_date')[:fetch_limit]
-    total = matched.count()
+    matched = _apply_text_search(base_qs, term, icontains_fields)
+    rows, total = _fetch_page(matched.order_by('-rank', '-start_date'), fetch_limit)
     hits = []
-    for activity in qs:
+    for activity in rows:
         location = activity.visit.location if activity.visit_id else None
         url = f'/locations/{location.id}' if location else '/locations'
         subtitle = location.name if location else activity.sport_type
@@ -333,11 +341,10 @@ def _search_countries(term: str, fetch_limit: int) -> tuple[list[SearchHit], int
     vector = _search_vector('name', 'country_code')
     icontains_fields = ('name', 'country_code')
     base_qs = Country.objects.all()
-    matched = _apply_text_search(base_qs, vector, term, icontains_fields)
-    qs = matched.order_by('-rank', 'name')[: min(fetch_limit, REFERENCE_TYPE_LIMIT)]
-    total = matched.count()
+    matched = _apply_text_search(base_qs, term, icontains_fields, vector=vector)
+    rows, total = _fetch_page(matched.order_by('-rank', 'name'), min(fetch_limit, REFERENCE_TYPE_LIMIT))
     hits = []
-    for country in qs:
+    for country in rows:
         score = float(country.rank or 0) or PARTIAL_MATCH_SCORE
         hits.append(
             SearchHit(
@@ -358,10 +365,9 @@ def _search_regions(user: User, term: str, fetch_limit: int) -> tuple[list[Searc
         VisitedRegion.objects.filter(user=user).values_list('region_id', flat=True)
     )
     base_qs = Region.objects.filter(_icontains_filter(term, ('name',))).select_related('country')
-    qs = base_qs.order_by('name')[: min(fetch_limit, REFERENCE_TYPE_LIMIT)]
-    total = base_qs.count()
+    rows, total = _fetch_page(base_qs.order_by('name'), min(fetch_limit, REFERENCE_TYPE_LIMIT))
     hits = []
-    for region in qs:
+    for region in rows:
         country_code = region.country.country_code if region.country_id else region.id.split('-')[0]
         hits.append(
             SearchHit(
@@ -383,10 +389,9 @@ def _search_cities(user: User, term: str, fetch_limit: int) -> tuple[list[Search
         VisitedCity.objects.filter(user=user).values_list('city_id', flat=True)
     )
     base_qs = City.objects.filter(_icontains_filter(term, ('name',))).select_related('region__country')
-    qs = base_qs.order_by('name')[: min(fetch_limit, REFERENCE_TYPE_LIMIT)]
-    total = base_qs.count()
+    rows, total = _fetch_page(base_qs.order_by('name'), min(fetch_limit, REFERENCE_TYPE_LIMIT))
     hits = []
-    for city in qs:
+    for city in rows:
         country_code = city.region.country.country_code if city.region_id and city.region.country_id else ''
         hits.append(
             SearchHit(
@@ -408,10 +413,9 @@ def _search_users(term: str, fetch_limit: int) -> tuple[list[SearchHit], int]:
         _icontains_filter(term, ('username', 'first_name', 'last_name'))
         & Q(public_profile=True)
     )
-    qs = base_qs.order_by('username')[: min(fetch_limit, REFERENCE_TYPE_LIMIT)]
-    total = base_qs.count()
+    rows, total = _fetch_page(base_qs.order_by('username'), min(fetch_limit, REFERENCE_TYPE_LIMIT))
     hits = []
-    for profile_user in qs:
+    for profile_user in rows:
         display_name = profile_user.get_full_name() or profile_user.username
         hits.append(
             SearchHit(
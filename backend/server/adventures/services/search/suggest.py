@@ -0,0 +1,128 @@
+"""
+Typeahead suggestions for global search.
+
+Unlike ``global_search`` this returns titles only: no totals, subtitles or
+reference data. All entity types are read in one UNION query whose branches
+match the title by substring (pg_trgm ``*_name_trgm`` indexes) or any indexed
+field by word prefix (stored ``search_vector``), and each branch stops after
+``limit`` rows. Results are cached per user and prefix under the user's data
+version, which model signals bump on every write, so edits show up on the next
+keystroke.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, F, Q, QuerySet, Value, When
+
+from adventures.models import Activity, Checklist, Collection, Location, Lodging, Note, Transportation
+from adventures.services.dashboard_cache import get_user_data_version
+from adventures.services.external_cache import build_cache_key
+from adventures.services.search.global_search import (
+    TYPE_SORT_PRIORITY,
+    SearchValidationError,
+    _collection_url,
+    _fts_queries,
+    normalize_query,
+)
+from users.models import CustomUser as User
+
+SUGGEST_CACHE_PREFIX = 'search_suggest_v1'
+DEFAULT_SUGGEST_LIMIT = 8
+MAX_SUGGEST_LIMIT = 20
+
+# type -> (model, field holding the id the result links to)
+SUGGEST_TYPES: dict[str, tuple[Any, str]] = {
+    'location': (Location, 'id'),
+    'collection': (Collection, 'id'),
+    'lodging': (Lodging, 'collection_id'),
+    'transportation': (Transportation, 'collection_id'),
+    'note': (Note, 'collection_id'),
+    'checklist': (Checklist, 'collection_id'),
+    'activity': (Activity, 'visit__location_id'),
+}
+
+
+def _suggest_url(entity_type: str, target_id) -> str:
+    if entity_type in ('location', 'activity'):
+        return f'/locations/{target_id}' if target_id else '/locations'
+    return _collection_url(target_id) if target_id else '/collections'
+
+
+def _branch(entity_type: str, user: User, term: str, limit: int) -> QuerySet:
+    model, target = SUGGEST_TYPES[entity_type]
+    if model is Collection:
+        shared_ids = Collection.objects.filter(shared_with=user).values('id')
+        base_qs = Collection.objects.filter(Q(user=user) | Q(id__in=shared_ids))
+    else:
+        base_qs = model.objects.filter(user=user)
+
+    _, prefix_query = _fts_queries(term)
+    text_filter = Q(name__icontains=term)
+    if prefix_query is not None:
+        text_filter |= Q(search_vector=prefix_query)
+
+    return (
+        base_qs.filter(text_filter)
+        .annotate(
+            kind=Value(entity_type),
+            title=F('name'),
+            target=F(target),
+            title_prefix=Case(When(name__istartswith=term, then=True), default=False, output_field=BooleanField()),
+        )
+        .order_by('-title_prefix', 'name')
+        .values_list('kind', 'id', 'title', 'target', 'title_prefix')[:limit]
+    )
+
+
+def _fetch_suggestions(user: User, term: str, types: list[str], limit: int) -> list[dict[str, Any]]:
+    branches = [_branch(entity_type, user, term, limit) for entity_type in types]
+    rows = list(branches[0].union(*branches[1:], all=True)) if len(branches) > 1 else list(branches[0])
+
+    # Titles that start with the prefix first, then the usual type priority.
+    rows.sort(key=lambda row: (not row[4], -TYPE_SORT_PRIORITY.get(row[0], 0), row[2].lower()))
+    return [
+        {
+            'type': entity_type,
+            'id': str(item_id),
+            'title': title,
+            'url': _suggest_url(entity_type, target),
+        }
+        for entity_type, item_id, title, target, _ in rows[:limit]
+    ]
+
+
+def suggest(
+    user: User,
+    query: str,
+    *,
+    types: set[str] | None = None,
+    limit: int = DEFAULT_SUGGEST_LIMIT,
+) -> dict[str, Any]:
+    term = normalize_query(query)
+    search_types = types or set(SUGGEST_TYPES)
+    invalid_types = search_types - set(SUGGEST_TYPES)
+    if invalid_types:
+        raise SearchValidationError(f'Invalid suggestion types: {", ".join(sorted(invalid_types))}')
+    search_types = sorted(search_types)
+    limit = max(1, min(limit, MAX_SUGGEST_LIMIT))
+
+    timeout = int(getattr(settings, 'SEARCH_SUGGEST_CACHE_TIMEOUT', 600))
+    if timeout <= 0:
+        return {'query': term, 'results': _fetch_suggestions(user, term, search_types, limit)}
+
+    key = build_cache_key(
+        SUGGEST_CACHE_PREFIX,
+        str(user.uuid),
+        str(get_user_data_version(user.pk)),
+        ','.join(search_types),
+        str(limit),
+        term,
+    )
+    results = cache.get(key)
+    if results is None:
+        results = _fetch_suggestions(user, term, search_types, limit)
+        cache.set(key, results, timeout)
+    return {'query': term, 'results': results}
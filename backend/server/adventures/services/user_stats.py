@@ -1,26 +1,29 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Sum, Avg, Max, Count
+from django.db.models import Sum, Max, Count, Case, CharField, F, Q, Value, When, Window
+from django.db.models.functions import RowNumber
 
 from adventures.models import Location, Collection, Activity
-from adventures.utils.get_is_visited import is_location_visited
 from adventures.utils.sports_types import SPORT_CATEGORIES
 from worldtravel.models import City, Region, Country, VisitedCity, VisitedRegion
 
 User = get_user_model()
 
+SPORT_TO_CATEGORY = {sport: category for category, sports in SPORT_CATEGORIES.items() for sport in sports}
+
+# Record holder key -> Activity field it ranks by.
+RECORD_METRICS = {
+    'max_distance': 'distance',
+    'max_speed': 'max_speed',
+    'max_elevation_gain': 'elevation_gain',
+    'max_calories': 'calories',
+}
+
 
 class UserStatsService:
     """Build travel and activity statistics for a user profile."""
 
     def get_visited_locations_count(self, user):
-        visited_count = 0
-        user_locations = Location.objects.filter(user=user).prefetch_related('visits')
-
-        for location in user_locations:
-            if is_location_visited(location):
-                visited_count += 1
-
-        return visited_count
+        return Location.objects.filter(user=user).with_visited_status().filter(is_visited=True).count()
 
     def _can_view_location(self, request_user, profile_user, location):
         if not location:
@@ -49,104 +52,120 @@ class UserStatsService:
             'location_name': location.name if (location and can_view_location) else None,
         }
 
+    def _category_record_holders(self, activities):
+        """
+        Top activity per (category, metric), found with one windowed query.
+
+        Ties are broken by the most recent start date, as with
+        ``order_by('-metric', '-start_date')``; a category whose rows all lack
+        the metric has no holder for it.
+        """
+        category = Case(
+            *[When(sport_type__in=sports, then=Value(name)) for name, sports in SPORT_CATEGORIES.items()],
+            output_field=CharField(),
+        )
+        ranked = activities.annotate(stats_category=category)
+        holder_filter = Q()
+        for metric_key, field in RECORD_METRICS.items():
+            ranked = ranked.annotate(**{
+                f'{metric_key}_rank': Window(
+                    RowNumber(),
+                    partition_by=[F('stats_category')],
+                    order_by=[F(field).desc(nulls_last=True), F('start_date').desc()],
+                )
+            })
+            holder_filter |= Q(**{f'{metric_key}_rank': 1})
+
+        holders = {}
+        for activity in ranked.filter(holder_filter).select_related('visit__location'):
+            for metric_key, field in RECORD_METRICS.items():
+                if getattr(activity, f'{metric_key}_rank') == 1 and getattr(activity, field) is not None:
+                    holders[(activity.stats_category, metric_key)] = activity
+        return holders
+
     def get_activity_stats_by_category(self, user_activities, profile_user, request_user):
-        category_stats = {}
+        activities = user_activities.filter(sport_type__in=list(SPORT_TO_CATEGORY))
+        rows = (
+            activities.order_by()
+            .values('sport_type')
+            .annotate(
+                count=Count('id'),
+                total_distance=Sum('distance'),
+                distance_count=Count('distance'),
+                max_distance=Max('distance'),
+                total_moving_time=Sum('moving_time'),
+                total_elevation_gain=Sum('elevation_gain'),
+                elevation_gain_count=Count('elevation_gain'),
+                max_elevation_gain=Max('elevation_gain'),
+                total_elevation_loss=Sum('elevation_loss'),
+                total_average_speed=Sum('average_speed'),
+                average_speed_count=Count('average_speed'),
+                max_speed=Max('max_speed'),
+                total_calories=Sum('calories'),
+            )
+        )
+        by_sport = {row['sport_type']: row for row in rows}
+        if not by_sport:
+            return {}
 
+        holders = self._category_record_holders(activities)
+
+        def total(sport_rows, key):
+            values = [row[key] for row in sport_rows if row[key] is not None]
+            return sum(values) if values else None
+
+        def maximum(sport_rows, key):
+            values = [row[key] for row in sport_rows if row[key] is not None]
+            return max(values) if values else None
+
+        def average(sport_rows, total_key, count_key):
+            count = sum(row[count_key] for row in sport_rows)
+            return total(sport_rows, total_key) / count if count else None
+
+        category_stats = {}
         for category, sports in SPORT_CATEGORIES.items():
-            activities = user_activities.filter(sport_type__in=sports)
-
-            if activities.exists():
-                stats = activities.aggregate(
-                    count=Count('id'),
-                    total_distance=Sum('distance'),
-                    total_moving_time=Sum('moving_time'),
-                    total_elevation_gain=Sum('elevation_gain'),
-                    total_elevation_loss=Sum('elevation_loss'),
-                    avg_distance=Avg('distance'),
-                    max_distance=Max('distance'),
-                    avg_elevation_gain=Avg('elevation_gain'),
-                    max_elevation_gain=Max('elevation_gain'),
-                    avg_speed=Avg('average_speed'),
-                    max_speed=Max('max_speed'),
-                    total_calories=Sum('calories'),
+            sport_rows = [by_sport[sport] for sport in sports if sport in by_sport]
+            if not sport_rows:
+                continue
+
+            total_moving_time = total(sport_rows, 'total_moving_time')
+            record_holders = {}
+            for metric_key, field in RECORD_METRICS.items():
+                activity = holders.get((category, metric_key))
+                record_holders[metric_key] = self._build_activity_record(
+                    activity,
+                    field,
+                    getattr(activity, field) if activity else None,
+                    profile_user,
+                    request_user,
                 )
 
-                total_moving_seconds = 0
-                if stats['total_moving_time']:
-                    total_moving_seconds = int(stats['total_moving_time'].total_seconds())
-
-                sport_breakdown = {}
-                for sport in sports:
-                    sport_activities = activities.filter(sport_type=sport)
-                    if sport_activities.exists():
-                        sport_stats = sport_activities.aggregate(
-                            count=Count('id'),
-                            total_distance=Sum('distance'),
-                            total_elevation_gain=Sum('elevation_gain'),
-                        )
-                        sport_breakdown[sport] = {
-                            'count': sport_stats['count'],
-                            'total_distance': round(sport_stats['total_distance'] or 0, 2),
-                            'total_elevation_gain': round(sport_stats['total_elevation_gain'] or 0, 2),
-                        }
-
-                category_stats[category] = {
-                    'count': stats['count'],
-                    'total_distance': round(stats['total_distance'] or 0, 2),
-                    'total_moving_time': total_moving_seconds,
-                    'total_elevation_gain': round(stats['total_elevation_gain'] or 0, 2),
-                    'total_elevation_loss': round(stats['total_elevation_loss'] or 0, 2),
-                    'avg_distance': round(stats['avg_distance'] or 0, 2),
-                    'max_distance': round(stats['max_distance'] or 0, 2),
-                    'avg_elevation_gain': round(stats['avg_elevation_gain'] or 0, 2),
-                    'max_elevation_gain': round(stats['max_elevation_gain'] or 0, 2),
-                    'avg_speed': round(stats['avg_speed'] or 0, 2),
-                    'max_speed': round(stats['max_speed'] or 0, 2),
-                    'total_calories': round(stats['total_calories'] or 0, 2),
-                    'sports': sport_breakdown,
-                    'record_holders': {
-                        'max_distance': self._build_activity_record(
-                            activities.exclude(distance__isnull=True)
-                            .select_related('visit__location')
-                            .order_by('-distance', '-start_date')
-                            .first(),
-                            'distance',
-                            stats['max_distance'],
-                            profile_user,
-                            request_user,
-                        ),
-                        'max_speed': self._build_activity_record(
-                            activities.exclude(max_speed__isnull=True)
-                            .select_related('visit__location')
-                            .order_by('-max_speed', '-start_date')
-                            .first(),
-                            'max_speed',
-                            stats['max_speed'],
-                            profile_user,
-                            request_user,
-                        ),
-                        'max_elevation_gain': self._build_activity_record(
-                            activities.exclude(elevation_gain__isnull=True)
-                            .select_related('visit__location')
-                            .order_by('-elevation_gain', '-start_date')
-                            .first(),
-                            'elevation_gain',
-                            stats['max_elevation_gain'],
-                            profile_user,
-                            request_user,
-                        ),
-                        'max_calories': self._build_activity_record(
-                            activities.exclude(calories__isnull=True)
-                            .select_related('visit__location')
-                            .order_by('-calories', '-start_date')
-                            .first(),
-                            'calories',
-                            activities.exclude(calories__isnull=True).aggregate(value=Max('calories'))['value'],
-                            profile_user,
-                            request_user,
-                        ),
-                    },
-                }
+            category_stats[category] = {
+                'count': sum(row['count'] for row in sport_rows),
+                'total_distance': round(total(sport_rows, 'total_distance') or 0, 2),
+                'total_moving_time': int(total_moving_time.total_seconds()) if total_moving_time else 0,
+                'total_elevation_gain': round(total(sport_rows, 'total_elevation_gain') or 0, 2),
+                'total_elevation_loss': round(total(sport_rows, 'total_elevation_loss') or 0, 2),
+                'avg_distance': round(average(sport_rows, 'total_distance', 'distance_count') or 0, 2),
+                'max_distance': round(maximum(sport_rows, 'max_distance') or 0, 2),
+                'avg_elevation_gain': round(
+                    average(sport_rows, 'total_elevation_gain', 'elevation_gain_count') or 0, 2
+                ),
+                'max_elevation_gain': round(maximum(sport_rows, 'max_elevation_gain') or 0, 2),
+                'avg_speed': round(average(sport_rows, 'total_average_speed', 'average_speed_count') or 0, 2),
+                'max_speed': round(maximum(sport_rows, 'max_speed') or 0, 2),
+                'total_calories': round(total(sport_rows, 'total_calories') or 0, 2),
+                'sports': {
+                    sport: {
+                        'count': by_sport[sport]['count'],
+                        'total_distance': round(by_sport[sport]['total_distance'] or 0, 2),
+                        'total_elevation_gain': round(by_sport[sport]['total_elevation_gain'] or 0, 2),
+                    }
+                    for sport in sports
+                    if sport in by_sport
+                },
+                'record_holders': record_holders,
+            }
 
         return category_stats
 
@@ -1,8 +1,30 @@
-from django.db.models.signals import m2m_changed, post_delete
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
 
-from adventures.models import Location
+from adventures.models import (
+    Activity,
+    Category,
+    Checklist,
+    Collection,
+    CollectionInvite,
+    ContentImage,
+    Location,
+    Lodging,
+    Note,
+    Transportation,
+    Visit,
+)
+from adventures.services.dashboard_cache import (
+    collection_member_ids,
+    location_member_ids,
+    mark_user_data_changed,
+)
+from adventures.services.images.variants import delete_variants, queue_variants
+from adventures.utils.file_permissions import collection_scope, invalidate_media_permissions, owner_scope
+from worldtravel.models import VisitedCity, VisitedRegion
 
 
 @receiver(m2m_changed, sender=Location.collections.through)
@@ -72,3 +94,178 @@ def _remove_collection_itinerary_items_on_object_delete(sender, instance, **kwar
             # If deletion fails for any reason, do nothing; we don't want to
             # raise errors during another model's delete.
             pass
+
+
+def _dashboard_users(instance):
+    """Users whose dashboard shows ``instance`` (owners plus collection collaborators)."""
+    if isinstance(instance, Location):
+        return location_member_ids([instance.pk])
+    if isinstance(instance, Visit):
+        return location_member_ids([instance.location_id])
+    if isinstance(instance, Collection):
+        return {instance.user_id} | collection_member_ids([instance.pk])
+    if isinstance(instance, (Transportation, Lodging, Note, Checklist)):
+        return {instance.user_id} | collection_member_ids([instance.collection_id])
+    if isinstance(instance, CollectionInvite):
+        return {instance.invited_user_id}
+    if isinstance(instance, ContentImage):
+        if instance.content_type_id == ContentType.objects.get_for_model(Location).id:
+            return {instance.user_id} | location_member_ids([instance.object_id])
+        return {instance.user_id}
+    return {instance.user_id}
+
+
+DASHBOARD_SENDERS = (
+    Location, Visit, Collection, Transportation, Lodging, Note, Checklist,
+    Activity, CollectionInvite, Category, ContentImage,
+)
+
+
+def _invalidate_dashboards(sender, instance, raw=False, **kwargs):
+    # Fixture loading (raw saves) happens before any dashboard was cached.
+    if raw:
+        return
+    mark_user_data_changed(_dashboard_users(instance))
+
+
+# pre_delete so collection memberships are still readable.
+for _sender in DASHBOARD_SENDERS:
+    post_save.connect(_invalidate_dashboards, sender=_sender, dispatch_uid=f'dashboard_save_{_sender.__name__}')
+    pre_delete.connect(_invalidate_dashboards, sender=_sender, dispatch_uid=f'dashboard_delete_{_sender.__name__}')
+
+
+@receiver(m2m_changed, sender=Location.collections.through)
+def _invalidate_dashboards_on_location_collections(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # ``instance`` is a collection; pk_set holds locations (None on clear).
+        location_ids = pk_set if pk_set is not None else instance.locations.values_list('pk', flat=True)
+        users = collection_member_ids([instance.pk]) | location_member_ids(location_ids)
+    else:
+        collection_ids = pk_set if pk_set is not None else instance.collections.values_list('pk', flat=True)
+        users = {instance.user_id} | collection_member_ids(collection_ids)
+    mark_user_data_changed(users)
+
+
+@receiver(m2m_changed, sender=Collection.shared_with.through)
+def _invalidate_dashboards_on_sharing(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # ``instance`` is a user; pk_set holds collections (None on clear).
+        collection_ids = pk_set if pk_set is not None else instance.shared_with.values_list('pk', flat=True)
+        users = {instance.pk} | collection_member_ids(collection_ids)
+    else:
+        users = collection_member_ids([instance.pk]) | set(pk_set or ())
+    mark_user_data_changed(users)
+
+
+# Dashboard stats count visited regions and cities.
+def _invalidate_dashboard_on_visited_place(sender, instance, raw=False, **kwargs):
+    if not raw:
+        mark_user_data_changed([instance.user_id])
+
+
+for _sender in (VisitedRegion, VisitedCity):
+    post_save.connect(_invalidate_dashboard_on_visited_place, sender=_sender, dispatch_uid=f'dashboard_save_{_sender.__name__}')
+    post_delete.connect(_invalidate_dashboard_on_visited_place, sender=_sender, dispatch_uid=f'dashboard_delete_{_sender.__name__}')
+
+
+@receiver(post_save, sender=get_user_model())
+def _invalidate_dashboard_on_profile_change(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Logins only touch last_login, which the dashboard doesn't show.
+    if raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    mark_user_data_changed([instance.pk])
+
+
+# Protected media access follows the owning object's publicity, owner,
+# collections and sharing; drop cached decisions when one of those changes.
+MEDIA_PERMISSION_FIELDS = ('is_public', 'user', 'collection')
+MEDIA_PERMISSION_SENDERS = (Location, Collection, Transportation, Lodging, Note, Checklist)
+
+
+def _media_permission_changes(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    fields = [field for field in sender._meta.concrete_fields if field.name in MEDIA_PERMISSION_FIELDS]
+    if update_fields is not None:
+        fields = [field for field in fields if field.name in update_fields]
+    if not fields:
+        return
+    attnames = [field.attname for field in fields]
+    previous = sender.objects.filter(pk=instance.pk).values_list(*attnames).first()
+    if previous is None:
+        return
+    current = tuple(getattr(instance, attname) for attname in attnames)
+    if previous == current:
+        return
+
+    scopes = set()
+    if sender is Collection:
+        scopes.add(collection_scope(instance.pk))
+    for attname, old, new in zip(attnames, previous, current):
+        if attname == 'user_id':
+            scopes.update(owner_scope(user_id) for user_id in (old, new))
+    scopes.add(owner_scope(instance.user_id))
+    invalidate_media_permissions(scopes)
+
+
+for _sender in MEDIA_PERMISSION_SENDERS:
+    pre_save.connect(_media_permission_changes, sender=_sender, dispatch_uid=f'media_permission_save_{_sender.__name__}')
+
+
+@receiver(post_delete, sender=Collection)
+def _invalidate_media_permissions_on_collection_delete(sender, instance, **kwargs):
+    invalidate_media_permissions([collection_scope(instance.pk)])
+
+
+@receiver(m2m_changed, sender=Location.collections.through)
+def _invalidate_media_permissions_on_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # ``instance`` is a collection; pk_set holds locations (None on clear).
+        locations = Location.objects.filter(pk__in=pk_set) if pk_set is not None else instance.locations.all()
+        owners = set(locations.values_list('user_id', flat=True))
+    else:
+        owners = {instance.user_id}
+    invalidate_media_permissions(owner_scope(user_id) for user_id in owners)
+
+
+@receiver(m2m_changed, sender=Collection.shared_with.through)
+def _invalidate_media_permissions_on_sharing(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # ``instance`` is a user; pk_set holds collections (None on clear).
+        collection_ids = pk_set if pk_set is not None else instance.shared_with.values_list('pk', flat=True)
+    else:
+        collection_ids = [instance.pk]
+    invalidate_media_permissions(collection_scope(pk) for pk in collection_ids)
+
+
+@receiver(pre_save, sender=ContentImage)
+def _note_new_image_upload(sender, instance, raw=False, **kwargs):
+    # Uploads are uncommitted until the field writes them during save.
+    if raw or not instance.image or getattr(instance.image, '_committed', True):
+        return
+    previous = None
+    if not instance._state.adding:
+        previous = ContentImage.objects.filter(pk=instance.pk).values_list('image', 'variants').first()
+    instance._replaced_image_variants = previous
+    instance.variants = []
+    instance.width = None
+
+
+@receiver(post_save, sender=ContentImage)
+def _render_image_variants(sender, instance, raw=False, **kwargs):
+    if not hasattr(instance, '_replaced_image_variants'):
+        return
+    previous = instance.__dict__.pop('_replaced_image_variants')
+    if previous and previous[0] and previous[1]:
+        old_name, old_widths = previous
+        transaction.on_commit(lambda: delete_variants(old_name, old_widths))
+    image_id = instance.pk
+    transaction.on_commit(lambda: queue_variants([image_id]))
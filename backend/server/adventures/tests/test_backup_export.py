@@ -0,0 +1,97 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from adventures.models import (
+    Collection, CollectionItineraryItem, ContentAttachment, Location, Note, Visit,
+)
+from users.models import CustomUser
+
+
+class BackupExportTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = CustomUser.objects.create_user(
+            username='backup-user',
+            email='backup-user@example.com',
+            password='testpassword123',
+        )
+        self.collection = Collection.objects.create(user=self.user, name='Alps')
+        self.location = Location.objects.create(user=self.user, name='Zermatt')
+        self.location.collections.add(self.collection)
+        Visit.objects.create(location=self.location, start_date=datetime(2025, 2, 1, tzinfo=dt_timezone.utc))
+        self.note = Note.objects.create(user=self.user, collection=self.collection, name='Passes', date=date(2025, 2, 1))
+        ContentAttachment.objects.create(
+            user=self.user,
+            file=ContentFile(b'ticket', name='ticket.txt'),
+            name='Ticket',
+            content_type=ContentType.objects.get_for_model(Location),
+            object_id=self.location.id,
+        )
+        CollectionItineraryItem.objects.create(
+            collection=self.collection,
+            content_type=ContentType.objects.get_for_model(Note),
+            object_id=self.note.id,
+            date=date(2025, 2, 1),
+            order=0,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _export(self):
+        response = self.client.get('/api/backup/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_export_contains_data_and_files(self):
+        archive = self._export()
+        data = json.loads(archive.read('data.json'))
+
+        self.assertEqual(data['user_username'], 'backup-user')
+        self.assertEqual([item['name'] for item in data['collections']], ['Alps'])
+        location = data['locations'][0]
+        self.assertEqual(location['name'], 'Zermatt')
+        self.assertEqual(location['collection_export_ids'], [0])
+        self.assertEqual(len(location['visits']), 1)
+        self.assertEqual(data['notes'][0]['collection_export_id'], 0)
+        self.assertEqual(data['itinerary_items'], [{
+            'collection_export_id': 0,
+            'content_type': 'note',
+            'item_reference': 0,
+            'date': '2025-02-01',
+            'is_global': False,
+            'order': 0,
+        }])
+
+        filename = location['attachments'][0]['filename']
+        self.assertEqual(archive.read(f'attachments/{filename}'), b'ticket')
+
+    def test_query_count_does_not_grow_with_locations(self):
+        with CaptureQueriesContext(connection) as baseline:
+            self._export()
+
+        for index in range(10):
+            location = Location.objects.create(user=self.user, name=f'Stop {index}')
+            location.collections.add(self.collection)
+            Visit.objects.create(location=location, start_date=datetime(2025, 3, index + 1, tzinfo=dt_timezone.utc))
+
+        with CaptureQueriesContext(connection) as grown:
+            archive = self._export()
+
+        self.assertEqual(len(json.loads(archive.read('data.json'))['locations']), 11)
+        self.assertEqual(len(grown), len(baseline))
@@ -0,0 +1,164 @@
+import io
+import shutil
+import tempfile
+import zipfile
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from adventures.models import (
+    Activity, Collection, CollectionItineraryItem, ContentAttachment, Location, Note, Trail, Visit,
+)
+from adventures.services.backup import BackupImporter
+from users.media_utils import get_user_media_usage
+from users.models import CustomUser
+
+
+def _backup_with_locations(count):
+    return {
+        'categories': [{'name': 'food', 'display_name': 'Food', 'icon': '🍜'}],
+        'collections': [{'export_id': 0, 'name': 'Trip', 'is_public': True}],
+        'locations': [
+            {
+                'export_id': idx,
+                'name': f'Stop {idx}',
+                'category_name': 'food',
+                'collection_export_ids': [0],
+                'trails': [{'name': 'Ridge', 'link': 'https://example.com/ridge'}],
+                'visits': [{
+                    'export_id': 0,
+                    'start_date': '2025-03-01T09:00:00Z',
+                    'activities': [{'name': 'Walk', 'sport_type': 'Hike', 'trail_name': 'Ridge', 'moving_time': 60}],
+                }],
+            }
+            for idx in range(count)
+        ],
+        'notes': [{'export_id': 0, 'name': 'Passes', 'date': '2025-03-01', 'collection_export_id': 0}],
+        'itinerary_items': [
+            {'collection_export_id': 0, 'content_type': 'note', 'item_reference': 0,
+             'date': '2025-03-01', 'is_global': False, 'order': 0},
+        ],
+    }
+
+
+class BackupImporterTests(TestCase):
+    def _user(self, username):
+        return CustomUser.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpassword123',
+        )
+
+    def _run(self, user, backup_data):
+        archive = io.BytesIO()
+        zipfile.ZipFile(archive, 'w').close()
+        with zipfile.ZipFile(archive) as zip_file:
+            return BackupImporter(user, zip_file).run(backup_data)
+
+    def test_imports_rows_and_relations(self):
+        user = self._user('importer')
+        summary = self._run(user, _backup_with_locations(2))
+
+        self.assertEqual(summary['locations'], 2)
+        self.assertEqual(summary['activities'], 2)
+        self.assertEqual(summary['itinerary_items'], 1)
+        collection = Collection.objects.get(user=user)
+        self.assertEqual(collection.locations.count(), 2)
+        location = Location.objects.get(user=user, name='Stop 0')
+        # Adding to a public collection makes the location public, as the m2m signal would.
+        self.assertTrue(location.is_public)
+        self.assertEqual(location.category.name, 'food')
+        activity = Activity.objects.get(visit__location=location)
+        self.assertEqual(activity.trail, Trail.objects.get(location=location))
+        self.assertEqual(activity.moving_time.total_seconds(), 60)
+        item = CollectionItineraryItem.objects.get(collection=collection)
+        self.assertEqual(item.object_id, Note.objects.get(user=user).id)
+
+    def test_invalid_trail_is_skipped(self):
+        user = self._user('trails')
+        backup_data = _backup_with_locations(1)
+        backup_data['locations'][0]['trails'] = [{'name': 'Both', 'link': 'https://example.com/t', 'wanderer_id': 'w1'}]
+        summary = self._run(user, backup_data)
+
+        self.assertEqual(summary['trails_skipped'], 1)
+        self.assertIsNone(Activity.objects.get(user=user).trail)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        ContentType.objects.clear_cache()
+        with CaptureQueriesContext(connection) as small:
+            self._run(self._user('small'), _backup_with_locations(2))
+
+        ContentType.objects.clear_cache()
+        with CaptureQueriesContext(connection) as large:
+            self._run(self._user('large'), _backup_with_locations(40))
+
+        self.assertEqual(Visit.objects.filter(location__user__username='large').count(), 40)
+        self.assertEqual(len(large), len(small))
+
+
+class BackupRoundTripTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = CustomUser.objects.create_user(
+            username='roundtrip', email='roundtrip@example.com', password='testpassword123',
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_export_then_import_restores_account(self):
+        collection = Collection.objects.create(user=self.user, name='Alps')
+        location = Location.objects.create(user=self.user, name='Zermatt')
+        location.collections.add(collection)
+        ContentAttachment.objects.create(
+            user=self.user,
+            file=SimpleUploadedFile('ticket.txt', b'ticket'),
+            name='Ticket',
+            content_type=ContentType.objects.get_for_model(Location),
+            object_id=location.id,
+        )
+        export = self.client.get('/api/backup/export/')
+        archive = b''.join(export.streaming_content)
+
+        response = self.client.post(
+            '/api/backup/import/',
+            {'file': SimpleUploadedFile('backup.zip', archive), 'confirm': 'yes'},
+            format='multipart',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['locations'], 1)
+        restored = Location.objects.get(user=self.user)
+        self.assertNotEqual(restored.id, location.id)
+        self.assertEqual(list(restored.collections.values_list('name', flat=True)), ['Alps'])
+        attachment = ContentAttachment.objects.get(user=self.user)
+        self.assertEqual(attachment.object_id, restored.id)
+        with attachment.file.open('rb') as handle:
+            self.assertEqual(handle.read(), b'ticket')
+
+    def test_import_keeps_media_usage_ledger_in_step(self):
+        location = Location.objects.create(user=self.user, name='Zermatt')
+        ContentAttachment.objects.create(
+            user=self.user,
+            file=SimpleUploadedFile('ticket.txt', b'ticket'),
+            name='Ticket',
+            content_type=ContentType.objects.get_for_model(Location),
+            object_id=location.id,
+        )
+        self.assertEqual(get_user_media_usage(self.user)['total_bytes'], 6)
+        archive = b''.join(self.client.get('/api/backup/export/').streaming_content)
+
+        self.client.post(
+            '/api/backup/import/',
+            {'file': SimpleUploadedFile('backup.zip', archive), 'confirm': 'yes'},
+            format='multipart',
+        )
+
+        usage = get_user_media_usage(self.user)
+        self.assertEqual((usage['attachments_bytes'], usage['attachments_files']), (6, 1))
+        self.assertEqual(ContentAttachment.objects.get(user=self.user).file_size, 6)
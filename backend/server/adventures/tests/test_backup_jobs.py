@@ -0,0 +1,125 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from adventures.models import BackupJob, Collection, Location, Note
+from adventures.services.backup.importer import BackupImporter
+from adventures.services.backup.jobs import claim_jobs, create_export_job, run_job
+from users.models import CustomUser
+
+
+def _archive(backup_data):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zip_file:
+        zip_file.writestr('data.json', json.dumps(backup_data))
+    return archive.getvalue()
+
+
+BACKUP_DATA = {
+    'collections': [{'export_id': 0, 'name': 'Trip'}],
+    'locations': [
+        {'export_id': idx, 'name': f'Stop {idx}', 'collection_export_ids': [0]}
+        for idx in range(3)
+    ],
+    'notes': [{'export_id': 0, 'name': 'Passes', 'collection_export_id': 0}],
+}
+
+
+class BackupJobTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root, BACKUP_JOB_WORKERS=0)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = CustomUser.objects.create_user(
+            username='jobs', email='jobs@example.com', password='testpassword123',
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _run_pending(self):
+        for job in claim_jobs(10):
+            run_job(job)
+
+    def _start_import(self):
+        response = self.client.post(
+            '/api/backup-jobs/import/',
+            {'file': SimpleUploadedFile('backup.zip', _archive(BACKUP_DATA)), 'confirm': 'yes'},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 202)
+        return response.data['id']
+
+    def test_export_job_produces_downloadable_archive(self):
+        Location.objects.create(user=self.user, name='Zermatt')
+        response = self.client.post('/api/backup-jobs/export/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.client.post('/api/backup-jobs/export/').status_code, 409)
+
+        self._run_pending()
+
+        job = self.client.get(f"/api/backup-jobs/{response.data['id']}/").data
+        self.assertEqual(job['status'], BackupJob.Status.DONE)
+        self.assertIsNotNone(job['download_url'])
+        download = self.client.get(f"/api/backup-jobs/{job['id']}/download/")
+        self.assertEqual(download.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(b''.join(download.streaming_content))) as zip_file:
+            data = json.loads(zip_file.read('data.json'))
+        self.assertEqual([row['name'] for row in data['locations']], ['Zermatt'])
+
+    def test_export_is_rejected_while_an_import_is_active(self):
+        self._start_import()
+
+        response = self.client.post('/api/backup-jobs/export/')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(BackupJob.objects.filter(user=self.user).count(), 1)
+
+    def test_constraint_rejects_a_second_active_job(self):
+        BackupJob.objects.create(user=self.user, kind=BackupJob.Kind.IMPORT, status=BackupJob.Status.RUNNING)
+
+        self.assertIsNone(create_export_job(self.user))
+        self.assertEqual(BackupJob.objects.filter(user=self.user).count(), 1)
+
+    def test_import_job_runs_all_stages(self):
+        job_id = self._start_import()
+        self._run_pending()
+
+        job = BackupJob.objects.get(id=job_id)
+        self.assertEqual(job.status, BackupJob.Status.DONE)
+        self.assertEqual(job.completed_stage, 'relations')
+        self.assertEqual(job.summary['locations'], 3)
+        self.assertFalse(job.source)
+        self.assertEqual(Collection.objects.get(user=self.user).locations.count(), 3)
+
+    def test_failed_import_resumes_after_last_completed_stage(self):
+        job_id = self._start_import()
+        with mock.patch.object(BackupImporter, '_stage_collection_items', side_effect=RuntimeError('boom')):
+            self._run_pending()
+
+        job = BackupJob.objects.get(id=job_id)
+        self.assertEqual(job.status, BackupJob.Status.FAILED)
+        self.assertEqual(job.completed_stage, 'locations')
+        self.assertEqual(Location.objects.filter(user=self.user).count(), 3)
+
+        response = self.client.post(f'/api/backup-jobs/{job_id}/resume/')
+        self.assertEqual(response.status_code, 202)
+        with mock.patch.object(BackupImporter, '_stage_clear') as clear, \
+                mock.patch.object(BackupImporter, '_stage_locations') as locations:
+            self._run_pending()
+        clear.assert_not_called()
+        locations.assert_not_called()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackupJob.Status.DONE)
+        self.assertEqual(Collection.objects.get(user=self.user).locations.count(), 3)
+        self.assertEqual(Note.objects.get(user=self.user).collection.name, 'Trip')
+        self.assertEqual(self.client.post(f'/api/backup-jobs/{job_id}/resume/').status_code, 400)
@@ -0,0 +1,88 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from adventures.models import Collection, Location, Lodging, Note, Visit
+from adventures.services.calendar_events import get_calendar_events_for_user
+from users.models import CustomUser
+
+
+def _utc(year, month, day, hour=0):
+    return datetime(year, month, day, hour, tzinfo=dt_timezone.utc)
+
+
+class CalendarEventsTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='calendar-user',
+            email='calendar-user@example.com',
+            password='testpassword123',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='calendar-other',
+            email='calendar-other@example.com',
+            password='testpassword123',
+        )
+        self.location = Location.objects.create(user=self.user, name='Lisbon')
+        Visit.objects.create(location=self.location, start_date=_utc(2025, 5, 1), end_date=_utc(2025, 5, 3))
+        Visit.objects.create(location=self.location, start_date=_utc(2025, 8, 10, 14))
+
+    def _ids(self, **kwargs):
+        return {event['id'] for event in get_calendar_events_for_user(self.user, **kwargs)}
+
+    def test_range_filters_visits_including_overlapping_spans(self):
+        may_visit, august_visit = Visit.objects.filter(location=self.location).order_by('start_date')
+
+        self.assertEqual(self._ids(types='visit', start='2025-05-03', end='2025-05-31'), {f'visit-{may_visit.id}'})
+        self.assertEqual(self._ids(types='visit', start='2025-08-10', end='2025-08-10'), {f'visit-{august_visit.id}'})
+        self.assertEqual(self._ids(types='visit', start='2025-06-01', end='2025-07-31'), set())
+        self.assertEqual(len(self._ids(types='visit')), 2)
+
+    def test_other_users_public_locations_are_excluded(self):
+        public = Location.objects.create(user=self.other, name='Public elsewhere', is_public=True)
+        Visit.objects.create(location=public, start_date=_utc(2025, 5, 2))
+
+        events = get_calendar_events_for_user(self.user, types='visit')
+        self.assertNotIn('Public elsewhere', {event['title'] for event in events})
+
+    def test_shared_collection_items_are_included(self):
+        collection = Collection.objects.create(user=self.other, name='Shared trip', start_date=date(2025, 9, 1))
+        collection.shared_with.add(self.user)
+        shared = Location.objects.create(user=self.other, name='Shared stop')
+        collection.locations.add(shared)
+        Visit.objects.create(location=shared, start_date=_utc(2025, 9, 2))
+        Note.objects.create(user=self.other, collection=collection, name='Packing', date=date(2025, 9, 1))
+        Lodging.objects.create(
+            user=self.other,
+            collection=collection,
+            name='Hostel',
+            check_in=_utc(2025, 9, 1, 15),
+            check_out=_utc(2025, 9, 3, 10),
+        )
+
+        events = get_calendar_events_for_user(self.user, start='2025-09-01', end='2025-09-30')
+        by_type = {(event['type'], event['title']) for event in events}
+        self.assertIn(('visit', 'Shared stop'), by_type)
+        self.assertIn(('collection', 'Shared trip'), by_type)
+        self.assertIn(('note', 'Packing'), by_type)
+        self.assertIn(('lodging', 'Hostel'), by_type)
+        shared_visit = next(event for event in events if event['title'] == 'Shared stop')
+        self.assertEqual(shared_visit['collection_name'], 'Shared trip')
+
+    def test_query_count_does_not_grow_with_visits(self):
+        with CaptureQueriesContext(connection) as baseline:
+            get_calendar_events_for_user(self.user)
+
+        collection = Collection.objects.create(user=self.user, name='Trip')
+        for index in range(10):
+            location = Location.objects.create(user=self.user, name=f'Stop {index}')
+            collection.locations.add(location)
+            Visit.objects.create(location=location, start_date=_utc(2025, 6, index + 1))
+
+        with CaptureQueriesContext(connection) as grown:
+            events = get_calendar_events_for_user(self.user)
+
+        self.assertEqual(len(grown), len(baseline))
+        self.assertEqual(len([event for event in events if event['type'] == 'visit']), 12)
@@ -3,9 +3,11 @@ from datetime import date, timedelta
 from django.utils import timezone
 from rest_framework.test import APITestCase
 
-from adventures.models import Collection, Location, Visit
+from adventures.models import Collection, Location, Note, Visit
+from adventures.services.dashboard import build_dashboard_data
+from adventures.services.dashboard_cache import get_user_data_version
 from users.models import CustomUser
-from worldtravel.models import City, Country, Region
+from worldtravel.models import City, Country, Region, VisitedRegion
 
 
 class DashboardAPITestCase(APITestCase):
@@ -96,3 +98,64 @@ class DashboardAPITestCase(APITestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertIn('activities_by_category', response.json())
+
+
+class DashboardCacheTestCase(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='dashboard-cache-user',
+            email='dashboard-cache-user@example.com',
+            password='testpassword123',
+        )
+        self.collaborator = CustomUser.objects.create_user(
+            username='dashboard-cache-friend',
+            email='dashboard-cache-friend@example.com',
+            password='testpassword123',
+        )
+
+    def test_repeat_dashboard_is_served_from_cache(self):
+        build_dashboard_data(self.user, self.user)
+
+        with self.assertNumQueries(0):
+            build_dashboard_data(self.user, self.user)
+
+    def test_owner_change_invalidates_dashboard(self):
+        self.assertEqual(build_dashboard_data(self.user, self.user)['stats']['location_count'], 0)
+
+        location = Location.objects.create(user=self.user, name='Louvre')
+        Visit.objects.create(location=location, start_date=timezone.now() - timedelta(days=1))
+
+        data = build_dashboard_data(self.user, self.user)
+        self.assertEqual(data['stats']['location_count'], 1)
+        self.assertEqual(data['recent_locations'][0]['name'], 'Louvre')
+
+    def test_shared_collection_change_invalidates_collaborator_dashboard(self):
+        collection = Collection.objects.create(user=self.user, name='Road trip')
+        collection.shared_with.add(self.collaborator)
+        self.assertEqual(build_dashboard_data(self.collaborator, self.collaborator)['upcoming_events'], [])
+
+        Note.objects.create(user=self.user, collection=collection, name='Book ferry', date=date.today())
+
+        events = build_dashboard_data(self.collaborator, self.collaborator)['upcoming_events']
+        self.assertEqual([event['title'] for event in events], ['Book ferry'])
+
+    def test_visited_region_change_invalidates_dashboard(self):
+        country = Country.objects.create(name='Italy', country_code='IT')
+        region = Region.objects.create(id='IT-25', name='Lombardy', country=country)
+        self.assertEqual(build_dashboard_data(self.user, self.user)['stats']['visited_region_count'], 0)
+
+        visited = VisitedRegion.objects.create(user=self.user, region=region)
+        self.assertEqual(build_dashboard_data(self.user, self.user)['stats']['visited_region_count'], 1)
+
+        visited.delete()
+        self.assertEqual(build_dashboard_data(self.user, self.user)['stats']['visited_region_count'], 0)
+
+    def test_version_is_bumped_again_on_commit(self):
+        initial = get_user_data_version(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Collection.objects.create(user=self.user, name='Winter trip')
+            during = get_user_data_version(self.user.pk)
+
+        self.assertGreater(during, initial)
+        self.assertGreater(get_user_data_version(self.user.pk), during)
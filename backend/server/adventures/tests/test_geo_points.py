@@ -4,7 +4,7 @@ from rest_framework.test import APIRequestFactory
 
 from adventures.models import Location, Transportation
 from adventures.serializers import LocationSerializer, MapPinSerializer, TransportationSerializer
-from adventures.utils.geo import make_point, point_to_lat_lon, has_coordinates
+from adventures.utils.geo import geohash_center, geohash_encode, make_point, point_to_lat_lon, has_coordinates
 from users.models import CustomUser
 
 
@@ -21,6 +21,15 @@ class GeoUtilsTests(TestCase):
         self.assertIsNone(make_point(None, 40.0))
         self.assertIsNone(make_point(-70.0, None))
 
+    def test_geohash_encode_matches_reference_value(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_geohash_center_lies_inside_cell(self):
+        cell = geohash_encode(38.7223, -9.1393, 8)
+        center = geohash_center(cell)
+        self.assertEqual(geohash_encode(center.y, center.x, 8), cell)
+        self.assertAlmostEqual(center.y, 38.7223, places=3)
+
 
 class LocationSerializerGeoTests(TestCase):
     def setUp(self):
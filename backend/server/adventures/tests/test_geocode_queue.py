@@ -0,0 +1,99 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from adventures.models import GeocodeJob, Location
+from adventures.services.geocoding.queue import (
+    claim_jobs,
+    enqueue_location_geocode,
+    get_queue_stats,
+    process_batch,
+    requeue_stale_jobs,
+)
+from adventures.services.geocoding.reverse import ReverseGeocodeResult
+from adventures.utils.geo import make_point
+from users.models import CustomUser
+
+
+class GeocodeQueueTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='geocode-user',
+            email='geocode-user@example.com',
+            password='testpassword123',
+        )
+        self.location = Location.objects.create(
+            user=self.user,
+            name='Lisbon',
+            coordinates=make_point(-9.1393, 38.7223),
+        )
+
+    def test_repeated_saves_coalesce_into_one_pending_job(self):
+        self.location.save()
+        self.location.save()
+        enqueue_location_geocode(self.location.id)
+
+        jobs = GeocodeJob.objects.filter(location=self.location)
+        self.assertEqual(jobs.count(), 1)
+        self.assertEqual(jobs.get().coalesced_count, 3)
+
+    def test_save_without_coordinates_does_not_enqueue(self):
+        location = Location.objects.create(user=self.user, name='Nowhere')
+        self.assertFalse(GeocodeJob.objects.filter(location=location).exists())
+
+    def test_partial_save_without_coordinates_does_not_enqueue(self):
+        GeocodeJob.objects.all().delete()
+        self.location.save(update_fields=['name'])
+        self.assertFalse(GeocodeJob.objects.exists())
+
+    @patch('adventures.services.geocoding.reverse.reverse_geocode')
+    def test_successful_job_is_marked_done(self, mock_reverse):
+        mock_reverse.return_value = ReverseGeocodeResult(data={'error': 'No region found'}, provider_used=None)
+
+        self.assertEqual(process_batch(), 1)
+
+        job = GeocodeJob.objects.get(location=self.location)
+        self.assertEqual(job.status, GeocodeJob.Status.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(GEOCODE_QUEUE_RETRY_BASE_SECONDS=60, GEOCODE_QUEUE_MAX_ATTEMPTS=2)
+    @patch('adventures.services.geocoding.reverse.reverse_geocode')
+    def test_transient_failure_is_retried_with_backoff_then_failed(self, mock_reverse):
+        mock_reverse.return_value = ReverseGeocodeResult(
+            data={'error': 'Unable to reverse geocode location.'},
+            provider_used=None,
+            transient=True,
+        )
+
+        process_batch()
+        job = GeocodeJob.objects.get(location=self.location)
+        self.assertEqual(job.status, GeocodeJob.Status.PENDING)
+        self.assertGreater(job.available_at, timezone.now() + timedelta(seconds=30))
+        self.assertEqual(claim_jobs(10), [])
+
+        GeocodeJob.objects.filter(id=job.id).update(available_at=timezone.now())
+        process_batch()
+        job.refresh_from_db()
+        self.assertEqual(job.status, GeocodeJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(GEOCODE_QUEUE_STALE_SECONDS=60)
+    def test_stale_running_job_is_requeued(self):
+        job = GeocodeJob.objects.get(location=self.location)
+        GeocodeJob.objects.filter(id=job.id).update(
+            status=GeocodeJob.Status.RUNNING,
+            started_at=timezone.now() - timedelta(minutes=5),
+        )
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, GeocodeJob.Status.PENDING)
+
+    def test_queue_stats_report_depth(self):
+        stats = get_queue_stats()
+        self.assertEqual(stats['pending'], 1)
+        self.assertEqual(stats['running'], 0)
+        self.assertIsNotNone(stats['oldest_pending_age_seconds'])
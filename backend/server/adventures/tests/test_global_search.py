@@ -1,6 +1,7 @@
 from rest_framework.test import APITestCase
 
 from adventures.models import Checklist, Collection, Location, Lodging, Note
+from adventures.services.search import global_search, suggest
 from users.models import CustomUser
 from worldtravel.models import City, Country, Region, VisitedCity
 
@@ -173,3 +174,65 @@ class GlobalSearchAPITestCase(APITestCase):
             first_non_location = next(i for i, t in enumerate(types) if t != 'location')
             self.assertEqual(types[0], 'location')
             self.assertTrue(all(t == 'location' for t in types[:first_non_location]))
+
+    def test_stored_search_vector_tracks_edits(self):
+        self.location.description = 'Sunrise over Montmartre'
+        self.location.save()
+
+        payload = global_search(self.owner, 'montmartre', types={'location'})
+        self.assertEqual(payload['facets'], {'location': 1})
+        self.assertEqual(global_search(self.owner, 'evening lights', types={'location'})['facets'], {'location': 0})
+
+    def test_one_query_per_entity_type(self):
+        types = {'location', 'collection', 'lodging', 'transportation', 'note', 'checklist', 'activity'}
+        with self.assertNumQueries(len(types)):
+            payload = global_search(self.owner, 'paris', types=types)
+        self.assertEqual(payload['facets']['note'], 1)
+
+
+class SearchSuggestAPITestCase(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='suggest-owner', email='suggest-owner@example.com', password='testpassword123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.collection = Collection.objects.create(user=self.user, name='Porto Weekend')
+        self.location = Location.objects.create(user=self.user, name='Port Wine Cellar', description='Tasting')
+        self.note = Note.objects.create(user=self.user, name='Ferry to port', collection=self.collection)
+
+    def test_returns_titles_with_prefix_matches_first(self):
+        response = self.client.get('/api/search/suggest/?q=port')
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual([hit['title'] for hit in results], ['Port Wine Cellar', 'Porto Weekend', 'Ferry to port'])
+        self.assertEqual(results[0], {
+            'type': 'location', 'id': str(self.location.id), 'title': 'Port Wine Cellar',
+            'url': f'/locations/{self.location.id}',
+        })
+        self.assertEqual(results[2]['url'], f'/collections/{self.collection.id}')
+        self.assertNotIn('total', response.json())
+
+    def test_cached_results_are_invalidated_on_write(self):
+        suggest(self.user, 'port')
+        with self.assertNumQueries(0):
+            suggest(self.user, 'port')
+
+        Lodging.objects.create(user=self.user, name='Portside Hostel', collection=self.collection)
+        titles = [hit['title'] for hit in self.client.get('/api/search/suggest/?q=port').json()['results']]
+        self.assertIn('Portside Hostel', titles)
+
+    def test_default_types_match_collections_by_search_vector(self):
+        collection = Collection.objects.create(user=self.user, name='Lisbon', description='Harbour ferries')
+
+        response = self.client.get('/api/search/suggest/?q=harb')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            {'type': 'collection', 'id': str(collection.id), 'title': 'Lisbon', 'url': f'/collections/{collection.id}'},
+            response.json()['results'],
+        )
+
+    def test_rejects_unknown_types(self):
+        response = self.client.get('/api/search/suggest/?q=port&types=city')
+        self.assertEqual(response.status_code, 400)
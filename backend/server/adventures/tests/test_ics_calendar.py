@@ -0,0 +1,93 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from adventures.models import Category, Location, Visit
+from users.models import CustomUser
+
+FEED_URL = '/api/ics-calendar/generate/'
+
+
+class IcsCalendarFeedTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='ics-user',
+            email='ics-user@example.com',
+            password='testpassword123',
+        )
+        self.location = Location.objects.create(user=self.user, name='Kyoto')
+        self.visit = Visit.objects.create(
+            location=self.location,
+            start_date=datetime(2025, 4, 2, 9, tzinfo=dt_timezone.utc),
+            end_date=datetime(2025, 4, 2, 17, tzinfo=dt_timezone.utc),
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _fetch(self, **headers):
+        response = self.client.get(FEED_URL, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_feed_is_stable_between_polls(self):
+        first, first_body = self._fetch()
+        second, second_body = self._fetch()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Content-Type'], 'text/calendar')
+        self.assertIn(b'SUMMARY:\xf0\x9f\x93\x8d Kyoto', first_body)
+        self.assertTrue(first_body.startswith(b'BEGIN:VCALENDAR'))
+        self.assertTrue(first_body.endswith(b'END:VCALENDAR\r\n'))
+        self.assertEqual(first_body, second_body)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertIn('Last-Modified', first)
+
+    def test_unchanged_feed_returns_not_modified(self):
+        first, _ = self._fetch()
+        response, body = self._fetch(HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(body, b'')
+
+    def test_edit_changes_etag_and_content(self):
+        first, _ = self._fetch()
+
+        self.location.name = 'Osaka'
+        self.location.save()
+        response, body = self._fetch(HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertIn(b'Osaka', body)
+        self.assertNotIn(b'Kyoto', body)
+
+    def test_deleted_event_changes_etag(self):
+        first, _ = self._fetch()
+
+        self.visit.delete()
+        response, body = self._fetch(HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'BEGIN:VEVENT', body)
+
+    def test_not_modified_does_not_load_events(self):
+        first, _ = self._fetch()
+
+        with mock.patch('adventures.services.ics_feed.iter_calendar_events_for_ics') as load_events:
+            response, _ = self._fetch(HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        load_events.assert_not_called()
+
+    def test_category_icon_change_changes_etag(self):
+        category = Category.objects.create(user=self.user, name='temples', display_name='Temples', icon='⛩️')
+        self.location.category = category
+        self.location.save()
+        first, _ = self._fetch()
+
+        category.icon = '🏯'
+        category.save()
+        response, body = self._fetch(HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('🏯 Kyoto'.encode(), body)
@@ -288,3 +288,62 @@ class ImageMapPinSerializerTests(TestCase):
         self.assertEqual(data['parent_name'], 'GPS Place')
         self.assertAlmostEqual(data['latitude'], 37.7749, places=4)
         self.assertAlmostEqual(data['longitude'], -122.4194, places=4)
+
+
+class ImageResolverBatchingTests(TestCase):
+    def setUp(self):
+        from integrations.models import ImmichIntegration
+
+        self.user = CustomUser.objects.create_user(
+            username='immich-user',
+            email='immich-user@example.com',
+            password='testpassword123',
+        )
+        self.integration = ImmichIntegration.objects.create(
+            user=self.user,
+            server_url='https://immich.example.com',
+            api_key='key',
+        )
+        content_type = ContentType.objects.get_for_model(Location)
+        self.images = []
+        for index in range(3):
+            location = Location.objects.create(user=self.user, name=f'Stop {index}')
+            for asset in range(2):
+                self.images.append(ContentImage.objects.create(
+                    user=self.user,
+                    content_type=content_type,
+                    object_id=str(location.id),
+                    immich_id=f'asset-{index}-{asset}',
+                    coordinates=make_point(2.0 + index, 48.0),
+                    source=ContentImage.Source.IMMICH,
+                ))
+
+    def test_map_pins_resolve_integrations_and_parents_in_bulk(self):
+        from adventures.serializers import ImageMapPinSerializer
+
+        images = list(ContentImage.objects.filter(user=self.user))
+        # One integration lookup plus one parent lookup for all locations.
+        with self.assertNumQueries(2):
+            data = ImageMapPinSerializer(images, many=True).data
+
+        self.assertEqual(len(data), 6)
+        self.assertEqual({pin['parent_name'] for pin in data}, {'Stop 0', 'Stop 1', 'Stop 2'})
+        self.assertTrue(all(f'/immich/{self.integration.id}/get/' in pin['image'] for pin in data))
+
+    def test_integration_is_loaded_once_per_request(self):
+        request = APIRequestFactory().get('/')
+        with self.assertNumQueries(1):
+            for image in self.images:
+                ContentImageSerializer(image, context={'request': request}).data
+
+    def test_immich_image_without_integration_is_skipped(self):
+        self.integration.delete()
+        data = ContentImageSerializer(self.images, many=True).data
+        self.assertEqual(list(data), [None] * len(self.images))
+
+    def test_image_list_loads_owners_in_one_query(self):
+        images = list(ContentImage.objects.filter(user=self.user))
+        # Integration lookup plus one query for all image owners.
+        with self.assertNumQueries(2):
+            data = ContentImageSerializer(images, many=True).data
+        self.assertEqual({image['user'] for image in data}, {str(self.user.uuid)})
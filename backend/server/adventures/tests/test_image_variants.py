@@ -0,0 +1,115 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image as PILImage
+from rest_framework.test import APIRequestFactory
+
+from adventures.models import ContentImage, Location
+from adventures.serializers import ContentImageSerializer
+from adventures.services.backup import BackupImporter
+from adventures.services.images.variants import generate_variants, variant_name
+from adventures.utils.file_permissions import checkFilePermission
+from users.models import CustomUser
+
+
+def _webp(width, height):
+    buffer = io.BytesIO()
+    PILImage.new('RGB', (width, height), 'teal').save(buffer, format='WEBP')
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[160, 480, 1280])
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = CustomUser.objects.create_user(
+            username='variant-user', email='variant-user@example.com', password='testpassword123',
+        )
+        self.other = CustomUser.objects.create_user(
+            username='variant-other', email='variant-other@example.com', password='testpassword123',
+        )
+        self.location = Location.objects.create(user=self.user, name='Lake', is_public=False)
+
+    def _upload(self, width, height):
+        with mock.patch('adventures.signals.queue_variants') as queue_variants:
+            with self.captureOnCommitCallbacks(execute=True):
+                image = ContentImage.objects.create(
+                    user=self.user,
+                    image=SimpleUploadedFile('photo.webp', _webp(width, height), content_type='image/webp'),
+                    content_type=ContentType.objects.get_for_model(Location),
+                    object_id=self.location.id,
+                )
+        # Rendering happens off the request; run the queued job here.
+        queue_variants.assert_called_once_with([image.pk])
+        generate_variants(image.pk)
+        image.refresh_from_db()
+        return image
+
+    def test_upload_renders_variants_narrower_than_the_original(self):
+        image = self._upload(800, 400)
+
+        self.assertEqual(image.variants, [160, 480])
+        self.assertEqual(image.width, 800)
+        with default_storage.open(variant_name(image.image.name, 480), 'rb') as stored:
+            self.assertEqual(PILImage.open(stored).size, (480, 240))
+
+    def test_serializer_exposes_variant_urls(self):
+        image = self._upload(800, 400)
+        request = APIRequestFactory().get('/api/images/')
+
+        data = ContentImageSerializer(image, context={'request': request}).data
+
+        self.assertEqual(set(data['variants']), {'160', '480'})
+        self.assertTrue(data['variants']['160'].endswith(variant_name(image.image.name, 160)))
+        self.assertEqual(data['width'], 800)
+
+    def test_backfill_skips_images_narrower_than_the_widest_variant(self):
+        self._upload(800, 400)
+        out = io.StringIO()
+
+        call_command('backfill_image_variants', stdout=out)
+
+        self.assertIn('All images already have their variants', out.getvalue())
+
+    def test_variants_share_the_original_permissions(self):
+        image = self._upload(800, 400)
+        file_id = variant_name(image.image.name, 160).split('/', 1)[1]
+
+        self.assertTrue(checkFilePermission(file_id, self.user, 'images/'))
+        self.assertFalse(checkFilePermission(file_id, self.other, 'images/'))
+
+    def test_delete_removes_variants(self):
+        image = self._upload(800, 400)
+        name = variant_name(image.image.name, 160)
+
+        image.delete()
+
+        self.assertFalse(default_storage.exists(name))
+
+    def test_backup_import_queues_variants(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('images/photo.webp', _webp(800, 400))
+        backup_data = {'locations': [{'export_id': 0, 'name': 'Fjord', 'images': [{'filename': 'photo.webp'}]}]}
+
+        with mock.patch('adventures.services.backup.importer.queue_variants') as queue_variants:
+            with self.captureOnCommitCallbacks(execute=True):
+                with zipfile.ZipFile(archive) as zip_file:
+                    BackupImporter(self.user, zip_file).run(backup_data)
+
+        image = ContentImage.objects.get(user=self.user)
+        queue_variants.assert_called_once_with([image.pk])
+        self.assertEqual((image.variants, image.width), ([], None))
@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from adventures.models import Location
+from adventures.services.location_matching import candidate_locations, find_similar_location
+from adventures.utils.geo import make_point
+from users.models import CustomUser
+
+
+class LocationMatchingTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='matcher', email='matcher@example.com', password='testpassword123',
+        )
+        self.eiffel = Location.objects.create(
+            user=self.user, name='Eiffel Tower', location='Paris', coordinates=make_point(2.2945, 48.8584),
+        )
+        Location.objects.create(user=self.user, name='Colosseum', coordinates=make_point(12.4922, 41.8902))
+
+    def test_strong_name_match(self):
+        self.assertEqual(find_similar_location(self.user, 'eiffel tower '), self.eiffel)
+
+    def test_close_name_needs_location_or_coordinates(self):
+        self.assertIsNone(find_similar_location(self.user, 'The Eiffel Tower'))
+        self.assertEqual(find_similar_location(self.user, 'The Eiffel Tower', lat=48.86, lon=2.29), self.eiffel)
+        self.assertEqual(find_similar_location(self.user, 'The Eiffel Tower', location_text='paris'), self.eiffel)
+
+    def test_candidates_are_scoped_to_name_or_area(self):
+        names = {loc.name for loc in candidate_locations(self.user, 'Eiffel Tower', lat=41.89, lon=12.49)}
+        self.assertEqual(names, {'Eiffel Tower', 'Colosseum'})
+        self.assertEqual(list(candidate_locations(self.user, 'Louvre')), [])
+
+    def test_other_users_locations_are_ignored(self):
+        other = CustomUser.objects.create_user(username='other', email='other@example.com', password='x' * 12)
+        self.assertIsNone(find_similar_location(other, 'Eiffel Tower'))
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from adventures.models import Category, Location, Visit
+from adventures.utils.geo import make_point
+from users.models import CustomUser
+
+
+class LocationPinsAPITests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='pins-user',
+            email='pins-user@example.com',
+            password='testpassword123',
+        )
+        self.category = Category.objects.create(user=self.user, name='food', display_name='Food', icon='🍜')
+        self.visited = Location.objects.create(
+            user=self.user,
+            name='Visited',
+            category=self.category,
+            coordinates=make_point(2.3522, 48.8566),
+        )
+        self.planned = Location.objects.create(
+            user=self.user,
+            name='Planned',
+            coordinates=make_point(-9.1393, 38.7223),
+        )
+        Visit.objects.create(location=self.visited, start_date=timezone.now() - timedelta(days=3))
+        Visit.objects.create(location=self.planned, start_date=timezone.now() + timedelta(days=30))
+        self.client.force_authenticate(user=self.user)
+
+    def test_pins_report_visited_status_and_category(self):
+        response = self.client.get('/api/locations/pins/')
+        self.assertEqual(response.status_code, 200)
+
+        pins = {pin['name']: pin for pin in response.json()}
+        self.assertTrue(pins['Visited']['is_visited'])
+        self.assertFalse(pins['Planned']['is_visited'])
+        self.assertEqual(pins['Visited']['category']['display_name'], 'Food')
+        self.assertEqual(pins['Visited']['category']['num_locations'], 1)
+        self.assertIsNone(pins['Planned']['category'])
+        self.assertAlmostEqual(pins['Visited']['latitude'], 48.8566, places=4)
+
+    def test_query_count_does_not_grow_with_locations(self):
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get('/api/locations/pins/')
+
+        for index in range(10):
+            location = Location.objects.create(
+                user=self.user,
+                name=f'Extra {index}',
+                category=self.category,
+                coordinates=make_point(index, index),
+            )
+            Visit.objects.create(location=location, start_date=timezone.now())
+
+        with CaptureQueriesContext(connection) as larger:
+            response = self.client.get('/api/locations/pins/')
+        self.assertEqual(len(response.json()), 12)
+        self.assertEqual(len(larger), len(baseline))
+
+    def test_compact_format(self):
+        data = self.client.get('/api/locations/pins/', {'compact': 'true'}).json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(len(data['coordinates']), 4)
+        self.assertEqual(len(data['categories']), 1)
+
+        index = data['names'].index('Visited')
+        self.assertTrue(data['is_visited'][index])
+        self.assertEqual(data['category'][index], 0)
+        self.assertAlmostEqual(data['coordinates'][index * 2], 48.8566, places=4)
+
+    def test_unchanged_pins_return_not_modified(self):
+        first = self.client.get('/api/locations/pins/')
+        etag = first['ETag']
+
+        second = self.client.get('/api/locations/pins/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+
+        self.planned.name = 'Renamed'
+        self.planned.save()
+        third = self.client.get('/api/locations/pins/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third['ETag'], etag)
+
+    def test_bbox_limits_pins_to_viewport(self):
+        response = self.client.get('/api/locations/pins/', {'bbox': '0,40,10,55'})
+        self.assertEqual([pin['name'] for pin in response.json()], ['Visited'])
+
+    def test_bbox_crossing_antimeridian(self):
+        Location.objects.create(user=self.user, name='Fiji', coordinates=make_point(179.5, -17.7))
+        Location.objects.create(user=self.user, name='Samoa', coordinates=make_point(-171.8, -13.8))
+
+        response = self.client.get('/api/locations/pins/', {'bbox': '170,-25,-165,-5'})
+        self.assertEqual(sorted(pin['name'] for pin in response.json()), ['Fiji', 'Samoa'])
+
+    def test_low_zoom_returns_clusters(self):
+        Location.objects.create(user=self.user, name='Paris 2', coordinates=make_point(2.36, 48.86))
+
+        data = self.client.get('/api/locations/pins/', {'zoom': 3}).json()
+        self.assertEqual(data['type'], 'clusters')
+        clusters = sorted(data['clusters'], key=lambda cluster: cluster['count'])
+        self.assertEqual([cluster['count'] for cluster in clusters], [1, 2])
+        self.assertEqual(clusters[1]['visited_count'], 1)
+        self.assertAlmostEqual(clusters[1]['latitude'], 48.8583, places=3)
+
+    def test_high_zoom_returns_pins(self):
+        data = self.client.get('/api/locations/pins/', {'zoom': 14, 'bbox': '2,48,3,49'}).json()
+        self.assertEqual([pin['name'] for pin in data], ['Visited'])
+
+    def test_invalid_viewport_is_rejected(self):
+        self.assertEqual(self.client.get('/api/locations/pins/', {'bbox': '1,2,3'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/locations/pins/', {'zoom': 'far'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/locations/pins/', {'zoom': 'inf'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/locations/pins/', {'zoom': 'nan'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/locations/pins/', {'bbox': 'nan,48,3,49'}).status_code, 400)
@@ -1,10 +1,13 @@
 from pathlib import Path
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.test import TestCase, override_settings
 
-from adventures.models import Activity, Location, Visit
+from adventures.models import Activity, Collection, Location, Visit
+from adventures.utils import file_permissions
+from adventures.utils.file_permissions import cachedFilePermission
 
 User = get_user_model()
 
@@ -92,3 +95,62 @@ class ProtectedMediaTestCase(TestCase):
         response = self.client.get(f'/media/{public_gpx_path}')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content, b'PUBLIC_GPX_DATA')
+
+    def test_protected_media_is_privately_cacheable(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(f'/media/{self.gpx_path}')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        revalidated = self.client.get(f'/media/{self.gpx_path}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_permission_decision_is_cached(self):
+        file_id = self.gpx_name
+        self.assertTrue(cachedFilePermission(file_id, self.owner, 'activities/'))
+        with self.assertNumQueries(0):
+            self.assertTrue(cachedFilePermission(file_id, self.owner, 'activities/'))
+
+    def test_publicity_change_invalidates_cached_denial(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(f'/media/{self.gpx_path}').status_code, 403)
+
+        self.location.is_public = True
+        self.location.save()
+
+        self.assertEqual(self.client.get(f'/media/{self.gpx_path}').status_code, 200)
+
+    def test_unrelated_writes_keep_cached_decisions(self):
+        self.assertTrue(cachedFilePermission(self.gpx_name, self.owner, 'activities/'))
+
+        Location.objects.create(user=self.other, name='Elsewhere')
+        self.location.name = 'Renamed Trailhead'
+        self.location.save()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(cachedFilePermission(self.gpx_name, self.owner, 'activities/'))
+
+    def test_sharing_change_invalidates_cached_denial(self):
+        collection = Collection.objects.create(user=self.owner, name='Hikes')
+        self.location.collections.add(collection)
+        self.assertFalse(cachedFilePermission(self.gpx_name, self.other, 'activities/'))
+
+        collection.shared_with.add(self.other)
+
+        self.assertTrue(cachedFilePermission(self.gpx_name, self.other, 'activities/'))
+
+    def test_revoke_during_a_check_does_not_cache_the_grant(self):
+        collection = Collection.objects.create(user=self.owner, name='Hikes')
+        collection.shared_with.add(self.other)
+        self.location.collections.add(collection)
+        check = file_permissions._check_content_object_permission
+
+        def revoked_meanwhile(content_object, user):
+            allowed = check(content_object, user)
+            collection.shared_with.remove(self.other)
+            return allowed
+
+        with mock.patch.object(file_permissions, '_check_content_object_permission', side_effect=revoked_meanwhile):
+            self.assertTrue(cachedFilePermission(self.gpx_name, self.other, 'activities/'))
+
+        self.assertFalse(cachedFilePermission(self.gpx_name, self.other, 'activities/'))
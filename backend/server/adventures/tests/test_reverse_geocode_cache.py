@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from adventures.models import ReverseGeocodeCacheEntry
+from adventures.providers.base import ProviderResult
+from adventures.services.geocoding.cache import purge
+from adventures.services.geocoding.reverse import reverse_geocode
+from users.models import CustomUser
+
+OSM_PAYLOAD = {
+    'name': 'Praça do Comércio',
+    'display_name': 'Praça do Comércio, Lisboa, Portugal',
+    'address': {'ISO3166-1': 'PT', 'state': 'Lisboa'},
+}
+
+
+@override_settings(GOOGLE_MAPS_API_KEY='', REVERSE_GEOCODE_CACHE_PRECISION=8)
+class ReverseGeocodeCacheTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='cache-user',
+            email='cache-user@example.com',
+            password='testpassword123',
+        )
+
+    @patch('adventures.services.geocoding.reverse.extractIsoCode', return_value={'error': 'No region found'})
+    @patch('adventures.services.geocoding.reverse.osm_reverse')
+    def test_nearby_points_reuse_cached_provider_payload(self, mock_osm, _mock_extract):
+        mock_osm.side_effect = lambda lat, lon: ProviderResult(data=dict(OSM_PAYLOAD))
+
+        reverse_geocode(38.70750, -9.13640, self.user)
+        reverse_geocode(38.70751, -9.13641, self.user)
+
+        self.assertEqual(mock_osm.call_count, 1)
+        entry = ReverseGeocodeCacheEntry.objects.get(provider='osm')
+        self.assertEqual(entry.hit_count, 1)
+        self.assertEqual(entry.payload['location_name'], 'Praça do Comércio')
+
+    @patch('adventures.services.geocoding.reverse.extractIsoCode', return_value={'error': 'No region found'})
+    @patch('adventures.services.geocoding.reverse.osm_reverse')
+    def test_provider_errors_are_not_cached(self, mock_osm, _mock_extract):
+        mock_osm.return_value = ProviderResult(error='OpenStreetMap service error')
+
+        selection = reverse_geocode(38.70750, -9.13640, self.user)
+
+        self.assertTrue(selection.transient)
+        self.assertFalse(ReverseGeocodeCacheEntry.objects.exists())
+
+    @patch('adventures.services.geocoding.reverse.extractIsoCode', return_value={'error': 'No region found'})
+    @patch('adventures.services.geocoding.reverse.osm_reverse')
+    def test_purge_by_cell_prefix(self, mock_osm, _mock_extract):
+        mock_osm.side_effect = lambda lat, lon: ProviderResult(data=dict(OSM_PAYLOAD))
+        reverse_geocode(38.70750, -9.13640, self.user)
+        cell = ReverseGeocodeCacheEntry.objects.get().cell
+
+        self.assertEqual(purge(cells=[cell[:4]]), 1)
+        self.assertFalse(ReverseGeocodeCacheEntry.objects.exists())
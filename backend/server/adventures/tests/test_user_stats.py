@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from adventures.models import Activity, Location, Visit
+from adventures.services.user_stats import UserStatsService
+from users.models import CustomUser
+
+
+class ActivityStatsByCategoryTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='stats-user',
+            email='stats-user@example.com',
+            password='testpassword123',
+        )
+        self.location = Location.objects.create(user=self.user, name='Dolomites', is_public=False)
+        self.visit = Visit.objects.create(location=self.location, start_date=datetime(2025, 7, 1, tzinfo=dt_timezone.utc))
+        self.service = UserStatsService()
+
+    def _activity(self, sport_type, day, **metrics):
+        return Activity.objects.create(
+            user=self.user,
+            visit=self.visit,
+            name=f'{sport_type} {day}',
+            sport_type=sport_type,
+            start_date=datetime(2025, 7, day, tzinfo=dt_timezone.utc),
+            **metrics,
+        )
+
+    def _stats(self, request_user=None):
+        return self.service.get_activity_stats_by_category(
+            Activity.objects.filter(user=self.user), self.user, request_user or self.user
+        )
+
+    def test_rolls_sports_up_into_categories(self):
+        self._activity('Run', 1, distance=5000, moving_time=timedelta(minutes=30), average_speed=2.0, max_speed=4.0)
+        self._activity('TrailRun', 2, distance=15000, elevation_gain=800, average_speed=3.0, calories=900)
+        self._activity('Ride', 3, distance=40000, max_speed=12.5)
+
+        stats = self._stats()
+
+        self.assertEqual(set(stats), {'running', 'cycling'})
+        running = stats['running']
+        self.assertEqual(running['count'], 2)
+        self.assertEqual(running['total_distance'], 20000)
+        self.assertEqual(running['avg_distance'], 10000)
+        self.assertEqual(running['avg_speed'], 2.5)
+        self.assertEqual(running['total_moving_time'], 1800)
+        self.assertEqual(running['avg_elevation_gain'], 800)
+        self.assertEqual(set(running['sports']), {'Run', 'TrailRun'})
+        self.assertEqual(running['sports']['TrailRun']['total_elevation_gain'], 800)
+
+    def test_record_holders_per_category(self):
+        older = self._activity('Run', 1, distance=10000, max_speed=5.0)
+        newer = self._activity('VirtualRun', 4, distance=10000)
+        ride = self._activity('Ride', 2, distance=30000, calories=700)
+
+        stats = self._stats()
+
+        records = stats['running']['record_holders']
+        # Equal distances go to the most recent activity.
+        self.assertEqual(records['max_distance']['activity_id'], str(newer.id))
+        self.assertEqual(records['max_speed']['activity_id'], str(older.id))
+        self.assertEqual(records['max_speed']['metric_value'], 5.0)
+        self.assertIsNone(records['max_calories'])
+        self.assertEqual(stats['cycling']['record_holders']['max_calories']['activity_id'], str(ride.id))
+
+    def test_private_location_hidden_from_other_viewers(self):
+        self._activity('Hike', 1, distance=12000)
+
+        own = self._stats()['walking_hiking']['record_holders']['max_distance']
+        public = self._stats(AnonymousUser())['walking_hiking']['record_holders']['max_distance']
+
+        self.assertEqual(own['location_name'], 'Dolomites')
+        self.assertIsNone(public['location_name'])
+
+    def test_query_count_does_not_grow_with_sports(self):
+        self._activity('Run', 1, distance=5000)
+        self._stats()  # warm any one-off lookups
+
+        with CaptureQueriesContext(connection) as baseline:
+            self._stats()
+
+        for day, sport in enumerate(['Ride', 'Swim', 'Hike', 'AlpineSki', 'Yoga', 'Tennis', 'Golf'], start=2):
+            self._activity(sport, day, distance=1000 * day, calories=100 * day)
+
+        with CaptureQueriesContext(connection) as grown:
+            stats = self._stats()
+
+        self.assertEqual(len(stats), 8)
+        self.assertEqual(len(grown), len(baseline))
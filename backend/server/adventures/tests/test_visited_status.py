@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from adventures.models import Location, Visit
+from adventures.services.user_stats import UserStatsService
+from adventures.utils.get_is_visited import is_location_visited
+from users.models import CustomUser
+
+
+class VisitedStatusAnnotationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='visited-user',
+            email='visited-user@example.com',
+            password='testpassword123',
+        )
+        now = timezone.now()
+        self.past = Location.objects.create(user=self.user, name='Past')
+        Visit.objects.create(location=self.past, start_date=now - timedelta(days=10), end_date=now - timedelta(days=8))
+        self.today = Location.objects.create(user=self.user, name='Today')
+        Visit.objects.create(location=self.today, start_date=now)
+        self.future = Location.objects.create(user=self.user, name='Future')
+        Visit.objects.create(location=self.future, start_date=now + timedelta(days=5))
+        self.unvisited = Location.objects.create(user=self.user, name='Never')
+
+    def test_annotation_matches_python_rule(self):
+        annotated = {location.name: location.is_visited for location in Location.objects.with_visited_status()}
+
+        for location in Location.objects.all():
+            self.assertEqual(annotated[location.name], is_location_visited(location), location.name)
+        self.assertEqual(annotated, {'Past': True, 'Today': True, 'Future': False, 'Never': False})
+
+    def test_is_visited_status_uses_annotation_without_queries(self):
+        locations = list(Location.objects.with_visited_status().order_by('name'))
+
+        with self.assertNumQueries(0):
+            statuses = [location.is_visited_status() for location in locations]
+
+        self.assertEqual(statuses, [False, False, True, True])
+
+    def test_visited_count_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            count = UserStatsService().get_visited_locations_count(self.user)
+
+        self.assertEqual(count, 2)
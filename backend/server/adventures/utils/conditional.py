@@ -0,0 +1,36 @@
+"""ETag helpers so unchanged API payloads can be answered with 304 Not Modified."""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def payload_etag(data) -> str:
+    """Strong ETag derived from the JSON encoding of ``data``."""
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return quote_etag(hashlib.sha256(body.encode()).hexdigest()[:32])
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so W/"x" matches "x".
+    candidates = {value.removeprefix('W/') for value in parse_etags(header)}
+    return '*' in candidates or etag.removeprefix('W/') in candidates
+
+
+def conditional_response(request, data, etag: str | None = None) -> Response:
+    """Return ``data`` with an ETag, or an empty 304 if the client already has it."""
+    etag = etag or payload_etag(data)
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    # Browsers may keep the body but must revalidate before reusing it.
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -1,9 +1,19 @@
 from adventures.models import Activity, ContentAttachment, ContentImage, Visit
+from adventures.services.external_cache import build_cache_key
+from adventures.services.images.variants import original_name
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+import hashlib
 import posixpath
+import time
 
 PUBLIC_MEDIA_PATHS = ('profile-pics/', 'achievements/', 'flags/')
 PROTECTED_MEDIA_PATHS = ('images/', 'attachments/', 'activities/')
 
+PERMISSION_PREFIX = 'media_permission_v2'
+PERMISSION_SCOPE_PREFIX = 'media_permission_scope_v1'
+
 
 def normalize_media_request_path(path):
     if not path or '\x00' in path:
@@ -24,12 +34,16 @@ def is_protected_media_path(path):
     return path.startswith(PROTECTED_MEDIA_PATHS)
 
 
+def _permission_subject(content_object):
+    # handle differently when content_object is a Visit, get the location instead
+    if isinstance(content_object, Visit) and content_object.location:
+        return content_object.location
+    return content_object
+
+
 def _check_content_object_permission(content_object, user):
     """Check if user has permission to access a content object."""
-    # handle differently when content_object is a Visit, get the location instead
-    if isinstance(content_object, Visit):
-        if content_object.location:
-            content_object = content_object.location
+    content_object = _permission_subject(content_object)
 
     # Check if content object is public
     if hasattr(content_object, 'is_public') and content_object.is_public:
@@ -52,37 +66,127 @@ def _check_content_object_permission(content_object, user):
     else:
         return False
 
-def checkFilePermission(fileId, user, mediaType):
-    if mediaType not in PROTECTED_MEDIA_PATHS:
-        return False
+def _file_content_objects(fileId, mediaType):
+    """The objects a protected file is attached to; access to any one grants it."""
     if mediaType == 'images/':
         image_path = f"images/{fileId}"
-        # Use filter() instead of get() to handle multiple ContentImage entries
-        # pointing to the same file (e.g. after location duplication)
-        content_images = ContentImage.objects.filter(image=image_path)
-        if not content_images.exists():
-            return False
-        # Grant access if ANY associated content object permits it
-        for content_image in content_images:
-            content_object = content_image.content_object
-            if content_object and _check_content_object_permission(content_object, user):
-                return True
+        # Downscaled variants share their original's permissions.
+        image_path = original_name(image_path) or image_path
+        # Several ContentImage entries can point to the same file (e.g. after
+        # location duplication)
+        rows = ContentImage.objects.filter(image=image_path)
+        return [row.content_object for row in rows if row.content_object]
+    if mediaType == 'attachments/':
+        rows = ContentAttachment.objects.filter(file=f"attachments/{fileId}")
+        return [row.content_object for row in rows if row.content_object]
+    if mediaType == 'activities/':
+        rows = Activity.objects.filter(gpx_file=f"activities/{fileId}").select_related('visit')
+        return [row.visit for row in rows if row.visit]
+    return []
+
+
+def checkFilePermission(fileId, user, mediaType):
+    if mediaType not in PROTECTED_MEDIA_PATHS:
         return False
-    elif mediaType == 'attachments/':
+    return any(
+        _check_content_object_permission(content_object, user)
+        for content_object in _file_content_objects(fileId, mediaType)
+    )
+
+
+# Cached decisions record the versions of the scopes they were derived from:
+# ``user:<id>`` for the owner of each object a file is attached to and
+# ``collection:<id>`` for each collection that can grant access. Publicity,
+# ownership and collection membership changes bump the owner's scope; sharing
+# and collection publicity changes bump the collection's.
+
+def owner_scope(user_id):
+    return f'user:{user_id}'
+
+
+def collection_scope(collection_id):
+    return f'collection:{collection_id}'
+
+
+def _scope_key(scope):
+    return build_cache_key(PERMISSION_SCOPE_PREFIX, scope)
+
+
+def _permission_scopes(content_objects):
+    scopes = set()
+    for content_object in content_objects:
+        content_object = _permission_subject(content_object)
+        if getattr(content_object, 'user_id', None) is not None:
+            scopes.add(owner_scope(content_object.user_id))
+        if hasattr(content_object, 'collections'):
+            scopes.update(collection_scope(pk) for pk in content_object.collections.values_list('pk', flat=True))
+        elif getattr(content_object, 'collection_id', None) is not None:
+            scopes.add(collection_scope(content_object.collection_id))
+    return scopes
+
+
+def _scope_versions(scopes):
+    keys = {_scope_key(scope): scope for scope in scopes}
+    if not keys:
+        return {}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, scope in keys.items():
+        version = found.get(key)
+        if version is None:
+            # Seeded from the clock so an evicted version is never reused.
+            version = time.time_ns()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions[scope] = version
+    return versions
+
+
+def _bump_scopes(scopes):
+    for scope in scopes:
+        key = _scope_key(scope)
         try:
-            attachment_path = f"attachments/{fileId}"
-            content_attachment = ContentAttachment.objects.get(file=attachment_path)
-            content_object = content_attachment.content_object
-            return _check_content_object_permission(content_object, user) if content_object else False
-        except ContentAttachment.DoesNotExist:
-            return False
-    elif mediaType == 'activities/':
-        activity_path = f"activities/{fileId}"
-        activities = Activity.objects.filter(gpx_file=activity_path)
-        if not activities.exists():
-            return False
-        for activity in activities:
-            if activity.visit and _check_content_object_permission(activity.visit, user):
-                return True
-        return False
-    return False
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_media_permissions(scopes):
+    """
+    Drop cached media access decisions that depend on ``scopes``; inside a
+    transaction it runs again on commit.
+    """
+    scopes = set(scopes)
+    if not scopes:
+        return
+    _bump_scopes(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_scopes(scopes))
+
+
+def cachedFilePermission(fileId, user, mediaType):
+    """``checkFilePermission`` with the decision cached per (path, user)."""
+    timeout = int(getattr(settings, 'MEDIA_PERMISSION_CACHE_TIMEOUT', 60))
+    if timeout <= 0 or mediaType not in PROTECTED_MEDIA_PATHS:
+        return checkFilePermission(fileId, user, mediaType)
+
+    # Hashed because cache key parts are case-folded and paths are not.
+    path_digest = hashlib.sha256(f"{mediaType}{fileId}".encode('utf-8')).hexdigest()
+    key = build_cache_key(
+        PERMISSION_PREFIX,
+        str(user.pk) if user.is_authenticated else 'anonymous',
+        path_digest,
+    )
+    entry = cache.get(key)
+    if entry is not None and _scope_versions(entry['scopes']) == entry['scopes']:
+        return entry['allowed']
+
+    scopes = _permission_scopes(_file_content_objects(fileId, mediaType))
+    # Snapshot the versions before reading what the decision depends on, so a
+    # change landing in between leaves an outdated entry, never a stale grant.
+    versions = _scope_versions(scopes)
+    content_objects = _file_content_objects(fileId, mediaType)
+    allowed = any(_check_content_object_permission(obj, user) for obj in content_objects)
+    if _permission_scopes(content_objects) == scopes:
+        cache.set(key, {'allowed': allowed, 'scopes': versions}, timeout)
+    return allowed
@@ -28,3 +28,54 @@ def point_to_lat_lon(point: Point | None) -> tuple[float | None, float | None]:
 
 def has_coordinates(point: Point | None) -> bool:
     return point is not None
+
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 8) -> str:
+    """Encode a latitude/longitude pair as a geohash cell of ``precision`` characters."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_center(cell: str) -> Point:
+    """Return the centre of a geohash cell as a WGS84 point."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in cell:
+        index = _GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (index >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return Point(
+        (lon_range[0] + lon_range[1]) / 2,
+        (lat_range[0] + lat_range[1]) / 2,
+        srid=WGS84_SRID,
+    )
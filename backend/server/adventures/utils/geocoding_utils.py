@@ -1,11 +1,10 @@
 import re
 import socket
-import unicodedata
 from typing import Any, Dict, Optional
 
 import requests
 from django.conf import settings
-from worldtravel.models import City, Region, VisitedCity, VisitedRegion
+from worldtravel.models import City, Region, VisitedCity, VisitedRegion, normalize_place_name
 
 
 def _clean_location_candidate(value):
@@ -266,7 +265,74 @@ def is_host_resolvable(hostname: str) -> bool:
         return False
 
 
-def extractIsoCode(user, data):
+LOCALITY_KEYS = [
+    "suburb",
+    "neighbourhood",
+    "neighborhood",
+    "city",
+    "city_district",
+    "town",
+    "village",
+    "hamlet",
+    "locality",
+    "municipality",
+    "county",
+]
+
+
+def match_locality(address, region):
+    """
+    Find the city in ``region`` named by the most specific locality in ``address``.
+
+    Keys are tried in ``LOCALITY_KEYS`` order. All accent/case-insensitive
+    matches are fetched up front with one query on (region, normalized_name);
+    the substring fallback only runs for keys without such a match.
+    """
+    localities = []
+    for key_name in LOCALITY_KEYS:
+        value = address.get(key_name)
+        if value:
+            localities.append((key_name, str(value), normalize_place_name(str(value))))
+    if not localities:
+        return None
+
+    qs = City.objects.filter(region=region)
+    normalized_values = {normalized for _, _, normalized in localities if normalized}
+    by_normalized = {}
+    if normalized_values:
+        for city in qs.filter(normalized_name__in=normalized_values).order_by("id"):
+            by_normalized.setdefault(city.normalized_name, []).append(city)
+
+    for key_name, value, normalized in localities:
+        if normalized:
+            matches = by_normalized.get(normalized)
+            if matches:
+                # Prefer an exact (case-insensitive) spelling over an accent-folded one.
+                lowered = value.lower()
+                return next((city for city in matches if city.name.lower() == lowered), matches[0])
+        else:
+            # Names without any ASCII letters (e.g. CJK) normalize to "".
+            exact_match = qs.filter(name__iexact=value).first()
+            if exact_match:
+                return exact_match
+
+        if key_name == "county":
+            continue
+
+        contains_match = qs.filter(name__icontains=value).first()
+        if contains_match:
+            return contains_match
+
+    return None
+
+
+def extractIsoCode(user, data, region_hint=None):
+    """
+    Match a provider payload to a Region/City and the user's visited state.
+
+    ``region_hint`` is a region already resolved from local boundary polygons;
+    when given it is authoritative and only the locality (city) is matched.
+    """
     iso_code = None
     display_name = None
     country_code = None
@@ -320,6 +386,11 @@ def extractIsoCode(user, data):
     iso_code = iso_candidates[0] if iso_candidates else None
 
     region_candidates = []
+    if region_hint is not None:
+        region_candidates.append(region_hint)
+        country_code = region_hint.country.country_code
+        iso_candidates = []
+
     for candidate in iso_candidates:
         if len(str(candidate)) <= 2:
             continue
@@ -350,55 +421,12 @@ def extractIsoCode(user, data):
     region_visited = False
     city_visited = False
 
-    locality_keys = [
-        "suburb",
-        "neighbourhood",
-        "neighborhood",
-        "city",
-        "city_district",
-        "town",
-        "village",
-        "hamlet",
-        "locality",
-        "municipality",
-        "county",
-    ]
-
-    def _normalize_name(value):
-        normalized = unicodedata.normalize("NFKD", value)
-        ascii_only = normalized.encode("ascii", "ignore").decode("ascii")
-        return re.sub(r"[^a-z0-9]", "", ascii_only.lower())
-
-    def match_locality(key_name, target_region):
-        value = address.get(key_name)
-        if not value:
-            return None
-        qs = City.objects.filter(region=target_region)
-
-        exact_match = qs.filter(name__iexact=value).first()
-        if exact_match:
-            return exact_match
-
-        normalized_value = _normalize_name(value)
-        for candidate in qs.values_list("id", "name"):
-            candidate_id, candidate_name = candidate
-            if _normalize_name(candidate_name) == normalized_value:
-                return qs.filter(id=candidate_id).first()
-
-        if key_name == "county":
-            return None
-
-        return qs.filter(name__icontains=value).first()
-
     chosen_region = region
+    city = None
     for candidate_region in region_candidates or [region]:
-        for key_name in locality_keys:
-            city = match_locality(key_name, candidate_region)
-            if city:
-                chosen_region = candidate_region
-                iso_code = chosen_region.id
-                break
+        city = match_locality(address, candidate_region)
         if city:
+            chosen_region = candidate_region
             break
 
     region = chosen_region
@@ -1,5 +1,6 @@
-from datetime import datetime, timezone as dt_timezone
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
 
@@ -35,3 +36,17 @@ def is_location_visited(location):
             return True
             
     return False
+
+
+def visited_exists(location_ref='pk'):
+    """
+    SQL counterpart of ``is_location_visited`` for annotating querysets.
+
+    A location counts as visited when any visit starts on or before today
+    (UTC), i.e. before the start of tomorrow.
+    """
+    from adventures.models import Visit
+
+    tomorrow = timezone.now().date() + timedelta(days=1)
+    cutoff = datetime.combine(tomorrow, time.min, tzinfo=dt_timezone.utc)
+    return Exists(Visit.objects.filter(location=OuterRef(location_ref), start_date__lt=cutoff))
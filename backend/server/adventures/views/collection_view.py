@@ -22,6 +22,7 @@ from users.models import CustomUser as User
 from adventures.utils import pagination
 from adventures.utils.geo import make_point, point_to_lat_lon
 from users.serializers import CustomUserDetailsSerializer as UserSerializer
+from adventures.services.location_matching import find_similar_location
 from adventures.services.collection_pdf import (
     build_collection_pdf,
     get_collection_for_pdf,
@@ -746,50 +747,31 @@ class CollectionViewSet(viewsets.ModelViewSet):
             image_export_map = {img['export_id']: img for img in metadata.get('images', [])}
             attachment_export_map = {att['export_id']: att for att in metadata.get('attachments', [])}
 
+            # Index archive members once instead of scanning namelist() per file.
+            image_members = {}
+            attachment_members = set()
+            for member in zipf.namelist():
+                if member.startswith('images/'):
+                    export_id, sep, _ = member[len('images/'):].partition('-')
+                    if sep:
+                        image_members.setdefault(export_id, member)
+                elif member.startswith('attachments/'):
+                    attachment_members.add(member)
+
             # Import locations
             for loc_data in metadata.get('locations', []):
                 cat_obj = None
                 if loc_data.get('category'):
                     cat_obj, _ = Category.objects.get_or_create(user=request.user, name=loc_data['category'])
-                # Attempt to find a very similar existing location for this user
-                from difflib import SequenceMatcher
-
-                def _ratio(a, b):
-                    a = (a or '').strip().lower()
-                    b = (b or '').strip().lower()
-                    if not a and not b:
-                        return 1.0
-                    return SequenceMatcher(None, a, b).ratio()
-
-                def _coords_close(lat1, lon1, lat2, lon2, threshold=0.02):
-                    try:
-                        if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
-                            return False
-                        return abs(float(lat1) - float(lat2)) <= threshold and abs(float(lon1) - float(lon2)) <= threshold
-                    except Exception:
-                        return False
-
                 incoming_name = loc_data.get('name') or 'Untitled'
                 incoming_location_text = loc_data.get('location')
                 incoming_lat = loc_data.get('latitude')
                 incoming_lon = loc_data.get('longitude')
 
-                existing_loc = None
-                best_score = 0.0
-                for cand in Location.objects.filter(user=request.user):
-                    name_score = _ratio(incoming_name, cand.name)
-                    loc_text_score = _ratio(incoming_location_text, getattr(cand, 'location', None))
-                    cand_lat, cand_lon = point_to_lat_lon(cand.coordinates)
-                    close_coords = _coords_close(incoming_lat, incoming_lon, cand_lat, cand_lon)
-                    # Define "very similar": strong name match OR decent name with location/coords match
-                    combined_score = max(name_score, (name_score + loc_text_score) / 2.0)
-                    if close_coords:
-                        combined_score = max(combined_score, name_score + 0.1)  # small boost for coord proximity
-                    if combined_score > best_score and (
-                        name_score >= 0.92 or (name_score >= 0.85 and (loc_text_score >= 0.85 or close_coords))
-                    ):
-                        best_score = combined_score
-                        existing_loc = cand
+                # Attempt to find a very similar existing location for this user
+                existing_loc = find_similar_location(
+                    request.user, incoming_name, incoming_location_text, incoming_lat, incoming_lon,
+                )
 
                 if existing_loc:
                     # Link existing location to the new collection, skip creating a duplicate
@@ -820,8 +802,7 @@ class CollectionViewSet(viewsets.ModelViewSet):
                         img_meta = image_export_map.get(export_id)
                         if not img_meta:
                             continue
-                        prefix = f"images/{export_id}-"
-                        member = next((m for m in zipf.namelist() if m.startswith(prefix)), None)
+                        member = image_members.get(export_id)
                         if not member:
                             continue
                         file_bytes_img = zipf.read(member)
@@ -845,8 +826,8 @@ class CollectionViewSet(viewsets.ModelViewSet):
                         if not att_meta:
                             continue
                         file_name_att = att_meta.get('name', '')
-                        member = next((m for m in zipf.namelist() if m == f"attachments/{file_name_att}"), None)
-                        if not member:
+                        member = f"attachments/{file_name_att}"
+                        if member not in attachment_members:
                             continue
                         file_bytes_att = zipf.read(member)
                         from django.core.files.base import ContentFile
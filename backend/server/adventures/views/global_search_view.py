@@ -1,11 +1,13 @@
 import logging
 
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from adventures.serializers import SearchHitSerializer
+from adventures.serializers import SearchHitSerializer, SearchSuggestionSerializer
 from adventures.services.search import SearchValidationError, global_search
+from adventures.services.search import suggest as search_suggest
 
 logger = logging.getLogger(__name__)
 
@@ -56,3 +58,28 @@ class GlobalSearchView(viewsets.ViewSet):
                 'facets': payload['facets'],
             }
         )
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Title suggestions while typing; see ``list`` for full ranked results."""
+        query = (request.query_params.get('q') or request.query_params.get('query') or '').strip()
+        if not query:
+            return Response({'error': 'Search query is required'}, status=400)
+
+        types_param = request.query_params.get('types', '').strip()
+        types = None
+        if types_param:
+            types = {item.strip() for item in types_param.split(',') if item.strip()}
+
+        try:
+            limit = int(request.query_params.get('limit', 8))
+        except (TypeError, ValueError):
+            return Response({'error': 'limit must be an integer'}, status=400)
+
+        try:
+            payload = search_suggest(user=request.user, query=query, types=types, limit=limit)
+        except SearchValidationError as exc:
+            return Response({'error': exc.message}, status=400)
+
+        serializer = SearchSuggestionSerializer(payload['results'], many=True)
+        return Response({'query': payload['query'], 'results': serializer.data})
@@ -20,6 +20,13 @@ from adventures.services.images.fetch import (
     download_remote_image,
     import_remote_images_for_object,
 )
+from adventures.services.map_pins import (
+    cluster_points,
+    filter_to_bbox,
+    grid_size_for_zoom,
+    parse_viewport,
+)
+from adventures.utils.conditional import conditional_response
 from adventures.services.images.metadata import (
     ImageSource,
     create_content_image,
@@ -137,21 +144,32 @@ class ContentImageViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='map_pins')
     def map_pins(self, request):
-        """Return geotagged images accessible to the current user for map display."""
-        images = (
-            self.get_queryset()
-            .filter(coordinates__isnull=False)
-            .select_related('content_type', 'user')
-            .order_by('-is_primary', 'id')
-        )
+        """
+        Return geotagged images accessible to the current user for map display.
+
+        Accepts the same ``bbox`` and ``zoom`` parameters as the location pins
+        endpoint; low zoom levels return cluster centroids with counts.
+        """
+        try:
+            viewport = parse_viewport(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        images = filter_to_bbox(self.get_queryset().filter(coordinates__isnull=False), viewport.bbox)
+
+        if viewport.clustered:
+            return conditional_response(request, {
+                'type': 'clusters',
+                'zoom': viewport.zoom,
+                'grid_size': grid_size_for_zoom(viewport.zoom),
+                'clusters': cluster_points(images, viewport.zoom),
+            })
 
-        pins = []
-        for image in images.iterator(chunk_size=200):
-            data = ImageMapPinSerializer(image, context={'request': request}).data
-            if data:
-                pins.append(data)
+        images = images.order_by('-is_primary', 'id')
+        serializer = ImageMapPinSerializer(images, many=True, context={'request': request})
+        pins = [pin for pin in serializer.data if pin]
 
-        return Response(pins)
+        return conditional_response(request, pins)
 
     @action(detail=False, methods=['post'],
             permission_classes=[IsAuthenticated],
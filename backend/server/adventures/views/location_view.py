@@ -1,5 +1,4 @@
 import logging
-from django.utils import timezone
 from django.db import transaction
 from django.core.exceptions import PermissionDenied
 from django.core.files.base import ContentFile
@@ -17,11 +16,18 @@ from adventures.serializers import (
     CalendarLocationSerializer,
     CollectionItineraryItemSerializer,
     LocationSerializer,
-    MapPinSerializer,
 )
 from adventures.utils import pagination
+from adventures.utils.conditional import conditional_response
+from adventures.utils.get_is_visited import visited_exists
 from adventures.throttling import ExternalGeocodeThrottle
 from adventures.services.geocoding.reverse import reverse_geocode as reverse_geocode_service
+from adventures.services.map_pins import (
+    build_location_clusters,
+    build_location_pins,
+    parse_viewport,
+    to_columnar,
+)
 from adventures.services.share_image import (
     build_share_image,
     get_location_for_share,
@@ -74,7 +80,7 @@ class LocationViewSet(viewsets.ModelViewSet):
             if self.action in public_allowed_actions:
                 return Location.objects.retrieve_locations(
                     user, include_public=True
-                ).order_by('-updated_at')
+                ).with_visited_status().order_by('-updated_at')
             return Location.objects.none()
 
         include_public = self.action in public_allowed_actions
@@ -83,7 +89,7 @@ class LocationViewSet(viewsets.ModelViewSet):
             include_public=include_public,
             include_owned=True,
             include_shared=True
-        ).order_by('-updated_at')
+        ).with_visited_status().order_by('-updated_at')
 
     # ==================== SORTING & FILTERING ====================
 
@@ -339,7 +345,7 @@ class LocationViewSet(viewsets.ModelViewSet):
         queryset = Location.objects.filter(
             category__in=Category.objects.filter(name__in=types, user=request.user),
             user=request.user.id
-        )
+        ).with_visited_status()
 
         # Apply visit status filtering
         queryset = self._apply_visit_filtering(queryset, request)
@@ -364,6 +370,7 @@ class LocationViewSet(viewsets.ModelViewSet):
             queryset = Location.objects.filter(base_filter)
         else:
             queryset = Location.objects.filter(base_filter, collections__isnull=True)
+        queryset = queryset.with_visited_status()
 
         queryset = self.apply_sorting(queryset)
         serializer = self.get_serializer(queryset, many=True, context={'nested': nested, 'allowed_nested_fields': allowedNestedFields})
@@ -568,13 +575,30 @@ class LocationViewSet(viewsets.ModelViewSet):
     # view to return location name and lat/lon for all locations a user owns for the golobal map
     @action(detail=False, methods=['get'], url_path='pins')
     def map_locations(self, request):
-        """Get all locations with name and lat/lon for map display."""
+        """
+        Get all locations with name and lat/lon for map display.
+
+        ``?bbox=west,south,east,north`` limits pins to the viewport and
+        ``?zoom=N`` below MAP_CLUSTER_MAX_ZOOM returns cluster centroids
+        instead of pins. ``?compact=true`` returns parallel arrays instead of
+        one object per pin. Responses carry an ETag so an unchanged map is
+        answered with 304.
+        """
         if not request.user.is_authenticated:
             return Response({"error": "User is not authenticated"}, status=400)
 
-        locations = Location.objects.filter(user=request.user)
-        serializer = MapPinSerializer(locations, many=True)
-        return Response(serializer.data)
+        try:
+            viewport = parse_viewport(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if viewport.clustered:
+            return conditional_response(request, build_location_clusters(request.user, viewport))
+
+        pins = build_location_pins(request.user, viewport.bbox)
+        if coerce_bool(request.query_params.get('compact')):
+            return conditional_response(request, to_columnar(pins))
+        return conditional_response(request, pins)
 
     # ==================== HELPER METHODS ====================
 
@@ -772,14 +796,8 @@ class LocationViewSet(viewsets.ModelViewSet):
         else:
             return queryset
 
-        # Apply visit filtering
-        now = timezone.now().date()
-        if is_visited_bool:
-            queryset = queryset.filter(visits__start_date__lte=now).distinct()
-        else:
-            queryset = queryset.exclude(visits__start_date__lte=now).distinct()
-
-        return queryset
+        # Same rules as the serialized is_visited flag
+        return queryset.filter(visited_exists()) if is_visited_bool else queryset.exclude(visited_exists())
 
     def _has_adventure_access(self, adventure, user):
         """Check if user has access to adventure."""
@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from worldtravel.models import Region, City, VisitedRegion, VisitedCity
 from adventures.models import Location
 from adventures.serializers import LocationSerializer
+from adventures.services.dashboard_cache import mark_user_data_changed
 from adventures.services.geocoding.reverse import reverse_geocode as reverse_geocode_service
 from adventures.services.places.details import get_place_details
 from adventures.services.places.search import search_places
@@ -111,6 +112,8 @@ class ReverseGeocodeViewSet(viewsets.ViewSet):
         
         if new_visited_regions:
             VisitedRegion.objects.bulk_create(new_visited_regions)
+            # bulk_create skips the dashboard receivers.
+            mark_user_data_changed([self.request.user.pk])
             new_region_count = len(new_visited_regions)
             # Get region names for response
             regions = Region.objects.filter(
@@ -136,6 +139,7 @@ class ReverseGeocodeViewSet(viewsets.ViewSet):
         
         if new_visited_cities:
             VisitedCity.objects.bulk_create(new_visited_cities)
+            mark_user_data_changed([self.request.user.pk])
             new_city_count = len(new_visited_cities)
             # Get city names for response
             cities = City.objects.filter(
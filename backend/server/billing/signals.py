@@ -2,10 +2,12 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from cloud.utils import invalidate_entitlement
+
 from .models import Subscription
 
 
@@ -27,3 +29,10 @@ def ensure_subscription(sender, instance, created, **kwargs):
         defaults = {"status": Subscription.STATUS_ACTIVE, "trial_ends_at": None}
 
     Subscription.objects.get_or_create(user=instance, defaults=defaults)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_cached_entitlement(sender, instance, **kwargs):
+    # Covers the Stripe webhook and checkout handlers, which save the row.
+    invalidate_entitlement(instance.user_id)
@@ -0,0 +1,109 @@
+"""
+Measure CloudAccessMiddleware overhead under concurrent load.
+
+Creates throwaway users, then sends synthetic ``/api/`` requests through the
+middleware from several threads, once with the previous per-request
+``get_or_create_subscription`` lookup and once with the cached entitlement.
+The wrapped view does no work, so the timings are the middleware's own cost.
+The benchmark users are deleted afterwards.
+
+Usage:
+    python manage.py benchmark_cloud_access
+    python manage.py benchmark_cloud_access --users 50 --threads 16 --requests 2000
+"""
+
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from cloud.middleware import CloudAccessMiddleware
+from cloud.utils import get_or_create_subscription, has_access, invalidate_entitlement
+
+
+class UncachedCloudAccessMiddleware(CloudAccessMiddleware):
+    """The middleware as it behaved before entitlements were cached."""
+
+    def has_access(self, user) -> bool:
+        return has_access(user, get_or_create_subscription(user))
+
+
+def _run(middleware, users, threads, requests):
+    factory = RequestFactory()
+
+    def worker(indexes):
+        timings = []
+        try:
+            for index in indexes:
+                request = factory.get('/api/locations/')
+                request.user = users[index % len(users)]
+                started = time.perf_counter()
+                middleware(request)
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+        return timings
+
+    chunks = [range(offset, requests, threads) for offset in range(threads)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        timings = sorted(t for chunk in pool.map(worker, chunks) for t in chunk)
+    elapsed = time.perf_counter() - started
+    return {
+        'median': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'throughput': requests / elapsed if elapsed else 0,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark CloudAccessMiddleware with and without the entitlement cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Distinct users (default: 20)')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent threads (default: 8)')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per run (default: 1000)')
+
+    def handle(self, *args, **options):
+        user_count = max(1, options['users'])
+        threads = max(1, options['threads'])
+        requests = max(threads, options['requests'])
+
+        def get_response(request):
+            return HttpResponse()
+
+        User = get_user_model()
+        run_id = uuid.uuid4().hex[:8]
+        with override_settings(CLOUD_MODE=True):
+            users = [
+                User.objects.create_user(
+                    username=f'benchmark-{run_id}-{index}',
+                    email=f'benchmark-{run_id}-{index}@example.com',
+                    password=uuid.uuid4().hex,
+                )
+                for index in range(user_count)
+            ]
+            try:
+                for user in users:
+                    invalidate_entitlement(user.pk)
+                runs = (
+                    ('uncached', UncachedCloudAccessMiddleware(get_response)),
+                    ('cached', CloudAccessMiddleware(get_response)),
+                )
+                for label, middleware in runs:
+                    result = _run(middleware, users, threads, requests)
+                    self.stdout.write(
+                        f'{label:>9}: median {result["median"]:6.3f} ms, p95 {result["p95"]:6.3f} ms, '
+                        f'{result["throughput"]:8.0f} req/s ({threads} threads, {requests} requests)'
+                    )
+            finally:
+                close_old_connections()
+                User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -1,14 +1,17 @@
 from django.conf import settings
 from django.http import JsonResponse
 
-from cloud.utils import get_or_create_subscription, has_access
-from users.models import APIKey
+from cloud.utils import has_cached_access
+from users.authentication import APIKeyAuthentication, authenticate_request_api_key
 
 
 class CloudAccessMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
+    def has_access(self, user) -> bool:
+        return has_cached_access(user)
+
     def __call__(self, request):
         if not settings.CLOUD_MODE:
             return self.get_response(request)
@@ -22,22 +25,17 @@ class CloudAccessMiddleware:
         user = request.user if request.user.is_authenticated else None
 
         if user is None:
-            api_key = request.headers.get("X-API-Key")
-            if not api_key:
-                auth_header = request.headers.get("Authorization", "")
-                if auth_header.lower().startswith("api-key "):
-                    api_key = auth_header[8:].strip()
-
+            api_key = APIKeyAuthentication.extract_key(request)
             if api_key:
-                api_key_instance = APIKey.authenticate(api_key)
+                # DRF's APIKeyAuthentication reuses this result for the request.
+                api_key_instance = authenticate_request_api_key(request, api_key)
                 if api_key_instance:
                     user = api_key_instance.user
 
         if user is None:
             return self.get_response(request)
 
-        subscription = get_or_create_subscription(user)
-        if has_access(user, subscription):
+        if self.has_access(user):
             return self.get_response(request)
 
         return JsonResponse(
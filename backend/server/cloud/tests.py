@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from billing.models import Subscription
+from cloud.utils import has_cached_access, invalidate_entitlement
+from users.models import CustomUser
+
+
+@override_settings(CLOUD_MODE=True)
+class EntitlementCacheTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='cloud-user', email='cloud-user@example.com', password='testpassword123',
+        )
+        invalidate_entitlement(self.user.pk)
+
+    def test_repeat_check_is_served_from_cache(self):
+        self.assertTrue(has_cached_access(self.user))
+        with self.assertNumQueries(0):
+            self.assertTrue(has_cached_access(self.user))
+
+    def test_subscription_change_invalidates_entitlement(self):
+        self.assertTrue(has_cached_access(self.user))
+
+        subscription = Subscription.objects.get(user=self.user)
+        subscription.status = Subscription.STATUS_CANCELED
+        subscription.save()
+
+        self.assertFalse(has_cached_access(self.user))
+
+    def test_expired_trial_is_denied(self):
+        Subscription.objects.filter(user=self.user).update(trial_ends_at=timezone.now() - timedelta(minutes=1))
+        self.assertFalse(has_cached_access(self.user))
@@ -1,10 +1,15 @@
+import math
 from datetime import timedelta
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
 from billing.models import Subscription
 
+ENTITLEMENT_CACHE_PREFIX = "cloud_entitlement_v1"
+
 
 def get_or_create_subscription(user) -> Subscription:
     if settings.CLOUD_MODE:
@@ -36,3 +41,48 @@ def has_access(user, subscription: Subscription | None = None) -> bool:
         return subscription.trial_ends_at >= timezone.now()
 
     return False
+
+
+def _entitlement_key(user_id) -> str:
+    return f"{ENTITLEMENT_CACHE_PREFIX}:{user_id}"
+
+
+def invalidate_entitlement(user_id) -> None:
+    """
+    Forget a user's cached entitlement now and, inside a transaction, again on
+    commit so a concurrent request can't re-cache the state being replaced.
+    """
+    key = _entitlement_key(user_id)
+    cache.delete(key)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+def has_cached_access(user) -> bool:
+    """
+    ``has_access`` backed by a per-user cache of the subscription status and
+    trial end, so the request path skips ``get_or_create_subscription``.
+
+    Trial entries expire at ``trial_ends_at``; saving a subscription (including
+    from the Stripe webhook) invalidates the entry via ``billing.signals``.
+    """
+    if not settings.CLOUD_MODE:
+        return True
+
+    timeout = int(getattr(settings, "CLOUD_ENTITLEMENT_CACHE_TIMEOUT", 300))
+    if timeout <= 0:
+        return has_access(user)
+
+    key = _entitlement_key(user.pk)
+    entitlement = cache.get(key)
+    if entitlement is None:
+        subscription = get_or_create_subscription(user)
+        entitlement = {"status": subscription.status, "trial_ends_at": subscription.trial_ends_at}
+        trial_ends_at = subscription.trial_ends_at
+        if subscription.status == Subscription.STATUS_TRIAL and trial_ends_at is not None:
+            remaining = (trial_ends_at - timezone.now()).total_seconds()
+            if remaining > 0:
+                timeout = min(timeout, math.ceil(remaining))
+        cache.set(key, entitlement, timeout)
+
+    return has_access(user, Subscription(**entitlement))
@@ -0,0 +1,93 @@
+"""
+Access decisions for Immich assets proxied by ``get_by_integration``.
+
+An asset can be linked to several ``ContentImage`` rows (one per location,
+lodging, note, ... it was added to). The requester may view it when any of
+those parents grants access:
+
+0. the parent itself is public,
+1. the parent is a location in a public collection,
+2. the parent is a location in a collection the requester owns or is shared on,
+3. otherwise only the integration owner may view it.
+
+The best level across all linked rows is computed in one aggregate query and
+the decision is cached briefly per (integration, asset, requester).
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Case, Count, Exists, IntegerField, Min, OuterRef, Q, Value, When
+
+from adventures.models import Collection, ContentImage, Location, Lodging, Note, Transportation
+from adventures.services.external_cache import build_cache_key
+
+ACCESS_CACHE_PREFIX = 'immich_asset_access_v1'
+
+ALLOW = 'allow'
+FORBIDDEN = 'forbidden'
+NOT_LINKED = 'not_linked'
+
+ACCESS_PUBLIC = 0
+ACCESS_PUBLIC_COLLECTION = 1
+ACCESS_SHARED = 2
+ACCESS_OWNER_ONLY = 3
+
+# Parent types whose own ``is_public`` flag opens their images to everyone.
+PUBLIC_FLAG_MODELS = (Location, Transportation, Lodging, Note)
+
+
+def _access_level_expression(user):
+    public_parent = Q()
+    for model in PUBLIC_FLAG_MODELS:
+        public_parent |= Q(
+            Exists(model.objects.filter(pk=OuterRef('object_id'), is_public=True)),
+            content_type_id=ContentType.objects.get_for_model(model).id,
+        )
+
+    location_type_id = ContentType.objects.get_for_model(Location).id
+    location_collections = Collection.objects.filter(locations=OuterRef('object_id'))
+    whens = [
+        When(public_parent, then=Value(ACCESS_PUBLIC)),
+        When(
+            Q(Exists(location_collections.filter(is_public=True)), content_type_id=location_type_id),
+            then=Value(ACCESS_PUBLIC_COLLECTION),
+        ),
+    ]
+    if user.is_authenticated:
+        whens.append(When(
+            Q(
+                Exists(location_collections.filter(Q(user=user) | Q(shared_with=user))),
+                content_type_id=location_type_id,
+            ),
+            then=Value(ACCESS_SHARED),
+        ))
+    return Case(*whens, default=Value(ACCESS_OWNER_ONLY), output_field=IntegerField())
+
+
+def compute_asset_access(owner_id, immich_id: str, user) -> str:
+    """Return ``ALLOW``, ``FORBIDDEN`` or ``NOT_LINKED`` for ``user`` viewing the asset."""
+    if user.is_authenticated and user.pk == owner_id:
+        return ALLOW
+
+    result = ContentImage.objects.filter(immich_id=immich_id, user_id=owner_id).aggregate(
+        linked=Count('pk'),
+        best=Min(_access_level_expression(user)),
+    )
+    if not result['linked']:
+        return NOT_LINKED
+    return ALLOW if result['best'] < ACCESS_OWNER_ONLY else FORBIDDEN
+
+
+def get_asset_access(integration, immich_id: str, user) -> str:
+    """``compute_asset_access`` with a short per-requester cache."""
+    timeout = int(getattr(settings, 'IMMICH_ACCESS_CACHE_TIMEOUT', 60))
+    if timeout <= 0:
+        return compute_asset_access(integration.user_id, immich_id, user)
+
+    requester = str(user.pk) if user.is_authenticated else 'anonymous'
+    key = build_cache_key(ACCESS_CACHE_PREFIX, str(integration.id), immich_id, requester)
+    decision = cache.get(key)
+    if decision is None:
+        decision = compute_asset_access(integration.user_id, immich_id, user)
+        cache.set(key, decision, timeout)
+    return decision
@@ -0,0 +1,238 @@
+"""
+Bounded on-disk cache for thumbnails proxied from Immich servers.
+
+Entries are keyed by (integration, asset, size) and written to disk while they
+stream in from Immich, so neither a miss nor a hit holds the whole image in
+memory. Concurrent misses for the same key (across threads and worker
+processes) are collapsed with a file lock: one request downloads, the others
+wait and then serve the cached file. Keys share a fixed set of lock files
+(``LOCK_STRIPES``) so locks never accumulate on disk. When the cache grows past its size
+limit, entries are evicted oldest-first by last access (``lru``) or by write
+time (``fifo``).
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+EVICTION_POLICIES = ('lru', 'fifo')
+# Evict down to this fraction of the limit so a full cache isn't rescanned on every write.
+LOW_WATER_RATIO = 0.9
+LOCK_STRIPES = 64
+LOCKS_DIR = 'locks'
+
+
+class ThumbnailUnavailable(Exception):
+    """Raised by a loader when the upstream response must not be cached."""
+
+    def __init__(self, status_code: Optional[int] = None):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+@dataclass
+class CachedThumbnail:
+    path: Path
+    content_type: str
+    etag: str
+    size: int
+
+    def open(self):
+        return open(self.path, 'rb')
+
+
+# A loader returns (content_type, upstream_etag_or_None, chunk iterator).
+Loader = Callable[[], Tuple[str, Optional[str], Iterable[bytes]]]
+
+
+class ThumbnailCache:
+    def __init__(self, directory, max_bytes: int, policy: str = 'lru', ttl: int = 0):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}'; expected one of {EVICTION_POLICIES}")
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._written_since_scan = max_bytes  # forces a scan after the first write
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def build_key(integration_id, asset_id: str, size: str) -> str:
+        return hashlib.sha256(f'{integration_id}:{asset_id}:{size}'.encode()).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        folder = self.directory / key[:2]
+        return folder / f'{key}.bin', folder / f'{key}.json'
+
+    def _lock_path(self, key: str) -> Path:
+        return self.directory / LOCKS_DIR / f'{zlib.crc32(key.encode()) % LOCK_STRIPES}.lock'
+
+    def get(self, key: str) -> Optional[CachedThumbnail]:
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as handle:
+                meta = json.load(handle)
+            stat = data_path.stat()
+        except (OSError, ValueError):
+            return None
+
+        if self.ttl and time.time() - meta.get('created', 0) > self.ttl:
+            return None
+        if self.policy == 'lru':
+            # mtime doubles as the last-access time used for eviction.
+            try:
+                os.utime(data_path)
+            except OSError:
+                pass
+        return CachedThumbnail(data_path, meta['content_type'], meta['etag'], stat.st_size)
+
+    def get_or_fetch(self, key: str, loader: Loader) -> CachedThumbnail:
+        """Return the cached entry, downloading it once if missing."""
+        cached = self.get(key)
+        if cached:
+            return cached
+
+        data_path, meta_path = self._paths(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self._lock_path(key)
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, 'a') as lock_handle:
+            fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            try:
+                # Another request may have filled the entry while we waited.
+                cached = self.get(key)
+                if cached:
+                    return cached
+                entry = self._store(key, loader)
+            finally:
+                fcntl.flock(lock_handle, fcntl.LOCK_UN)
+
+        self._note_write(entry.size)
+        return entry
+
+    def _store(self, key: str, loader: Loader) -> CachedThumbnail:
+        data_path, meta_path = self._paths(key)
+        content_type, upstream_etag, chunks = loader()
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=data_path.parent, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in chunks:
+                    if chunk:
+                        handle.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            os.replace(tmp_name, data_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+        etag = upstream_etag or f'"{digest.hexdigest()[:32]}"'
+        meta = {'content_type': content_type, 'etag': etag, 'created': time.time()}
+        with open(meta_path, 'w') as handle:
+            json.dump(meta, handle)
+        return CachedThumbnail(data_path, content_type, etag, size)
+
+    def _note_write(self, size: int) -> None:
+        with self._lock:
+            self._written_since_scan += size
+            if self._written_since_scan < self.max_bytes * (1 - LOW_WATER_RATIO):
+                return
+            self._written_since_scan = 0
+        try:
+            self.evict()
+        except OSError:
+            logger.exception("Immich thumbnail cache eviction failed")
+
+    def _entries(self):
+        if not self.directory.exists():
+            return
+        for folder in self.directory.iterdir():
+            if not folder.is_dir():
+                continue
+            for path in folder.glob('*.bin'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                yield path, stat
+
+    def evict(self) -> int:
+        """Trim the cache below its size limit. Returns the number of entries removed."""
+        entries = list(self._entries())
+        total = sum(stat.st_size for _, stat in entries)
+        if total <= self.max_bytes:
+            return 0
+
+        # For LRU, mtime is refreshed on every hit; for FIFO it stays the write time.
+        entries.sort(key=lambda item: item[1].st_mtime)
+        target = self.max_bytes * LOW_WATER_RATIO
+        removed = 0
+        for path, stat in entries:
+            if total <= target:
+                break
+            for stale in (path, path.with_suffix('.json')):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        removed = 0
+        for path, _ in list(self._entries()):
+            for stale in (path, path.with_suffix('.json')):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        return removed
+
+
+_cache: Optional[ThumbnailCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache(
+                directory=getattr(settings, 'IMMICH_THUMBNAIL_CACHE_DIR', Path(settings.BASE_DIR) / 'cache' / 'immich'),
+                max_bytes=int(getattr(settings, 'IMMICH_THUMBNAIL_CACHE_MAX_MB', 512)) * 1024 * 1024,
+                policy=getattr(settings, 'IMMICH_THUMBNAIL_CACHE_POLICY', 'lru'),
+                ttl=int(getattr(settings, 'IMMICH_THUMBNAIL_CACHE_TTL', 60 * 60 * 24 * 7)),
+            )
+        return _cache
+
+
+def reset_thumbnail_cache() -> None:
+    """Drop the configured instance so changed settings take effect (used by tests)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
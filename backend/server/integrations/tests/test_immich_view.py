@@ -141,3 +141,250 @@ class ImmichViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         mock_post.assert_not_called()
         self.assertEqual(len(response.data['results']), 1)
+
+
+class ImmichThumbnailCacheTests(TestCase):
+    def setUp(self):
+        import tempfile
+
+        from integrations.immich_cache import reset_thumbnail_cache
+
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username='thumb-user', password='test-pass')
+        self.integration = ImmichIntegration.objects.create(
+            user=self.user,
+            server_url='http://immich.example.com/api',
+            api_key='test-api-key',
+        )
+        self.view = ImmichIntegrationView.as_view({'get': 'get_by_integration'})
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.settings_override = self.settings(
+            IMMICH_THUMBNAIL_CACHE_DIR=self.cache_dir.name,
+            IMMICH_THUMBNAIL_CACHE_MAX_MB=1,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        reset_thumbnail_cache()
+        self.addCleanup(reset_thumbnail_cache)
+
+    def _upstream(self, body=b'jpeg-bytes', content_type='image/jpeg'):
+        upstream = MagicMock()
+        upstream.status_code = 200
+        upstream.headers = {'Content-Type': content_type}
+        upstream.iter_content.return_value = iter([body[:4], body[4:]])
+        return upstream
+
+    def _get(self, **headers):
+        request = self.factory.get(f'/api/integrations/immich/{self.integration.id}/get/asset-1', **headers)
+        force_authenticate(request, user=self.user)
+        return self.view(request, integration_id=str(self.integration.id), imageid='asset-1')
+
+    @patch('integrations.views.immich_view.requests.get')
+    def test_thumbnail_is_downloaded_once_and_streamed_from_disk(self, mock_get):
+        mock_get.return_value = self._upstream()
+
+        first = self._get()
+        second = self._get()
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(b''.join(first.streaming_content), b'jpeg-bytes')
+        self.assertEqual(b''.join(second.streaming_content), b'jpeg-bytes')
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(second['Content-Type'], 'image/jpeg')
+
+    @patch('integrations.views.immich_view.requests.get')
+    def test_matching_etag_returns_not_modified(self, mock_get):
+        mock_get.return_value = self._upstream()
+        etag = self._get()['ETag']
+
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('integrations.views.immich_view.requests.get')
+    def test_non_image_reply_is_not_cached(self, mock_get):
+        mock_get.return_value = self._upstream(body=b'{"error": 1}', content_type='application/json')
+
+        self.assertEqual(self._get().status_code, 502)
+        self.assertEqual(self._get().status_code, 502)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('integrations.views.immich_view.requests.get')
+    def test_upstream_not_found_is_passed_through(self, mock_get):
+        upstream = self._upstream(content_type='application/json')
+        upstream.status_code = 404
+        mock_get.return_value = upstream
+
+        response = self._get()
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['code'], 'immich.not_found')
+
+    @patch('integrations.views.immich_view.requests.get')
+    def test_broken_upstream_stream_is_not_cached(self, mock_get):
+        import requests
+
+        def chunks():
+            yield b'jpeg'
+            raise requests.exceptions.ChunkedEncodingError()
+
+        upstream = self._upstream()
+        upstream.iter_content.return_value = chunks()
+        mock_get.return_value = upstream
+
+        self.assertEqual(self._get().status_code, 502)
+
+        mock_get.return_value = self._upstream()
+        self.assertEqual(b''.join(self._get().streaming_content), b'jpeg-bytes')
+
+    @patch('integrations.views.immich_view.requests.get')
+    def test_uncached_stream_ends_cleanly_when_upstream_drops(self, mock_get):
+        import requests
+
+        def chunks():
+            yield b'jpeg'
+            raise requests.exceptions.ChunkedEncodingError()
+
+        upstream = self._upstream()
+        upstream.iter_content.return_value = chunks()
+        mock_get.return_value = upstream
+
+        with self.settings(IMMICH_THUMBNAIL_CACHE_MAX_MB=0):
+            from integrations.immich_cache import reset_thumbnail_cache
+
+            reset_thumbnail_cache()
+            response = self._get()
+            self.assertEqual(b''.join(response.streaming_content), b'jpeg')
+
+
+class ThumbnailCacheEvictionTests(TestCase):
+    def _cache(self, directory, policy):
+        from integrations.immich_cache import ThumbnailCache
+
+        return ThumbnailCache(directory, max_bytes=25, policy=policy)
+
+    def _fill(self, cache, key, body=b'0123456789'):
+        return cache.get_or_fetch(key, lambda: ('image/jpeg', None, iter([body])))
+
+    def test_lru_keeps_recently_read_entries(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = self._cache(directory, 'lru')
+            first = self._fill(cache, 'aa1')
+            self._fill(cache, 'bb2')
+            os.utime(first.path, (1, 1))
+            cache.get('aa1')  # refreshes the access time
+            second = cache.get('bb2')
+            os.utime(second.path, (2, 2))
+            self._fill(cache, 'cc3')
+            cache.evict()
+
+            self.assertIsNotNone(cache.get('aa1'))
+            self.assertIsNone(cache.get('bb2'))
+
+    def test_fifo_evicts_oldest_write(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = self._cache(directory, 'fifo')
+            first = self._fill(cache, 'aa1')
+            os.utime(first.path, (1, 1))
+            self._fill(cache, 'bb2')
+            cache.get('aa1')  # reads do not change FIFO order
+            self._fill(cache, 'cc3')
+            cache.evict()
+
+            self.assertIsNone(cache.get('aa1'))
+            self.assertIsNotNone(cache.get('bb2'))
+
+    def test_lock_files_do_not_grow_with_entries(self):
+        import tempfile
+        from pathlib import Path
+
+        from integrations.immich_cache import LOCK_STRIPES, LOCKS_DIR
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = self._cache(directory, 'lru')
+            for index in range(LOCK_STRIPES * 2):
+                self._fill(cache, f'{index:04x}', body=b'x')
+            cache.evict()
+
+            locks = list(Path(directory).rglob('*.lock'))
+            self.assertLessEqual(len(locks), LOCK_STRIPES)
+            self.assertTrue(all(lock.parent.name == LOCKS_DIR for lock in locks))
+
+
+class ImmichAssetAccessTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import AnonymousUser
+        from django.contrib.contenttypes.models import ContentType
+
+        from adventures.models import Collection, ContentImage, Location
+
+        self.owner = User.objects.create_user(username='asset-owner', password='test-pass')
+        self.friend = User.objects.create_user(username='asset-friend', password='test-pass')
+        self.stranger = User.objects.create_user(username='asset-stranger', password='test-pass')
+        self.anonymous = AnonymousUser()
+
+        self.location = Location.objects.create(user=self.owner, name='Private place')
+        self.collection = Collection.objects.create(user=self.owner, name='Trip')
+        self.collection.locations.add(self.location)
+        ContentImage.objects.create(
+            user=self.owner,
+            content_type=ContentType.objects.get_for_model(Location),
+            object_id=str(self.location.id),
+            immich_id='asset-1',
+        )
+
+    def _access(self, user, asset='asset-1'):
+        from integrations.immich_access import compute_asset_access
+
+        return compute_asset_access(self.owner.id, asset, user)
+
+    def test_owner_is_allowed_without_queries(self):
+        from integrations.immich_access import ALLOW
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._access(self.owner), ALLOW)
+
+    def test_private_location_is_forbidden_to_others(self):
+        from integrations.immich_access import FORBIDDEN
+
+        self.assertEqual(self._access(self.stranger), FORBIDDEN)
+        self.assertEqual(self._access(self.anonymous), FORBIDDEN)
+
+    def test_shared_collection_member_is_allowed(self):
+        from integrations.immich_access import ALLOW, FORBIDDEN
+
+        self.collection.shared_with.add(self.friend)
+        self.assertEqual(self._access(self.friend), ALLOW)
+        self.assertEqual(self._access(self.stranger), FORBIDDEN)
+
+    def test_public_collection_or_location_allows_everyone(self):
+        from integrations.immich_access import ALLOW
+
+        self.collection.is_public = True
+        self.collection.save()
+        self.assertEqual(self._access(self.anonymous), ALLOW)
+
+        self.collection.is_public = False
+        self.collection.save()
+        self.location.is_public = True
+        self.location.save()
+        self.assertEqual(self._access(self.anonymous), ALLOW)
+
+    def test_unlinked_asset(self):
+        from integrations.immich_access import NOT_LINKED
+
+        self.assertEqual(self._access(self.stranger, asset='asset-unknown'), NOT_LINKED)
+
+    def test_access_is_a_single_query(self):
+        self.collection.shared_with.add(self.friend)
+        self._access(self.stranger)  # warms the ContentType cache
+        with self.assertNumQueries(1):
+            self._access(self.friend)
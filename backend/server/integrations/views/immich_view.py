@@ -8,16 +8,20 @@ from integrations.models import ImmichIntegration
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 import requests
-from adventures.models import ContentImage
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from integrations.utils import StandardResultsSetPagination
+from integrations.immich_cache import CHUNK_SIZE as IMMICH_CHUNK_SIZE, ThumbnailUnavailable, get_thumbnail_cache
+from integrations.immich_access import ALLOW, NOT_LINKED, get_asset_access
+from adventures.utils.conditional import etag_matches
 import logging
 
 logger = logging.getLogger(__name__)
 
 IMMICH_SEARCH_SIZE = 1000
 IMMICH_SEARCH_VISIBILITY = 'timeline'
+IMMICH_THUMBNAIL_SIZES = ('thumbnail', 'preview')
+IMMICH_THUMBNAIL_CACHE_CONTROL = 'public, max-age=86400, stale-while-revalidate=3600'
 
 class ImmichIntegrationView(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
@@ -290,12 +294,13 @@ class ImmichIntegrationView(viewsets.ViewSet):
     def get_by_integration(self, request, integration_id=None, imageid=None):
         """
         GET an Immich image using the integration and asset ID.
-        Access levels (in order of priority):
-        1. Public locations: accessible by anyone
+        Access levels (best level across every item the asset is attached to):
+        1. Public locations, lodging, notes and transportation: accessible by anyone
         2. Private locations in public collections: accessible by anyone
-        3. Private locations in private collections shared with user: accessible by shared users, and the collection owner
-        4. Private locations: accessible only to the owner
+        3. Private locations in collections shared with user: accessible by shared users, and the collection owner
+        4. Otherwise: accessible only to the owner
         5. No ContentImage: owner can still view via integration
+        See integrations.immich_access.
         """
         if not imageid or not integration_id:
             return Response({
@@ -304,125 +309,42 @@ class ImmichIntegrationView(viewsets.ViewSet):
                 'code': 'immich.missing_params'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Lookup integration and user
         integration = get_object_or_404(ImmichIntegration, id=integration_id)
-        owner_id = integration.user
 
-        # Get all images for this immich_id and user
-        image_entries = list(
-            ContentImage.objects
-            .filter(immich_id=imageid, user=owner_id)
-            .select_related('content_type')
-        )
+        access = get_asset_access(integration, imageid, request.user)
+        if access == NOT_LINKED:
+            # No ContentImage exists; only the integration owner may view it
+            return Response({
+                'message': 'Image is not linked to any location and you are not the owner.',
+                'error': True,
+                'code': 'immich.not_found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        if access != ALLOW:
+            return Response({
+                'message': 'This image belongs to a private location and you are not authorized.',
+                'error': True,
+                'code': 'immich.permission_denied'
+            }, status=status.HTTP_403_FORBIDDEN)
 
-        # Sort by access level priority and find the best match
-        def get_access_priority(image_entry):
-            """Return priority score for access control (lower = higher priority)"""
-            content_obj = image_entry.content_object
-            
-            # Only handle Location objects for now (can be extended for other types)
-            if not hasattr(content_obj, 'is_public'):
-                return 999  # Low priority for non-location objects
-            
-            # For Location objects, check access levels
-            if content_obj.is_public:
-                return 0  # Highest priority - public location
-            
-            # Check if location is in any public collection
-            if hasattr(content_obj, 'collections'):
-                collections = content_obj.collections.all()
-                if any(collection.is_public for collection in collections):
-                    return 1  # Second priority - private location in public collection
-                    
-                # Check for shared collections (if user is authenticated)
-                if (request.user.is_authenticated and 
-                    any(collection.shared_with.filter(id=request.user.id).exists() 
-                        for collection in collections)):
-                    return 2  # Third priority - shared collection access
-            
-            return 3  # Lowest priority - private location, owner access only
+        size = request.query_params.get('size', 'preview')
+        if size not in IMMICH_THUMBNAIL_SIZES:
+            size = 'preview'
 
-        # Sort image entries by access priority
-        image_entries.sort(key=get_access_priority)
-        image_entry = image_entries[0] if image_entries else None
+        try:
+            return self._thumbnail_response(request, integration, imageid, size)
 
-        # Access control
-        if image_entry:
-            content_obj = image_entry.content_object
-            
-            # Only apply access control to Location objects
-            if hasattr(content_obj, 'is_public'):
-                location = content_obj
-                
-                # Determine access level
-                is_authorized = False
-
-                # Level 1: Public location (highest priority)
-                if location.is_public:
-                    is_authorized = True
-
-                # Level 2: Private location in any public collection
-                elif hasattr(location, 'collections'):
-                    collections = location.collections.all()
-                    if any(collection.is_public for collection in collections):
-                        is_authorized = True
-                    
-                    # Level 3: Owner access
-                    elif request.user.is_authenticated and request.user == owner_id:
-                        is_authorized = True
-                        
-                    # Level 4: Shared collection access or collection owner access
-                    elif (request.user.is_authenticated and 
-                        (any(collection.shared_with.filter(id=request.user.id).exists() 
-                            for collection in collections) or
-                         any(collection.user == request.user for collection in collections))):
-                        is_authorized = True
-                else:
-                    # Location without collections - owner access only
-                    if request.user.is_authenticated and request.user == owner_id:
-                        is_authorized = True
-                
-                if not is_authorized:
-                    return Response({
-                        'message': 'This image belongs to a private location and you are not authorized.',
-                        'error': True,
-                        'code': 'immich.permission_denied'
-                    }, status=status.HTTP_403_FORBIDDEN)
-            else:
-                # For non-Location objects, allow only owner access for now
-                if not request.user.is_authenticated or request.user != owner_id:
-                    return Response({
-                        'message': 'This image is not publicly accessible and you are not the owner.',
-                        'error': True,
-                        'code': 'immich.permission_denied'
-                    }, status=status.HTTP_403_FORBIDDEN)
-        else:
-            # No ContentImage exists; allow only the integration owner
-            if not request.user.is_authenticated or request.user != owner_id:
+        except ThumbnailUnavailable as exc:
+            if exc.status_code == status.HTTP_404_NOT_FOUND:
                 return Response({
-                    'message': 'Image is not linked to any location and you are not the owner.',
+                    'message': 'Image not found on the Immich server.',
                     'error': True,
                     'code': 'immich.not_found'
                 }, status=status.HTTP_404_NOT_FOUND)
-
-        # Fetch from Immich
-        try:
-            immich_response = requests.get(
-                f'{integration.server_url}/assets/{imageid}/thumbnail?size=preview',
-                headers={'x-api-key': integration.api_key},
-                timeout=5
-            )
-            content_type = immich_response.headers.get('Content-Type', 'image/jpeg')
-            if not content_type.startswith('image/'):
-                return Response({
-                    'message': 'Invalid content type returned from Immich.',
-                    'error': True,
-                    'code': 'immich.invalid_content'
-                }, status=status.HTTP_502_BAD_GATEWAY)
-
-            response = HttpResponse(immich_response.content, content_type=content_type, status=200)
-            response['Cache-Control'] = 'public, max-age=86400, stale-while-revalidate=3600'
-            return response
+            return Response({
+                'message': 'Invalid content type returned from Immich.',
+                'error': True,
+                'code': 'immich.invalid_content'
+            }, status=status.HTTP_502_BAD_GATEWAY)
 
         except requests.exceptions.ConnectionError:
             return Response({
@@ -438,6 +360,69 @@ class ImmichIntegrationView(viewsets.ViewSet):
                 'code': 'immich.timeout'
             }, status=status.HTTP_504_GATEWAY_TIMEOUT)
 
+        except requests.exceptions.RequestException:
+            logger.warning("Immich thumbnail request failed", exc_info=True)
+            return Response({
+                'message': 'The Immich server returned an invalid response.',
+                'error': True,
+                'code': 'immich.invalid_content'
+            }, status=status.HTTP_502_BAD_GATEWAY)
+
+    def _open_thumbnail_stream(self, integration, imageid, size):
+        """Start streaming a thumbnail from Immich; raises ThumbnailUnavailable for non-image replies."""
+        immich_response = requests.get(
+            f'{integration.server_url}/assets/{imageid}/thumbnail?size={size}',
+            headers={'x-api-key': integration.api_key},
+            timeout=5,
+            stream=True,
+        )
+        content_type = immich_response.headers.get('Content-Type', 'image/jpeg')
+        if immich_response.status_code != 200 or not content_type.startswith('image/'):
+            immich_response.close()
+            raise ThumbnailUnavailable(immich_response.status_code)
+        return content_type, immich_response.headers.get('ETag'), immich_response.iter_content(IMMICH_CHUNK_SIZE)
+
+    @staticmethod
+    def _relay_chunks(chunks):
+        """
+        Yield upstream chunks, ending the response early if Immich drops the
+        connection; the status line has already been sent by then.
+        """
+        try:
+            yield from chunks
+        except requests.exceptions.RequestException:
+            logger.warning("Immich thumbnail stream ended early", exc_info=True)
+
+    def _thumbnail_response(self, request, integration, imageid, size):
+        thumbnail_cache = get_thumbnail_cache()
+        if not thumbnail_cache.enabled:
+            content_type, _, chunks = self._open_thumbnail_stream(integration, imageid, size)
+            response = StreamingHttpResponse(self._relay_chunks(chunks), content_type=content_type, status=200)
+            response['Cache-Control'] = IMMICH_THUMBNAIL_CACHE_CONTROL
+            return response
+
+        key = thumbnail_cache.build_key(integration.id, imageid, size)
+
+        def loader():
+            return self._open_thumbnail_stream(integration, imageid, size)
+
+        entry = thumbnail_cache.get_or_fetch(key, loader)
+
+        if etag_matches(request, entry.etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            try:
+                handle = entry.open()
+            except FileNotFoundError:
+                # Evicted between lookup and open; fetch it once more.
+                entry = thumbnail_cache.get_or_fetch(key, loader)
+                handle = entry.open()
+            response = FileResponse(handle, content_type=entry.content_type, status=200)
+        response['ETag'] = entry.etag
+        response['Cache-Control'] = IMMICH_THUMBNAIL_CACHE_CONTROL
+        return response
+
+
 class ImmichIntegrationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = ImmichIntegrationSerializer
@@ -38,6 +38,9 @@ DEBUG = getenv('DEBUG', 'true').lower() == 'true'
 # ---------------------------------------------------------------------------
 CLOUD_MODE = getenv('CLOUD_MODE', 'false').lower() == 'true'
 CLOUD_TRIAL_DAYS = int(getenv('CLOUD_TRIAL_DAYS', '30'))
+# Seconds CloudAccessMiddleware caches a user's subscription status. Trial
+# entries expire at the trial end and subscription saves invalidate them. 0 disables.
+CLOUD_ENTITLEMENT_CACHE_TIMEOUT = int(getenv('CLOUD_ENTITLEMENT_CACHE_TIMEOUT', '300'))
 STRIPE_SECRET_KEY = getenv('STRIPE_SECRET_KEY', '')
 STRIPE_WEBHOOK_SECRET = getenv('STRIPE_WEBHOOK_SECRET', '')
 STRIPE_PRICE_ID = getenv('STRIPE_PRICE_ID', '')
@@ -83,6 +86,7 @@ INSTALLED_APPS = (
     'cloud.apps.CloudConfig',
     'integrations',
     'django.contrib.gis',
+    'django.contrib.postgres',
     # 'achievements', # Not done yet, will be added later in a future update
     'widget_tweaks',
     'slippers',
@@ -221,6 +225,29 @@ MEDIA_STORAGE_LIMIT_MB = int(getenv('MEDIA_STORAGE_LIMIT_MB', '0') or 0)
 if MEDIA_STORAGE_LIMIT_BYTES <= 0 and MEDIA_STORAGE_LIMIT_MB > 0:
     MEDIA_STORAGE_LIMIT_BYTES = MEDIA_STORAGE_LIMIT_MB * 1024 * 1024
 
+# Protected media (/media/images/, attachments/, activities/) access decisions
+# are cached per (path, user) and dropped when sharing or publicity changes.
+# MEDIA_PERMISSION_CACHE_TIMEOUT=0 checks every request against the database.
+MEDIA_PERMISSION_CACHE_TIMEOUT = int(getenv('MEDIA_PERMISSION_CACHE_TIMEOUT', '60'))
+# Browser cache lifetime (Cache-Control: private, max-age) for protected media.
+PROTECTED_MEDIA_MAX_AGE = int(getenv('PROTECTED_MEDIA_MAX_AGE', '3600'))
+
+# Widths (px) of the downscaled copies rendered for each uploaded image and
+# exposed as ``variants`` for srcset. An empty value disables them.
+IMAGE_VARIANT_WIDTHS = [int(width) for width in getenv('IMAGE_VARIANT_WIDTHS', '160,480,1280').split(',') if width.strip()]
+# Variants are rendered off the request by an in-process thread pool (set to 0
+# to disable) and/or `manage.py backfill_image_variants`.
+IMAGE_VARIANT_WORKERS = int(getenv('IMAGE_VARIANT_WORKERS', '1'))
+
+# Immich thumbnails proxied through the server are cached on disk.
+# IMMICH_THUMBNAIL_CACHE_MAX_MB=0 disables the cache (thumbnails are streamed).
+IMMICH_THUMBNAIL_CACHE_DIR = getenv('IMMICH_THUMBNAIL_CACHE_DIR', str(BASE_DIR / 'cache' / 'immich'))
+IMMICH_THUMBNAIL_CACHE_MAX_MB = int(getenv('IMMICH_THUMBNAIL_CACHE_MAX_MB', '512'))
+IMMICH_THUMBNAIL_CACHE_POLICY = getenv('IMMICH_THUMBNAIL_CACHE_POLICY', 'lru').lower()  # lru | fifo
+IMMICH_THUMBNAIL_CACHE_TTL = int(getenv('IMMICH_THUMBNAIL_CACHE_TTL', str(60 * 60 * 24 * 7)))
+# Per-viewer access decisions for proxied Immich assets.
+IMMICH_ACCESS_CACHE_TIMEOUT = int(getenv('IMMICH_ACCESS_CACHE_TIMEOUT', '60'))
+
 MEDIA_STORAGE = getenv('MEDIA_STORAGE', 'local').lower()
 USE_S3_MEDIA = MEDIA_STORAGE == 's3'
 
@@ -321,6 +348,13 @@ SOCIALACCOUNT_EMAIL_AUTHENTICATION = True
 SOCIALACCOUNT_EMAIL_AUTHENTICATION_AUTO_CONNECT = True  # Auto-link by email
 SOCIALACCOUNT_AUTO_SIGNUP = True  # Allow auto-signup post adapter checks
 
+# Verified API keys are cached under a keyed digest so repeat requests skip the
+# PBKDF2 derivation; revoking a key drops its entries. last_used_at is written at
+# most once per API_KEY_LAST_USED_INTERVAL seconds per key, in batches.
+API_KEY_CACHE_TIMEOUT = int(getenv('API_KEY_CACHE_TIMEOUT', '3600'))
+API_KEY_LOCAL_CACHE_SIZE = int(getenv('API_KEY_LOCAL_CACHE_SIZE', '1024'))
+API_KEY_LAST_USED_INTERVAL = int(getenv('API_KEY_LAST_USED_INTERVAL', '60'))
+
 # Enable or disable app-level rate limiting/throttling globally.
 # Defaults to disabled for local/dev convenience.
 ENABLE_RATE_LIMITS = getenv('ENABLE_RATE_LIMITS', 'false').lower() == 'true'
@@ -343,6 +377,59 @@ WIKIPEDIA_DESC_CACHE_TIMEOUT = int(getenv('WIKIPEDIA_DESC_CACHE_TIMEOUT', str(60
 WIKIPEDIA_SUMMARY_CACHE_TIMEOUT = int(getenv('WIKIPEDIA_SUMMARY_CACHE_TIMEOUT', str(60 * 60 * 24 * 7)))
 EXTERNAL_API_CACHE_TIMEOUT = int(getenv('EXTERNAL_API_CACHE_TIMEOUT', str(60 * 60 * 24)))
 
+# Reverse-geocode results are cached per provider in a geohash cell of this many
+# characters (8 ≈ 38m x 19m). TTL in seconds; 0 keeps entries until purged.
+REVERSE_GEOCODE_CACHE_ENABLED = getenv('REVERSE_GEOCODE_CACHE_ENABLED', 'true').lower() == 'true'
+REVERSE_GEOCODE_CACHE_PRECISION = int(getenv('REVERSE_GEOCODE_CACHE_PRECISION', '8'))
+REVERSE_GEOCODE_CACHE_TTL = int(getenv('REVERSE_GEOCODE_CACHE_TTL', str(60 * 60 * 24 * 90)))
+
+# ---------------------------------------------------------------------------
+# Geocoding Queue
+# ---------------------------------------------------------------------------
+# Location saves enqueue a reverse-geocode job. Jobs are drained by a fixed-size
+# in-process thread pool (set to 0 to disable) and/or `manage.py geocode_worker`.
+GEOCODE_QUEUE_WORKERS = int(getenv('GEOCODE_QUEUE_WORKERS', '2'))
+GEOCODE_QUEUE_BATCH_SIZE = int(getenv('GEOCODE_QUEUE_BATCH_SIZE', '10'))
+GEOCODE_QUEUE_MAX_ATTEMPTS = int(getenv('GEOCODE_QUEUE_MAX_ATTEMPTS', '5'))
+GEOCODE_QUEUE_RETRY_BASE_SECONDS = int(getenv('GEOCODE_QUEUE_RETRY_BASE_SECONDS', '30'))
+GEOCODE_QUEUE_RETRY_MAX_SECONDS = int(getenv('GEOCODE_QUEUE_RETRY_MAX_SECONDS', str(60 * 60)))
+GEOCODE_QUEUE_STALE_SECONDS = int(getenv('GEOCODE_QUEUE_STALE_SECONDS', '600'))
+GEOCODE_QUEUE_RETENTION_DAYS = int(getenv('GEOCODE_QUEUE_RETENTION_DAYS', '7'))
+
+# ---------------------------------------------------------------------------
+# Map pins
+# ---------------------------------------------------------------------------
+# Zoom levels below MAP_CLUSTER_MAX_ZOOM get server-side cluster centroids.
+MAP_CLUSTER_MAX_ZOOM = int(getenv('MAP_CLUSTER_MAX_ZOOM', '10'))
+MAP_CLUSTER_RADIUS_PX = int(getenv('MAP_CLUSTER_RADIUS_PX', '60'))
+
+# ---------------------------------------------------------------------------
+# Dashboard
+# ---------------------------------------------------------------------------
+# Cached dashboards are keyed by a per-user data version that model signals
+# bump, so the timeout only bounds memory use, not staleness. 0 disables.
+DASHBOARD_CACHE_TIMEOUT = int(getenv('DASHBOARD_CACHE_TIMEOUT', '3600'))
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+# Typeahead suggestions are cached per user and prefix under the same data
+# version as dashboards; the timeout only bounds memory use. 0 disables.
+SEARCH_SUGGEST_CACHE_TIMEOUT = int(getenv('SEARCH_SUGGEST_CACHE_TIMEOUT', '600'))
+
+# ---------------------------------------------------------------------------
+# Backups
+# ---------------------------------------------------------------------------
+# Concurrent media downloads while exporting a backup from S3 storage.
+BACKUP_EXPORT_READ_WORKERS = int(getenv('BACKUP_EXPORT_READ_WORKERS', '4'))
+# Background backup jobs run in an in-process thread pool (set to 0 to disable)
+# and/or `manage.py backup_worker`. Finished jobs and their files are kept for
+# BACKUP_JOB_RETENTION_DAYS.
+BACKUP_JOB_WORKERS = int(getenv('BACKUP_JOB_WORKERS', '1'))
+BACKUP_JOB_STALE_SECONDS = int(getenv('BACKUP_JOB_STALE_SECONDS', '1800'))
+BACKUP_JOB_MAX_ATTEMPTS = int(getenv('BACKUP_JOB_MAX_ATTEMPTS', '3'))
+BACKUP_JOB_RETENTION_DAYS = int(getenv('BACKUP_JOB_RETENTION_DAYS', '7'))
+
 FORCE_SOCIALACCOUNT_LOGIN = getenv('FORCE_SOCIALACCOUNT_LOGIN', 'false').lower() == 'true' # When true, only social login is allowed (no password login) and the login page will show only social providers or redirect directly to the first provider if only one is configured.
 
 if getenv('EMAIL_BACKEND', 'console') == 'console':
@@ -469,6 +556,11 @@ ADVENTURELOG_RELEASE_VERSION = 'v0.13.0'
 # https://github.com/dr5hn/countries-states-cities-database/tags
 COUNTRY_REGION_JSON_VERSION = 'v3.1'
 
+# Optional local boundary files (GeoJSON or shapefile, e.g. Natural Earth admin-1)
+# imported by `download-countries` for offline region/country lookups.
+WORLD_REGION_BOUNDARIES_PATH = getenv('WORLD_REGION_BOUNDARIES_PATH', '')
+WORLD_COUNTRY_BOUNDARIES_PATH = getenv('WORLD_COUNTRY_BOUNDARIES_PATH', '')
+
 # External service keys (do not hardcode secrets)
 GOOGLE_MAPS_API_KEY = getenv('GOOGLE_MAPS_API_KEY', '')
 STRAVA_CLIENT_ID = getenv('STRAVA_CLIENT_ID', '')
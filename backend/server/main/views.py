@@ -1,12 +1,15 @@
+import hashlib
 from django.http import JsonResponse
 from django.middleware.csrf import get_token
 from os import getenv
 from django.conf import settings
 from django.http import HttpResponse, HttpResponseForbidden, HttpResponseRedirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.views.static import serve
 from django.core.files.storage import default_storage
 from adventures.utils.file_permissions import (
-    checkFilePermission,
+    cachedFilePermission,
     is_public_media_path,
     is_protected_media_path,
     normalize_media_request_path,
@@ -80,7 +83,20 @@ def serve_protected_media(request, path):
     media_type = path_parts[0] + '/'
     file_id = path_parts[1]
 
-    if checkFilePermission(file_id, user, media_type):
-        return _serve_media_file(request, normalized_path)
+    if not cachedFilePermission(file_id, user, media_type):
+        return HttpResponseForbidden()
 
-    return HttpResponseForbidden()
\ No newline at end of file
+    if settings.USE_S3_MEDIA:
+        # Signed storage URLs expire, so the redirect itself isn't cached.
+        return _redirect_storage(normalized_path)
+
+    # Protected uploads get a fresh UUID name (PathAndRename), so a path
+    # always refers to the same bytes and can serve as its own validator.
+    etag = quote_etag(hashlib.sha256(normalized_path.encode('utf-8')).hexdigest()[:32])
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = _serve_media_file(request, normalized_path)
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, max_age=settings.PROTECTED_MEDIA_MAX_AGE)
+    return response
\ No newline at end of file
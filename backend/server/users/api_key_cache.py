@@ -0,0 +1,184 @@
+"""
+Caching for API key authentication.
+
+Verifying a raw key means a PBKDF2 derivation (``APIKey._KEY_HASH_ITERATIONS``
+rounds), which is deliberately slow. Keys that verified once are remembered
+under a fast HMAC digest of the raw key:
+
+* the shared cache maps ``digest -> (key id, key hash)`` so every process can
+  skip the derivation; a reverse ``key id -> digest`` entry lets revocation
+  delete it, because the digest can't be derived from the stored hash;
+* a bounded in-process LRU keeps only the resolved ``(key id, user id)``, so a
+  hit loads the key and its user by primary key in one query. Model instances
+  are never shared between requests, and user changes (deactivation,
+  permissions) apply to the next request; saving a user also drops their
+  entries.
+
+The shared entry is read on every request, even on a local hit, so deleting a
+key takes effect in all processes immediately.
+
+``last_used_at`` is written at most once per ``API_KEY_LAST_USED_INTERVAL``
+seconds per key, and pending writes are flushed together in one query.
+"""
+import atexit
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+DIGEST_PREFIX = 'api_key_digest_v1'
+KEY_ID_PREFIX = 'api_key_id_v1'
+LOCAL_TTL_SECONDS = 60
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def key_digest(raw_key: str) -> str:
+    secret = f'users.APIKey.cache:{settings.SECRET_KEY}'.encode('utf-8')
+    return hmac.new(secret, raw_key.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def _digest_key(digest: str) -> str:
+    return f'{DIGEST_PREFIX}:{digest}'
+
+
+def _key_id_key(api_key_id) -> str:
+    return f'{KEY_ID_PREFIX}:{api_key_id}'
+
+
+class _LocalKeyCache:
+    """Thread-safe LRU of ``digest -> (key id, user id, expires_at)``."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            key_id, user_id, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return key_id, user_id
+
+    def set(self, digest, api_key):
+        size = _setting('API_KEY_LOCAL_CACHE_SIZE', 1024)
+        if size <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (str(api_key.pk), api_key.user_id, time.monotonic() + LOCAL_TTL_SECONDS)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def discard(self, digest):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for digest in [digest for digest, entry in self._entries.items() if entry[1] == user_id]:
+                del self._entries[digest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_keys = _LocalKeyCache()
+
+
+def get_verified(digest: str):
+    """The ``{'id', 'key_hash'}`` entry recorded for ``digest``, or None."""
+    return cache.get(_digest_key(digest))
+
+
+def remember_verified(digest: str, api_key) -> None:
+    timeout = _setting('API_KEY_CACHE_TIMEOUT', 3600)
+    if timeout > 0:
+        cache.set_many(
+            {
+                _digest_key(digest): {'id': str(api_key.pk), 'key_hash': api_key.key_hash},
+                _key_id_key(api_key.pk): digest,
+            },
+            timeout,
+        )
+    local_keys.set(digest, api_key)
+
+
+def forget_key(api_key_id) -> None:
+    """Drop cached verifications of a key (called when it is deleted)."""
+    digest = cache.get(_key_id_key(api_key_id))
+    if digest:
+        cache.delete_many([_digest_key(digest), _key_id_key(api_key_id)])
+        local_keys.discard(digest)
+
+
+def forget_user(user_id) -> None:
+    """Drop this process's resolved keys of a user (called when the user is saved)."""
+    local_keys.discard_user(user_id)
+
+
+class _LastUsedBuffer:
+    """Collects ``last_used_at`` timestamps and writes them in batches."""
+
+    def __init__(self):
+        self._pending = {}
+        self._last_flush = float('-inf')
+        self._lock = threading.Lock()
+
+    def record(self, api_key) -> None:
+        interval = _setting('API_KEY_LAST_USED_INTERVAL', 60)
+        now = timezone.now()
+        if api_key.last_used_at and (now - api_key.last_used_at).total_seconds() < interval:
+            return
+        api_key.last_used_at = now
+        with self._lock:
+            self._pending[api_key.pk] = now
+            if time.monotonic() - self._last_flush < interval:
+                return
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        self._write(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        self._write(pending)
+
+    @staticmethod
+    def _write(pending) -> None:
+        if not pending:
+            return
+        from users.models import APIKey
+
+        # Keys deleted in the meantime simply match no row.
+        APIKey.objects.bulk_update(
+            [APIKey(pk=pk, last_used_at=used_at) for pk, used_at in pending.items()],
+            ['last_used_at'],
+        )
+
+
+last_used = _LastUsedBuffer()
+
+
+def _flush_at_exit():
+    try:
+        last_used.flush()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_at_exit)
@@ -15,20 +15,40 @@ for token-based API access.
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+_NOT_RESOLVED = object()
+
+
+def authenticate_request_api_key(request, raw_key: str):
+    """
+    Resolve ``raw_key`` once per request.
+
+    Middleware (``CloudAccessMiddleware``) and DRF both authenticate API-key
+    requests; the result is kept on the underlying ``HttpRequest`` so the
+    second caller reuses it.
+    """
+    http_request = getattr(request, '_request', request)
+    cached_key, api_key = getattr(http_request, '_api_key_auth', (None, _NOT_RESOLVED))
+    if api_key is not _NOT_RESOLVED and cached_key == raw_key:
+        return api_key
+
+    from .models import APIKey
+
+    api_key = APIKey.authenticate(raw_key)
+    http_request._api_key_auth = (raw_key, api_key)
+    return api_key
+
 
 class APIKeyAuthentication(BaseAuthentication):
     """Authenticate a request using an AdventureLog API key."""
 
     def authenticate(self, request):
-        raw_key = self._extract_key(request)
+        raw_key = self.extract_key(request)
         if raw_key is None:
             # Signal to DRF that this scheme was not attempted so other
             # authenticators can still run.
             return None
 
-        from .models import APIKey
-
-        api_key = APIKey.authenticate(raw_key)
+        api_key = authenticate_request_api_key(request, raw_key)
         if api_key is None:
             raise AuthenticationFailed("Invalid or expired API key.")
 
@@ -38,7 +58,7 @@ class APIKeyAuthentication(BaseAuthentication):
         return "Api-Key"
 
     @staticmethod
-    def _extract_key(request) -> str | None:
+    def extract_key(request) -> str | None:
         # Prefer X-API-Key header for simplicity.
         key = request.META.get("HTTP_X_API_KEY")
         if key:
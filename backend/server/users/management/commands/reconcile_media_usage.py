@@ -0,0 +1,72 @@
+"""
+Rebuild per-user media usage ledgers from stored file sizes.
+
+Quota checks read the ``MediaUsage`` ledger, which is adjusted as files are
+uploaded, replaced and deleted. This command recomputes each ledger from the
+per-file size columns, stat-ing files whose size was never recorded (or every
+file with ``--restat``), and reports users whose totals had drifted.
+
+Usage:
+    python manage.py reconcile_media_usage
+    python manage.py reconcile_media_usage --user-id 123
+    python manage.py reconcile_media_usage --restat
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users.media_usage import reconcile_media_usage
+from users.models import MediaUsage
+
+User = get_user_model()
+
+
+def _snapshot(usage):
+    if usage is None:
+        return None
+    return {
+        field: getattr(usage, field)
+        for kind in MediaUsage.KINDS
+        for field in (f'{kind}_bytes', f'{kind}_files')
+    }
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user media usage ledgers from stored file sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            help='Reconcile a specific user ID only',
+        )
+        parser.add_argument(
+            '--restat',
+            action='store_true',
+            help='Re-read every file size from storage instead of trusting recorded sizes',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options.get('user_id'):
+            users = users.filter(pk=options['user_id'])
+            if not users.exists():
+                raise CommandError(f"User with ID {options['user_id']} not found")
+
+        reconciled = drifted = 0
+        for user in users.iterator():
+            before = _snapshot(MediaUsage.objects.filter(user_id=user.pk).first())
+            after = _snapshot(reconcile_media_usage(user, restat=options['restat']))
+            reconciled += 1
+            if before is not None and before != after:
+                drifted += 1
+                changes = ', '.join(
+                    f'{field} {before[field]} -> {after[field]}'
+                    for field in after
+                    if before[field] != after[field]
+                )
+                self.stdout.write(self.style.WARNING(f'{user.username}: {changes}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled {reconciled} user(s); {drifted} had drifted'
+        ))
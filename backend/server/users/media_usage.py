@@ -0,0 +1,171 @@
+"""
+Per-user media usage ledger.
+
+Every tracked file column has a sibling size column holding the stored size
+of the file, and ``MediaUsage`` keeps one row of running totals per user:
+
+* ``pre_save`` notes the previous size when a new file is assigned or the
+  file is cleared; ``post_save`` stats the stored file once, records its size
+  and applies the difference to the ledger;
+* ``post_delete`` subtracts the recorded size, including cascaded deletes.
+
+Ledger writes are single ``UPDATE ... SET x = x + delta`` statements, so they
+join the caller's transaction and never lose concurrent updates. A user has
+no ledger row until their usage is first read; that read (and the
+``reconcile_media_usage`` command) rebuilds the row from the size columns,
+stat-ing only files whose size was never recorded.
+"""
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import MediaUsage
+
+PENDING_ATTR = '_media_usage_pending'
+
+
+def tracked_files():
+    """``(kind, model, file field, size field, owner field)`` for each tracked file."""
+    from adventures.models import Activity, ContentAttachment, ContentImage
+
+    return (
+        ('images', ContentImage, 'image', 'file_size', 'user_id'),
+        ('attachments', ContentAttachment, 'file', 'file_size', 'user_id'),
+        ('gpx', Activity, 'gpx_file', 'gpx_file_size', 'user_id'),
+        ('profile_pics', get_user_model(), 'profile_pic', 'profile_pic_size', 'pk'),
+    )
+
+
+def _tracked_for(model):
+    for entry in tracked_files():
+        if entry[1] is model:
+            return entry
+    return None
+
+
+def stored_size(name) -> int:
+    if not name:
+        return 0
+    try:
+        return default_storage.size(name)
+    except (OSError, ValueError, NotImplementedError):
+        return 0
+
+
+def record_change(user_id, kind, bytes_delta, files_delta) -> None:
+    if not user_id or (not bytes_delta and not files_delta):
+        return
+    MediaUsage.objects.filter(user_id=user_id).update(
+        **{
+            f'{kind}_bytes': F(f'{kind}_bytes') + bytes_delta,
+            f'{kind}_files': F(f'{kind}_files') + files_delta,
+            'updated_at': timezone.now(),
+        }
+    )
+
+
+def note_pending_change(sender, instance, raw=False, **kwargs):
+    """``pre_save``: remember the old size if the file is being replaced or cleared."""
+    tracked = _tracked_for(sender)
+    if raw or tracked is None:
+        return
+    _, _, file_field, size_field, _ = tracked
+    field_file = getattr(instance, file_field)
+    old_size = getattr(instance, size_field)
+    if field_file:
+        # New uploads aren't written to storage yet; a stored file without a
+        # recorded size was saved through ``FieldFile.save`` or predates the
+        # ledger.
+        if getattr(field_file, '_committed', True) and old_size is not None:
+            return
+    elif old_size is None:
+        return
+    setattr(instance, PENDING_ATTR, old_size)
+
+
+def apply_pending_change(sender, instance, raw=False, **kwargs):
+    """``post_save``: record the new size and move the ledger by the difference."""
+    if not hasattr(instance, PENDING_ATTR):
+        return
+    old_size = getattr(instance, PENDING_ATTR)
+    delattr(instance, PENDING_ATTR)
+    kind, model, file_field, size_field, owner_field = _tracked_for(sender)
+
+    field_file = getattr(instance, file_field)
+    new_size = stored_size(field_file.name) if field_file else None
+    model.objects.filter(pk=instance.pk).update(**{size_field: new_size})
+    setattr(instance, size_field, new_size)
+
+    record_change(
+        getattr(instance, owner_field),
+        kind,
+        (new_size or 0) - (old_size or 0),
+        (new_size is not None) - (old_size is not None),
+    )
+
+
+def release_deleted(sender, instance, **kwargs):
+    """``post_delete``: give the deleted file's bytes back."""
+    tracked = _tracked_for(sender)
+    if tracked is None:
+        return
+    kind, _, _, size_field, owner_field = tracked
+    size = getattr(instance, size_field)
+    if size is not None:
+        record_change(getattr(instance, owner_field), kind, -size, -1)
+
+
+def reconcile_media_usage(user, restat=False) -> MediaUsage:
+    """
+    Rebuild ``user``'s ledger row from the per-file size columns.
+
+    Files without a recorded size are stat-ed once and the result stored;
+    ``restat`` re-reads every file, for storage that changed behind the app.
+    """
+    totals = {}
+    with transaction.atomic():
+        for kind, model, file_field, size_field, owner_field in tracked_files():
+            rows = model.objects.filter(**{owner_field: user.pk}).exclude(
+                Q(**{f'{file_field}__isnull': True}) | Q(**{file_field: ''})
+            )
+            stale = rows if restat else rows.filter(**{f'{size_field}__isnull': True})
+            updates = []
+            for obj in stale.only('pk', file_field):
+                setattr(obj, size_field, stored_size(getattr(obj, file_field).name))
+                updates.append(obj)
+            if updates:
+                model.objects.bulk_update(updates, [size_field], batch_size=500)
+
+            aggregate = rows.aggregate(size=Coalesce(Sum(size_field), 0), files=Count('pk'))
+            totals[f'{kind}_bytes'] = aggregate['size']
+            totals[f'{kind}_files'] = aggregate['files']
+
+        usage, _ = MediaUsage.objects.update_or_create(
+            user_id=user.pk,
+            defaults={**totals, 'reconciled_at': timezone.now()},
+        )
+    return usage
+
+
+def get_media_usage(user) -> MediaUsage:
+    """The user's ledger row, built on first access."""
+    usage = MediaUsage.objects.filter(user_id=user.pk).first()
+    if usage is None:
+        usage = reconcile_media_usage(user)
+    return usage
+
+
+def sizes_of(user, names) -> int:
+    """Recorded bytes of the user's files stored under ``names``."""
+    names = set(filter(None, names or []))
+    total = 0
+    if not names:
+        return total
+    for _, model, file_field, size_field, owner_field in tracked_files():
+        total += model.objects.filter(
+            **{owner_field: user.pk, f'{file_field}__in': names}
+        ).aggregate(size=Coalesce(Sum(size_field), 0))['size']
+    return total
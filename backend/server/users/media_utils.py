@@ -1,6 +1,6 @@
 from django.conf import settings
-from django.core.files.storage import default_storage
-from adventures.models import ContentAttachment, ContentImage
+
+from users.media_usage import get_media_usage, sizes_of
 
 
 def get_media_storage_limit_bytes():
@@ -20,54 +20,20 @@ def get_uploaded_file_size(file_obj):
     return size or 0
 
 
-def _sum_storage_sizes(names):
-    total = 0
-    for name in names:
-        if not name:
-            continue
-        try:
-            total += default_storage.size(name)
-        except (OSError, ValueError, FileNotFoundError):
-            continue
-    return total
-
-
 def get_user_media_usage(user, exclude_names=None):
-    exclude_names = set(filter(None, exclude_names or []))
-
-    image_names = set(
-        ContentImage.objects.filter(user=user)
-        .exclude(image__isnull=True)
-        .exclude(image='')
-        .values_list('image', flat=True)
-    )
-    attachment_names = set(
-        ContentAttachment.objects.filter(user=user)
-        .exclude(file__isnull=True)
-        .exclude(file='')
-        .values_list('file', flat=True)
-    )
-    profile_names = set()
-    if user.profile_pic and user.profile_pic.name:
-        profile_names.add(user.profile_pic.name)
-
-    image_names -= exclude_names
-    attachment_names -= exclude_names
-    profile_names -= exclude_names
-
-    images_bytes = _sum_storage_sizes(image_names)
-    attachments_bytes = _sum_storage_sizes(attachment_names)
-    profile_pics_bytes = _sum_storage_sizes(profile_names)
-
-    return {
-        "total_bytes": images_bytes + attachments_bytes + profile_pics_bytes,
-        "images_bytes": images_bytes,
-        "attachments_bytes": attachments_bytes,
-        "profile_pics_bytes": profile_pics_bytes,
-        "images_files": len(image_names),
-        "attachments_files": len(attachment_names),
-        "profile_pics_files": len(profile_names),
-    }
+    """
+    Stored bytes and file counts by kind, read from the ``MediaUsage`` ledger.
+
+    ``exclude_names`` leaves out files about to be replaced; they are only
+    subtracted from ``total_bytes``.
+    """
+    ledger = get_media_usage(user)
+    usage = {"total_bytes": ledger.total_bytes - sizes_of(user, exclude_names)}
+    for kind in ledger.KINDS:
+        usage[f"{kind}_bytes"] = getattr(ledger, f"{kind}_bytes")
+    for kind in ledger.KINDS:
+        usage[f"{kind}_files"] = getattr(ledger, f"{kind}_files")
+    return usage
 
 
 def enforce_media_storage_limit(user, incoming_bytes, exclude_names=None):
@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_alter_customuser_map_style'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='profile_pic_size',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='MediaUsage',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='media_usage', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('images_bytes', models.BigIntegerField(default=0)),
+                ('images_files', models.IntegerField(default=0)),
+                ('attachments_bytes', models.BigIntegerField(default=0)),
+                ('attachments_files', models.IntegerField(default=0)),
+                ('gpx_bytes', models.BigIntegerField(default=0)),
+                ('gpx_files', models.IntegerField(default=0)),
+                ('profile_pics_bytes', models.BigIntegerField(default=0)),
+                ('profile_pics_files', models.IntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
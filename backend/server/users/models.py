@@ -67,12 +67,47 @@ class CustomUser(AbstractUser):
     measurement_system = models.CharField(max_length=10, choices=[('metric', 'Metric'), ('imperial', 'Imperial')], default='metric')
     default_currency = models.CharField(max_length=5, choices=CURRENCY_CHOICES, default='USD')
     map_style = models.CharField(max_length=32, choices=BASEMAP_CHOICES, default='default')
+    profile_pic_size = models.BigIntegerField(null=True, blank=True, editable=False)
     
     
     def __str__(self):
         return self.username
 
 
+class MediaUsage(models.Model):
+    """
+    Running totals of the media a user stores, by kind.
+
+    Rows are adjusted with ``F()`` expressions whenever a tracked file is
+    uploaded, replaced or deleted (see ``users.media_usage``), so quota checks
+    read one row instead of stat-ing every file. ``reconcile_media_usage``
+    rebuilds a row from the per-file sizes if it ever drifts.
+    """
+
+    KINDS = ('images', 'attachments', 'gpx', 'profile_pics')
+
+    user = models.OneToOneField(
+        CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='media_usage'
+    )
+    images_bytes = models.BigIntegerField(default=0)
+    images_files = models.IntegerField(default=0)
+    attachments_bytes = models.BigIntegerField(default=0)
+    attachments_files = models.IntegerField(default=0)
+    gpx_bytes = models.BigIntegerField(default=0)
+    gpx_files = models.IntegerField(default=0)
+    profile_pics_bytes = models.BigIntegerField(default=0)
+    profile_pics_files = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} – {self.total_bytes} bytes"
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(getattr(self, f'{kind}_bytes') for kind in self.KINDS)
+
+
 class APIKey(models.Model):
     """
     Personal API keys for authenticating programmatic access.
@@ -139,14 +174,36 @@ class APIKey(models.Model):
         """
         Look up an APIKey by its raw value.
 
-        Returns the matching ``APIKey`` instance (updating ``last_used_at``) or
-        ``None`` if not found.
+        Returns the matching ``APIKey`` instance (recording ``last_used_at``) or
+        ``None`` if not found or its user is inactive. Keys that verified before are resolved from
+        ``users.api_key_cache`` without repeating the PBKDF2 derivation.
         """
-        key_hash = cls._hash_raw_key(raw_key)
-        try:
-            api_key = cls.objects.select_related('user').get(key_hash=key_hash)
-        except cls.DoesNotExist:
+        from users.api_key_cache import get_verified, key_digest, last_used, local_keys, remember_verified
+
+        digest = key_digest(raw_key)
+        verified = get_verified(digest)
+        api_key = None
+        if verified is not None:
+            # Each request gets its own instances, loaded with the current user.
+            resolved = local_keys.get(digest)
+            keys = cls.objects.select_related('user')
+            if resolved is not None and resolved[0] == verified['id']:
+                api_key = keys.filter(pk=resolved[0], user_id=resolved[1]).first()
+            else:
+                api_key = keys.filter(pk=verified['id'], key_hash=verified['key_hash']).first()
+                if api_key is not None:
+                    local_keys.set(digest, api_key)
+
+        if api_key is None:
+            local_keys.discard(digest)
+            key_hash = cls._hash_raw_key(raw_key)
+            try:
+                api_key = cls.objects.select_related('user').get(key_hash=key_hash)
+            except cls.DoesNotExist:
+                return None
+            remember_verified(digest, api_key)
+
+        if not api_key.user.is_active:
             return None
-        from django.utils import timezone
-        cls.objects.filter(pk=api_key.pk).update(last_used_at=timezone.now())
-        return api_key
\ No newline at end of file
+        last_used.record(api_key)
+        return api_key
@@ -3,7 +3,11 @@ from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
 from allauth.account.models import EmailAddress
-from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_delete, pre_save
+
+from users import media_usage
+from users.api_key_cache import forget_key, forget_user
+from users.models import APIKey
 
 User = get_user_model()
 
@@ -50,4 +54,23 @@ def prevent_deleting_last_email(sender, instance, using, **kwargs):
     user = instance.user
     email_count = EmailAddress.objects.filter(user=user).count()
     if email_count <= 1:
-        raise ValueError("Cannot delete the last email address of a user.")
\ No newline at end of file
+        raise ValueError("Cannot delete the last email address of a user.")
+
+
+@receiver(post_delete, sender=APIKey)
+def forget_revoked_api_key(sender, instance, **kwargs):
+    # Cached verifications must not outlive the key.
+    forget_key(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def forget_saved_user_api_keys(sender, instance, **kwargs):
+    # Deactivated users must not keep authenticating from this process's cache.
+    forget_user(instance.pk)
+
+
+# Keep the media usage ledger in step with tracked file columns.
+for _kind, _model, *_ in media_usage.tracked_files():
+    pre_save.connect(media_usage.note_pending_change, sender=_model, dispatch_uid=f'media_usage_pre_save_{_kind}')
+    post_save.connect(media_usage.apply_pending_change, sender=_model, dispatch_uid=f'media_usage_post_save_{_kind}')
+    post_delete.connect(media_usage.release_deleted, sender=_model, dispatch_uid=f'media_usage_post_delete_{_kind}')
@@ -1,5 +1,18 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, override_settings
+from rest_framework.request import Request
 from rest_framework.test import APITestCase
-from .models import CustomUser
+from .api_key_cache import last_used, local_keys
+from .authentication import APIKeyAuthentication, authenticate_request_api_key
+from .media_usage import reconcile_media_usage
+from .media_utils import enforce_media_storage_limit, get_user_media_usage
+from .models import APIKey, CustomUser, MediaUsage
+from adventures.models import ContentAttachment, Location
 from uuid import UUID
 
 from allauth.account.models import EmailAddress
@@ -80,3 +93,122 @@ class UserAPITestCase(APITestCase):
         # assert email are testuser@example and testuser2@example.com
         self.assertEqual(emails[1].email, 'testuser@example.com')
         self.assertEqual(emails[0].email, 'testuser2@example.com')
+
+
+class APIKeyAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        local_keys.clear()
+        self.user = CustomUser.objects.create_user(
+            username='api-key-user', email='api-key-user@example.com', password='testpassword123',
+        )
+        self.api_key, self.raw_key = APIKey.generate(self.user, 'Automation')
+
+    def test_repeat_authentication_skips_key_derivation(self):
+        with mock.patch.object(APIKey, '_hash_raw_key', wraps=APIKey._hash_raw_key) as derive:
+            self.assertEqual(APIKey.authenticate(self.raw_key), self.api_key)
+            local_keys.clear()
+            self.assertEqual(APIKey.authenticate(self.raw_key).user, self.user)
+        self.assertEqual(derive.call_count, 1)
+
+    def test_revoked_key_is_rejected(self):
+        APIKey.authenticate(self.raw_key)
+        self.api_key.delete()
+        self.assertIsNone(APIKey.authenticate(self.raw_key))
+
+    @override_settings(API_KEY_LAST_USED_INTERVAL=3600)
+    def test_last_used_at_writes_are_coalesced(self):
+        last_used.flush()  # start a fresh interval
+        APIKey.authenticate(self.raw_key)
+        # Only the key (with its user) is loaded; no last_used_at write.
+        with self.assertNumQueries(1):
+            APIKey.authenticate(self.raw_key)
+        self.api_key.refresh_from_db()
+        self.assertIsNone(self.api_key.last_used_at)
+
+        last_used.flush()
+        self.api_key.refresh_from_db()
+        self.assertIsNotNone(self.api_key.last_used_at)
+
+    def test_requests_get_their_own_user_instances(self):
+        first = APIKey.authenticate(self.raw_key)
+        first.user.first_name = 'Leaked'
+
+        second = APIKey.authenticate(self.raw_key)
+
+        self.assertIsNot(second, first)
+        self.assertIsNot(second.user, first.user)
+        self.assertEqual(second.user.first_name, '')
+
+    def test_deactivated_user_is_rejected(self):
+        APIKey.authenticate(self.raw_key)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(APIKey.authenticate(self.raw_key))
+
+    def test_identity_is_reused_within_a_request(self):
+        request = RequestFactory().get('/api/locations/', HTTP_X_API_KEY=self.raw_key)
+        with mock.patch.object(APIKey, 'authenticate', wraps=APIKey.authenticate) as authenticate:
+            authenticate_request_api_key(request, self.raw_key)
+            user, api_key = APIKeyAuthentication().authenticate(Request(request))
+        self.assertEqual(authenticate.call_count, 1)
+        self.assertEqual(user, self.user)
+        self.assertEqual(api_key, self.api_key)
+
+
+class MediaUsageLedgerTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = CustomUser.objects.create_user(
+            username='media-user', email='media-user@example.com', password='testpassword123',
+        )
+        self.location = Location.objects.create(user=self.user, name='Zermatt')
+
+    def _attach(self, content):
+        return ContentAttachment.objects.create(
+            user=self.user,
+            file=SimpleUploadedFile('ticket.txt', content),
+            content_type=ContentType.objects.get_for_model(Location),
+            object_id=self.location.id,
+        )
+
+    def test_ledger_follows_uploads_and_deletes(self):
+        self._attach(b'123456')
+        usage = get_user_media_usage(self.user)
+        self.assertEqual((usage['attachments_bytes'], usage['attachments_files']), (6, 1))
+
+        second = self._attach(b'1234')
+        self.assertEqual(get_user_media_usage(self.user)['total_bytes'], 10)
+
+        second.file = SimpleUploadedFile('ticket.txt', b'12')
+        second.save()
+        self.assertEqual(get_user_media_usage(self.user)['total_bytes'], 8)
+
+        second.delete()
+        usage = get_user_media_usage(self.user)
+        self.assertEqual((usage['attachments_bytes'], usage['attachments_files']), (6, 1))
+
+    @override_settings(MEDIA_STORAGE_LIMIT_BYTES=10)
+    def test_quota_check_reads_the_ledger(self):
+        self._attach(b'123456')
+        get_user_media_usage(self.user)
+        with self.assertNumQueries(1):
+            allowed, details = enforce_media_storage_limit(self.user, 5)
+        self.assertFalse(allowed)
+        self.assertEqual(details['current_bytes'], 6)
+
+    def test_reconcile_repairs_drift(self):
+        self._attach(b'123456')
+        get_user_media_usage(self.user)
+        MediaUsage.objects.filter(user=self.user).update(attachments_bytes=999, attachments_files=7)
+
+        usage = reconcile_media_usage(self.user)
+
+        self.assertEqual((usage.attachments_bytes, usage.attachments_files), (6, 1))
+        self.assertIsNotNone(usage.reconciled_at)
@@ -0,0 +1,72 @@
+"""
+Measure the per-call cost of locality matching used by reverse geocoding.
+
+Samples cities from the regions with the most cities (the worst case for the
+matcher) and times ``match_locality`` for an exact name, an accent/case-folded
+variant and a name that does not exist. Run it after ``download-countries`` so
+the full world dataset is loaded.
+
+Usage:
+    python manage.py benchmark-city-match
+    python manage.py benchmark-city-match --regions 20 --samples 50
+"""
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from adventures.utils.geocoding_utils import match_locality
+from worldtravel.models import City, Region
+
+
+class Command(BaseCommand):
+    help = 'Benchmark city locality matching against the loaded world data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--regions', type=int, default=10, help='Number of largest regions to sample (default: 10)')
+        parser.add_argument('--samples', type=int, default=25, help='Cities sampled per region (default: 25)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for sampling (default: 0)')
+
+    def handle(self, *args, **options):
+        if not City.objects.exists():
+            self.stdout.write(self.style.WARNING('No cities loaded; run download-countries first.'))
+            return
+
+        rng = random.Random(options['seed'])
+        regions = list(
+            Region.objects.annotate(city_count=Count('city'))
+            .order_by('-city_count')[: max(1, options['regions'])]
+        )
+
+        cases = {'exact': [], 'folded': [], 'missing': []}
+        for region in regions:
+            names = list(City.objects.filter(region=region).values_list('name', flat=True))
+            for name in rng.sample(names, min(len(names), options['samples'])):
+                cases['exact'].append((region, {'city': name}))
+                cases['folded'].append((region, {'town': name.upper().replace(' ', '-')}))
+                cases['missing'].append((region, {'village': f'{name} zzqx', 'county': 'zzqx'}))
+
+        self.stdout.write(
+            f'Sampled {len(cases["exact"])} cities from {len(regions)} region(s) '
+            f'(largest has {regions[0].city_count} cities)'
+        )
+        for label, calls in cases.items():
+            durations = []
+            with CaptureQueriesContext(connection) as queries:
+                for region, address in calls:
+                    started = time.perf_counter()
+                    match_locality(address, region)
+                    durations.append((time.perf_counter() - started) * 1000)
+            durations.sort()
+            p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            self.stdout.write(
+                f'  {label:<8} mean {statistics.mean(durations):.2f} ms  '
+                f'p95 {p95:.2f} ms  queries/call {len(queries) / len(calls):.1f}'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -1,7 +1,7 @@
 import os
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 import requests
-from worldtravel.models import Country, Region, City
+from worldtravel.models import Country, CountryBoundary, Region, RegionBoundary, City, normalize_place_name
 from django.db import transaction
 import ijson
 import gc
@@ -45,6 +45,20 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--force', action='store_true', help='Force download the countries+regions+states.json file')
         parser.add_argument('--batch-size', type=int, default=500, help='Batch size for database operations')
+        parser.add_argument(
+            '--region-boundaries',
+            default=getattr(settings, 'WORLD_REGION_BOUNDARIES_PATH', ''),
+            help='Local GeoJSON/shapefile of admin-1 polygons to import for offline region lookups',
+        )
+        parser.add_argument(
+            '--country-boundaries',
+            default=getattr(settings, 'WORLD_COUNTRY_BOUNDARIES_PATH', ''),
+            help='Local GeoJSON/shapefile of country polygons (defaults to the union of region polygons)',
+        )
+        parser.add_argument('--region-code-field', default='iso_3166_2', help='Feature attribute holding the ISO 3166-2 region code')
+        parser.add_argument('--country-code-field', default='iso_a2', help='Feature attribute holding the ISO 3166-1 alpha-2 code')
+        parser.add_argument('--simplify', type=float, default=0.0, help='Simplify polygons with this tolerance in degrees (0 = off)')
+        parser.add_argument('--boundaries-only', action='store_true', help='Only import boundary polygons, skip the world data download')
 
     @contextmanager
     def _temp_db(self):
@@ -89,8 +103,18 @@ class Command(BaseCommand):
                 pass
 
     def handle(self, **options):
-        force = options['force']
-        batch_size = options['batch_size']
+        if not options['boundaries_only']:
+            self._import_world_data(options['force'], options['batch_size'])
+
+        if options['region_boundaries'] or options['country_boundaries']:
+            already_imported = RegionBoundary.objects.exists() or CountryBoundary.objects.exists()
+            if already_imported and not (options['force'] or options['boundaries_only']):
+                self.stdout.write(self.style.SUCCESS('Boundary polygons already imported.'))
+                return
+            self.stdout.write('Importing boundary polygons...')
+            self._import_boundaries(options)
+
+    def _import_world_data(self, force, batch_size):
         countries_json_path = f'countries+regions+states-{COUNTRY_REGION_JSON_VERSION}.json'
         
         # Download or validate JSON file
@@ -135,6 +159,134 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS('All data imported successfully with minimal memory usage'))
 
+    def _read_boundary_features(self, path, code_field, simplify):
+        """Yield (code, MultiPolygon) pairs from a GDAL-readable boundary file."""
+        from django.contrib.gis.gdal import DataSource, GDALException
+        from django.contrib.gis.geos import MultiPolygon, Polygon
+
+        if not os.path.exists(path):
+            raise CommandError(f'Boundary file not found: {path}')
+        try:
+            layer = DataSource(path)[0]
+        except GDALException as exc:
+            raise CommandError(f'Unable to read boundary file {path}: {exc}')
+        if code_field not in layer.fields:
+            raise CommandError(
+                f'Field "{code_field}" not found in {path}. Available fields: {", ".join(layer.fields)}'
+            )
+
+        for feature in layer:
+            code = (feature.get(code_field) or '').strip().upper()
+            if not code or code.endswith('-99'):
+                continue
+            geometry = feature.geom
+            if geometry.srid and geometry.srid != 4326:
+                geometry.transform(4326)
+            geos = geometry.geos
+            geos.srid = 4326
+            if simplify:
+                geos = geos.simplify(simplify, preserve_topology=True)
+            if isinstance(geos, Polygon):
+                geos = MultiPolygon(geos, srid=4326)
+            if not isinstance(geos, MultiPolygon) or geos.empty:
+                continue
+            yield code, geos
+
+    @staticmethod
+    def _merge_shapes(shapes):
+        from django.contrib.gis.geos import MultiPolygon, Polygon
+
+        merged = {}
+        for code, shape in shapes:
+            merged[code] = merged[code].union(shape) if code in merged else shape
+        for code, shape in merged.items():
+            if isinstance(shape, Polygon):
+                shape = MultiPolygon(shape, srid=4326)
+            merged[code] = shape
+        return merged
+
+    def _import_boundaries(self, options):
+        """Load region/country polygons into the boundary tables (GiST indexed)."""
+        from django.contrib.gis.db.models import Union
+        from django.contrib.gis.geos import MultiPolygon, Polygon
+
+        batch_size = options['batch_size']
+        simplify = options['simplify']
+        region_path = options['region_boundaries']
+        country_path = options['country_boundaries']
+
+        if region_path:
+            shapes = self._merge_shapes(
+                self._read_boundary_features(region_path, options['region_code_field'], simplify)
+            )
+            known_ids = set(Region.objects.filter(id__in=shapes.keys()).values_list('id', flat=True))
+            boundaries = [
+                RegionBoundary(region_id=code, geometry=shape, source=os.path.basename(region_path))
+                for code, shape in shapes.items()
+                if code in known_ids
+            ]
+            with transaction.atomic():
+                RegionBoundary.objects.filter(region_id__in=known_ids).delete()
+                RegionBoundary.objects.bulk_create(boundaries, batch_size=batch_size)
+            self.stdout.write(
+                f'✓ Region boundaries: {len(boundaries)} imported, {len(shapes) - len(boundaries)} unmatched codes'
+            )
+
+        if country_path:
+            shapes = self._merge_shapes(
+                self._read_boundary_features(country_path, options['country_code_field'], simplify)
+            )
+            countries = {
+                c.country_code: c.id for c in Country.objects.filter(country_code__in=shapes.keys()).only('id', 'country_code')
+            }
+            boundaries = [
+                CountryBoundary(country_id=countries[code], geometry=shape, source=os.path.basename(country_path))
+                for code, shape in shapes.items()
+                if code in countries
+            ]
+        else:
+            # Derive country outlines from their regions' polygons.
+            boundaries = []
+            country_ids = RegionBoundary.objects.values_list('region__country_id', flat=True).distinct()
+            for country_id in country_ids:
+                shape = RegionBoundary.objects.filter(region__country_id=country_id).aggregate(
+                    shape=Union('geometry')
+                )['shape']
+                if isinstance(shape, Polygon):
+                    shape = MultiPolygon(shape, srid=4326)
+                if shape is not None:
+                    boundaries.append(
+                        CountryBoundary(country_id=country_id, geometry=shape, source='regions')
+                    )
+
+        with transaction.atomic():
+            CountryBoundary.objects.filter(country_id__in=[b.country_id for b in boundaries]).delete()
+            CountryBoundary.objects.bulk_create(boundaries, batch_size=batch_size)
+        self.stdout.write(f'✓ Country boundaries: {len(boundaries)} imported')
+
+        # Countries without states only have a placeholder "XX-00" region; give
+        # it the country outline so point lookups still resolve a region.
+        code_by_country_id = dict(
+            Country.objects.filter(id__in=[b.country_id for b in boundaries]).values_list('id', 'country_code')
+        )
+        placeholder_ids = set(
+            Region.objects.filter(id__in=[f'{code}-00' for code in code_by_country_id.values()])
+            .values_list('id', flat=True)
+        )
+        placeholder_boundaries = [
+            RegionBoundary(
+                region_id=f'{code_by_country_id[b.country_id]}-00',
+                geometry=b.geometry,
+                source=b.source,
+            )
+            for b in boundaries
+            if f'{code_by_country_id.get(b.country_id)}-00' in placeholder_ids
+        ]
+        if placeholder_boundaries:
+            with transaction.atomic():
+                RegionBoundary.objects.filter(region_id__in=placeholder_ids).delete()
+                RegionBoundary.objects.bulk_create(placeholder_boundaries, batch_size=batch_size)
+
     def _parse_and_store_temp(self, json_path, temp_conn):
         """Parse JSON once and store in temporary SQLite database"""
         country_count = 0
@@ -401,6 +553,7 @@ class Command(BaseCommand):
                     city_obj = City(
                         id=city_id,
                         name=name,
+                        normalized_name=normalize_place_name(name),
                         region=region_obj,
                         coordinates=coordinates_from_lon_lat(longitude, latitude),
                     )
@@ -409,6 +562,7 @@ class Command(BaseCommand):
                     cities_to_create.append(City(
                         id=city_id,
                         name=name,
+                        normalized_name=normalize_place_name(name),
                         region=region_obj,
                         coordinates=coordinates_from_lon_lat(longitude, latitude),
                     ))
@@ -425,7 +579,7 @@ class Command(BaseCommand):
                 with transaction.atomic():
                     City.objects.bulk_update(
                         cities_to_update,
-                        ['name', 'region', 'coordinates'],
+                        ['name', 'normalized_name', 'region', 'coordinates'],
                         batch_size=batch_size,
                     )
                 cities_to_update.clear()
@@ -442,7 +596,7 @@ class Command(BaseCommand):
             with transaction.atomic():
                 City.objects.bulk_update(
                     cities_to_update,
-                    ['name', 'region', 'coordinates'],
+                    ['name', 'normalized_name', 'region', 'coordinates'],
                     batch_size=batch_size,
                 )
         
@@ -0,0 +1,37 @@
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worldtravel', '0019_pointfield_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountryBoundary',
+            fields=[
+                ('country', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='boundary', serialize=False, to='worldtravel.country')),
+                ('geometry', django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326)),
+                ('source', models.CharField(blank=True, max_length=255, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Country Boundaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='RegionBoundary',
+            fields=[
+                ('region', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='boundary', serialize=False, to='worldtravel.region')),
+                ('geometry', django.contrib.gis.db.models.fields.MultiPolygonField(srid=4326)),
+                ('source', models.CharField(blank=True, max_length=255, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Region Boundaries',
+            },
+        ),
+    ]
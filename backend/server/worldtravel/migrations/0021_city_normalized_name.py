@@ -0,0 +1,59 @@
+import re
+import unicodedata
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def _normalize_place_name(value):
+    # Frozen copy of worldtravel.models.normalize_place_name as of this migration.
+    if not value:
+        return ""
+    normalized = unicodedata.normalize("NFKD", value)
+    ascii_only = normalized.encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]", "", ascii_only.lower())
+
+
+def backfill_normalized_names(apps, schema_editor):
+    City = apps.get_model('worldtravel', 'City')
+    batch = []
+    for city in City.objects.only('id', 'name').iterator(chunk_size=5000):
+        city.normalized_name = _normalize_place_name(city.name)
+        batch.append(city)
+        if len(batch) >= 5000:
+            City.objects.bulk_update(batch, ['normalized_name'])
+            batch = []
+    if batch:
+        City.objects.bulk_update(batch, ['normalized_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('worldtravel', '0020_countryboundary_regionboundary'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='city',
+            name='normalized_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(backfill_normalized_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(fields=['region', 'normalized_name'], name='worldtravel_region__125c8d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+                ),
+                name='worldtravel_city_name_trgm',
+            ),
+        ),
+    ]
@@ -1,5 +1,10 @@
+import re
+import unicodedata
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from django.core.exceptions import ValidationError
 from django.contrib.gis.db import models as gis_models
 from adventures.utils.geo import point_to_lat_lon
@@ -10,6 +15,15 @@ User = get_user_model()
 default_user = 1  # Replace with an actual user ID
 
 
+def normalize_place_name(value):
+    """Fold case, accents and punctuation so "São Paulo" matches "sao-paulo"."""
+    if not value:
+        return ""
+    normalized = unicodedata.normalize("NFKD", value)
+    ascii_only = normalized.encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]", "", ascii_only.lower())
+
+
 class Country(models.Model):
 
     id = models.AutoField(primary_key=True)
@@ -58,11 +72,25 @@ class Region(models.Model):
 class City(models.Model):
     id = models.CharField(primary_key=True)
     name = models.CharField(max_length=100)
+    # normalize_place_name(name); bulk writers must set it explicitly
+    normalized_name = models.CharField(max_length=100, blank=True, default='', editable=False)
     region = models.ForeignKey(Region, on_delete=models.CASCADE)
     coordinates = gis_models.PointField(srid=4326, null=True, blank=True)
 
     class Meta:
         verbose_name_plural = "Cities"
+        indexes = [
+            models.Index(fields=['region', 'normalized_name']),
+            # Serves the name__icontains fallback, which compiles to UPPER(name) LIKE ...
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='worldtravel_city_name_trgm'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_place_name(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'normalized_name'}
+        super().save(*args, **kwargs)
 
     @property
     def latitude(self):
@@ -77,6 +105,37 @@ class City(models.Model):
     def __str__(self):
         return self.name
 
+class CountryBoundary(models.Model):
+    """
+    Optional country outline used for offline point-in-polygon lookups.
+
+    Kept out of ``Country`` so multi-megabyte polygons are never loaded by the
+    many queries that select_related countries.
+    """
+    country = models.OneToOneField(Country, on_delete=models.CASCADE, primary_key=True, related_name='boundary')
+    geometry = gis_models.MultiPolygonField(srid=4326)
+    source = models.CharField(max_length=255, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Country Boundaries"
+
+    def __str__(self):
+        return f'Boundary of {self.country_id}'
+
+class RegionBoundary(models.Model):
+    """Optional admin-1 boundary polygon for a region (see ``CountryBoundary``)."""
+    region = models.OneToOneField(Region, on_delete=models.CASCADE, primary_key=True, related_name='boundary')
+    geometry = gis_models.MultiPolygonField(srid=4326)
+    source = models.CharField(max_length=255, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Region Boundaries"
+
+    def __str__(self):
+        return f'Boundary of {self.region_id}'
+
 class VisitedRegion(models.Model):
     id = models.AutoField(primary_key=True)
     user = models.ForeignKey(
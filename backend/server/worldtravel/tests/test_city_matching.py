@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from adventures.utils.geocoding_utils import match_locality
+from worldtravel.models import City, Country, Region, normalize_place_name
+
+
+class CityLocalityMatchTests(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(name='Brazil', country_code='BR')
+        self.region = Region.objects.create(id='BR-SP', name='São Paulo', country=self.country)
+        self.sao_paulo = City.objects.create(id='BR-SP-1', name='São Paulo', region=self.region)
+        self.santos = City.objects.create(id='BR-SP-2', name='Santos', region=self.region)
+        self.campinas = City.objects.create(id='BR-SP-3', name='Campinas', region=self.region)
+
+    def test_normalize_place_name(self):
+        self.assertEqual(normalize_place_name('São Paulo'), 'saopaulo')
+        self.assertEqual(normalize_place_name('SAO-PAULO'), 'saopaulo')
+        self.assertEqual(normalize_place_name(None), '')
+
+    def test_save_populates_normalized_name(self):
+        self.assertEqual(self.sao_paulo.normalized_name, 'saopaulo')
+        self.santos.name = 'Santos Dumont'
+        self.santos.save(update_fields=['name'])
+        self.santos.refresh_from_db()
+        self.assertEqual(self.santos.normalized_name, 'santosdumont')
+
+    def test_matches_accent_and_case_folded_name(self):
+        self.assertEqual(match_locality({'city': 'SAO PAULO'}, self.region), self.sao_paulo)
+
+    def test_more_specific_key_wins(self):
+        address = {'suburb': 'Campinas', 'city': 'São Paulo'}
+        self.assertEqual(match_locality(address, self.region), self.campinas)
+
+    def test_substring_fallback_is_skipped_for_county(self):
+        self.assertEqual(match_locality({'town': 'Campin'}, self.region), self.campinas)
+        self.assertIsNone(match_locality({'county': 'Campin'}, self.region))
+
+    def test_normalized_matches_use_a_single_query(self):
+        address = {'suburb': 'Vila Mariana', 'city': 'São Paulo', 'county': 'Região Metropolitana'}
+        with self.assertNumQueries(2):
+            # One batched normalized lookup plus the suburb substring fallback.
+            self.assertEqual(match_locality(address, self.region), self.sao_paulo)
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from adventures.providers.base import ProviderResult
+from adventures.services.geocoding.regions import resolve_point_locally
+from adventures.services.geocoding.reverse import reverse_geocode
+from users.models import CustomUser
+from worldtravel.models import Country, CountryBoundary, Region, RegionBoundary
+
+
+def _square(min_lon, min_lat, max_lon, max_lat):
+    return MultiPolygon(
+        Polygon(
+            (
+                (min_lon, min_lat),
+                (max_lon, min_lat),
+                (max_lon, max_lat),
+                (min_lon, max_lat),
+                (min_lon, min_lat),
+            )
+        ),
+        srid=4326,
+    )
+
+
+class RegionBoundaryLookupTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='boundary-user',
+            email='boundary-user@example.com',
+            password='testpassword123',
+        )
+        self.country = Country.objects.create(name='Portugal', country_code='PT')
+        self.region = Region.objects.create(id='PT-11', name='Lisboa', country=self.country)
+        RegionBoundary.objects.create(region=self.region, geometry=_square(-9.5, 38.6, -8.9, 39.1))
+        CountryBoundary.objects.create(country=self.country, geometry=_square(-9.6, 36.9, -6.1, 42.2))
+
+    def test_point_inside_region_resolves_region_and_country(self):
+        match = resolve_point_locally(38.7223, -9.1393)
+        self.assertEqual(match.region, self.region)
+        self.assertEqual(match.country, self.country)
+
+    def test_point_outside_region_but_inside_country_resolves_country_only(self):
+        match = resolve_point_locally(41.1579, -8.6291)
+        self.assertIsNone(match.region)
+        self.assertEqual(match.country, self.country)
+
+    def test_point_outside_all_boundaries_returns_none(self):
+        self.assertIsNone(resolve_point_locally(48.8566, 2.3522))
+
+    @override_settings(GOOGLE_MAPS_API_KEY='')
+    @patch('adventures.services.geocoding.reverse.osm_reverse')
+    def test_reverse_geocode_uses_local_region_when_providers_fail(self, mock_osm):
+        mock_osm.return_value = ProviderResult(error='OpenStreetMap service error')
+
+        selection = reverse_geocode(38.7223, -9.1393, self.user)
+
+        self.assertEqual(selection.provider_used, 'local')
+        self.assertEqual(selection.data['region_id'], 'PT-11')
+        self.assertEqual(selection.data['country_id'], 'PT')
+        self.assertTrue(selection.transient)
+
+
+class CheckPointInRegionAPITests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='boundary-api-user',
+            email='boundary-api-user@example.com',
+            password='testpassword123',
+        )
+        country = Country.objects.create(name='Portugal', country_code='PT')
+        region = Region.objects.create(id='PT-11', name='Lisboa', country=country)
+        RegionBoundary.objects.create(region=region, geometry=_square(-9.5, 38.6, -8.9, 39.1))
+        self.client.force_authenticate(user=self.user)
+
+    def test_check_point_in_region(self):
+        response = self.client.get('/api/countries/check_point_in_region/', {'lat': 38.7223, 'lon': -9.1393})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'in_region': True, 'region_name': 'Lisboa', 'region_id': 'PT-11'})
+
+    def test_check_point_in_region_requires_coordinates(self):
+        response = self.client.get('/api/countries/check_point_in_region/')
+        self.assertEqual(response.status_code, 400)
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, action
 from django.contrib.gis.geos import Point
 from adventures.models import Location
+from adventures.services.geocoding.regions import resolve_region_for_point
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -68,10 +69,13 @@ class CountryViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=['get'])
     def check_point_in_region(self, request):
-        lat = float(request.query_params.get('lat'))
-        lon = float(request.query_params.get('lon'))
-        point = Point(lon, lat, srid=4326)
-        region = Region.objects.filter(geometry__contains=point).first()
+        try:
+            lat = float(request.query_params.get('lat'))
+            lon = float(request.query_params.get('lon'))
+        except (TypeError, ValueError):
+            return Response({'error': 'Latitude and longitude are required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        region = resolve_region_for_point(Point(lon, lat, srid=4326))
         if region:
             return Response({'in_region': True, 'region_name': region.name, 'region_id': region.id})
         else:
@@ -79,20 +83,27 @@ class CountryViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=['post'])
     def region_check_all_adventures(self, request):
-        adventures = Location.objects.filter(user=request.user.id, type='visited')
+        locations = (
+            Location.objects.filter(user=request.user, coordinates__isnull=False)
+            .only('id', 'coordinates')
+            .prefetch_related('visits')
+        )
+        visited_region_ids = set(
+            VisitedRegion.objects.filter(user=request.user).values_list('region_id', flat=True)
+        )
         count = 0
-        for adventure in adventures:
-            if adventure.coordinates:
-                try:
-                    point = adventure.coordinates
-                    region = Region.objects.filter(geometry__contains=point).first()
-                    if region:
-                        if not VisitedRegion.objects.filter(user=request.user.id, region=region).exists():
-                            VisitedRegion.objects.create(user=request.user, region=region)
-                            count += 1
-                except Exception as e:
-                    print(f"Error processing adventure {adventure.id}: {e}")
-                    continue
+        for location in locations:
+            if not location.is_visited_status():
+                continue
+            try:
+                region = resolve_region_for_point(location.coordinates)
+                if region and region.id not in visited_region_ids:
+                    VisitedRegion.objects.create(user=request.user, region=region)
+                    visited_region_ids.add(region.id)
+                    count += 1
+            except Exception as e:
+                print(f"Error processing location {location.id}: {e}")
+                continue
         return Response({'regions_visited': count})
 
 class RegionViewSet(viewsets.ReadOnlyModelViewSet):
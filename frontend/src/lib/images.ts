@@ -11,7 +11,9 @@ export function normalizeContentImage(
 		source: partial.source ?? 'upload',
 		source_url: partial.source_url ?? null,
 		latitude: partial.latitude ?? null,
-		longitude: partial.longitude ?? null
+		longitude: partial.longitude ?? null,
+		variants: partial.variants ?? {},
+		width: partial.width ?? null
 	};
 }
 
@@ -22,3 +24,18 @@ export function googleContentImage(id: string, image: string, isPrimary = false)
 export function defaultImageSource(source?: ImageSource | null): ImageSource {
 	return source ?? 'upload';
 }
+
+/**
+ * `srcset` for an image's downscaled variants plus the original at its own width,
+ * or undefined when there are no variants or the original's width is unknown.
+ */
+export function imageSrcset(
+	image: Pick<ContentImage, 'image' | 'variants' | 'width'>
+): string | undefined {
+	const entries = Object.entries(image.variants ?? {});
+	// Width descriptors make browsers ignore `src`, so the original has to be a candidate.
+	if (!entries.length || !image.width) return undefined;
+	return [...entries, [String(image.width), image.image]]
+		.map(([width, url]) => `${url} ${width}w`)
+		.join(', ');
+}
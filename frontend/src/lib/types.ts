@@ -70,6 +70,8 @@ export type ContentImage = {
 	source_url?: string | null;
 	latitude?: number | null;
 	longitude?: number | null;
+	variants?: Record<string, string>;
+	width?: number | null;
 };
 
 export type Location = {